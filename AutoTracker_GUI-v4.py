@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
 
+import bisect
+import collections
+import csv
+import hashlib
+import io
+import itertools
 import json
 import locale
+import math
+import mmap
 import os
 import platform
+import queue
+import re
+import select
 import shlex
 import shutil
+import signal
+import sqlite3
 import ssl
+import statistics
+import struct
 import subprocess
 import sys
 import tarfile
@@ -19,7 +34,78 @@ import zipfile
 from pathlib import Path
 
 SETTINGS_FILE = Path(__file__).resolve().parent / "settings.json"
-DEFAULT_SETTINGS = {"ask_create_structure": True, "top_dir": ""}
+DEFAULT_SETTINGS = {
+    "ask_create_structure": True,
+    "top_dir": "",
+    # Mapper-Race: Qualitätsschwelle, ab der der erste fertige Mapper gewinnt
+    "race_min_registered_ratio": 0.8,
+    "race_max_reproj_error": 1.5,
+    # Qualitätsmetriken: Szenen unterhalb dieser Werte gelten als Ausreißer
+    "metrics_min_registered_ratio": 0.9,
+    "metrics_max_reproj_error": 1.5,
+    "metrics_min_keypoints": 500,
+    # Frühabbruch nach Feature-Extraktion/Matching (aus database.db gelesen)
+    "gate_enabled": True,
+    "gate_min_keypoints": 300,
+    "gate_max_low_keypoint_fraction": 0.3,
+    "gate_min_pair_matches": 30,
+    "gate_min_neighbour_fraction": 0.8,
+    "gate_max_components": 3,
+    "gate_fallback": "retry",  # "retry" = mehr Features / größerer Overlap, "stop" = Video überspringen
+    # Interpolation: Lücken über diese Frame-Anzahl werden als "gap" markiert
+    "interp_max_gap": 12,
+    # Zwei-Pass-Modus: SIFT-Auflösung für den schnellen Proxy-Solve
+    "proxy_max_image_size": 1024,
+    # Streaming: Frames pro Block, der während der Extraktion verarbeitet wird
+    "stream_chunk_frames": 40,
+    # Intrinsics-Bibliothek: Standard-Kameramodell und ob Clips ohne Kamera-Tags zugeordnet werden
+    "intrinsics_camera_model": "SIMPLE_RADIAL",
+    "intrinsics_match_without_tags": False,
+    # Gemeinsame Rekonstruktion: jeder N-te Frame sucht die ähnlichsten Proxies in den anderen Videos
+    "joint_cross_stride": 5,
+    "joint_cross_per_frame": 2,
+    # Dense-Keyframes: neuer Keyframe, sobald Basislinie (relativ zur mittleren Tiefe), Blickwinkel
+    # oder Anteil gemeinsam sichtbarer 3D-Punkte gegenüber dem letzten Keyframe die Schwelle reißt
+    "dense_kf_baseline_ratio": 0.05,
+    "dense_kf_max_angle": 10.0,
+    "dense_kf_min_overlap": 0.6,
+    # Mesh: Voxelgröße relativ zur Szenengröße, Mindestanzahl belegter Nachbarvoxel, Poisson-Parameter
+    "mesh_voxel_ratio": 0.002,
+    "mesh_min_neighbours": 2,
+    "poisson_depth": 13,
+    "poisson_trim": 10,
+    # Speicher: so viel RAM bleibt mindestens frei (sonst wird die Stufe gestoppt),
+    # und so lange wird auf genug freien Speicher gewartet, bevor ein günstigeres Profil greift
+    "mem_reserve_mb": 1024,
+    "mem_wait_s": 120,
+    # Plattenplatz: Reserve auf dem Scenes-Laufwerk, Aufräumen fertiger Szenen, Wartezeit bei Platzmangel
+    "disk_reserve_gb": 2.0,
+    "retention_cleanup": True,
+    "retention_keep_frames": True,
+    "disk_wait_s": 0,
+    # Threads: Kern-Budget für alle gleichzeitig laufenden Tools (0 = alle Kerne)
+    "thread_budget": 0,
+    # Autotune: Stichprobengröße, akzeptierter Qualitätsverlust gegenüber der besten Variante,
+    # und ob das gespeicherte Profil beim Start automatisch verwendet wird
+    "autotune_sample_frames": 40,
+    "autotune_quality_ratio": 0.8,
+    "autotune_use_profile": True,
+    # Warteschlange: nach so vielen Minuten Wartezeit steigt ein Job eine Prioritätsstufe (0 = kein Aging)
+    "queue_aging_min": 30,
+    # Ordnerüberwachung "02 VIDEOS": an/aus, Wartezeit mit unveränderter Dateigröße, Abfrageintervall,
+    # Verfahren ("auto" = inotify auf lokalen Linux-Dateisystemen, sonst Polling; "inotify"; "poll")
+    "watch_videos": True,
+    "watch_stable_s": 10,
+    "watch_poll_s": 2,
+    "watch_mode": "auto",
+    # Worker-Modus (--worker): Lease-Ablauf und Heartbeat, Übernahmen bis "failed", Abfrageintervall,
+    # Pipeline-Optionen des Hauptfensters (z. B. {"mesh": true, "fps_mode": "every", "every_n": "3"})
+    "worker_lease_ttl_s": 60,
+    "worker_heartbeat_s": 10,
+    "worker_max_attempts": 3,
+    "worker_poll_s": 10,
+    "worker_options": {},
+}
 
 def load_settings():
     try:
@@ -211,9 +297,20 @@ I18N = {
         "add_videos": "Videos hinzufügen…",
         "remove_sel": "Auswahl entfernen",
         "clear_list": "Liste leeren",
+        "move_up": "Nach oben",
+        "move_down": "Nach unten",
+        "priority": "Priorität:",
+        "prio_high": "Hoch",
+        "prio_normal": "Normal",
+        "prio_low": "Niedrig",
+        "sjf_cb": "Kürzeste zuerst",
         "scenes_dir": "Scenes-Ausgabeordner:",
         "start": "Start",
+        "stop_stage": "Stufe abbrechen",
+        "stop_video": "Video abbrechen",
+        "stop_batch": "Batch abbrechen",
         "test_tools": "Tools testen",
+        "autotune": "Autotune",
         "elapsed": "Laufzeit",
         "dlg_pick_dir": "Ordner auswählen",
         "dlg_pick_file": "Datei auswählen",
@@ -251,7 +348,8 @@ I18N = {
         "run_undistort": "COLMAP image_undistorter…",
         "run_patchmatch": "COLMAP patch_match_stereo…",
         "run_fuse": "COLMAP stereo_fusion…",
-        "run_mesher": "Mesh erzeugen (poisson_mesher)…",
+        "run_mesher": "Mesh erzeugen…",
+        "run_stream": "Streaming: Extraktion, Features, Matching und Registrierung blockweise…",
         "done_all": "Alles erledigt.",
         "tools_test_begin": "### Tools testen ###",
         "tools_test_end": "### Test abgeschlossen ###",
@@ -266,6 +364,25 @@ I18N = {
         "dlg_vcredist_title": "VC++ Runtime fehlt",
         "dlg_vcredist_msg": "Die Microsoft VC++ Runtime scheint zu fehlen. Jetzt installieren?",
         "dlg_vcredist_info": "Die VC++ Runtime von Microsoft muss installiert werden, damit das Script funktioniert, Script wird beendet. Nach Installation der VC++ Runtime das Script erneut ausführen.",
+        "advanced_btn": "Erweitert…",
+        "advanced_title": "Erweiterte Optionen",
+        "race_cb": "Mapper-Race: GLOMAP und COLMAP parallel starten, besseres Ergebnis behalten",
+        "interp_cb": "Kamera-Track auf volle Framerate interpolieren (SLERP/Spline)",
+        "densify_cb": "Densify: gelöste Szenen um fehlende Frames ergänzen statt neu zu rechnen",
+        "two_pass_cb": "Zwei-Pass: schneller Proxy-Solve, danach Verfeinerung in voller Auflösung",
+        "streaming_cb": "Streaming: Tracking bereits während der Frame-Extraktion (blockweise)",
+        "intrinsics_cb": "Intrinsics-Bibliothek: gelöste Kamera-Parameter pro Kamera/Objektiv wiederverwenden",
+        "intrinsics_fix_cb": "Bekannte Intrinsics im Mapper fixieren",
+        "joint_cb": "Gemeinsame Rekonstruktion: alle Videos der Liste in eine Szene (gleiches Set)",
+        "dense_kf_cb": "Mesh: Dense-Rekonstruktion nur auf automatisch gewählten Keyframes",
+        "dense_profile": "Dense-Profil:",
+        "dense_final": "Final",
+        "dense_preview": "Vorschau (schnell, reduzierte Auflösung)",
+        "mesher": "Mesher:",
+        "decimate_cb": "Punktwolke vor Poisson ausdünnen (Voxel-Raster, Ausreißer entfernen)",
+        "deadline": "Zeitbudget (Min., leer = aus):",
+        "deadline_video": "pro Video",
+        "deadline_batch": "für den Batch",
 },
     "en": {
         "app_title": "AutoTracker GUI (Python) – {os}",
@@ -302,9 +419,20 @@ I18N = {
         "add_videos": "Add videos…",
         "remove_sel": "Remove selected",
         "clear_list": "Clear list",
+        "move_up": "Move up",
+        "move_down": "Move down",
+        "priority": "Priority:",
+        "prio_high": "High",
+        "prio_normal": "Normal",
+        "prio_low": "Low",
+        "sjf_cb": "Shortest first",
         "scenes_dir": "Scenes output folder:",
         "start": "Start",
+        "stop_stage": "Cancel stage",
+        "stop_video": "Cancel video",
+        "stop_batch": "Cancel batch",
         "test_tools": "Test tools",
+        "autotune": "Autotune",
         "elapsed": "Elapsed",
         "dlg_pick_dir": "Select folder",
         "dlg_pick_file": "Select file",
@@ -342,7 +470,8 @@ I18N = {
         "run_undistort": "COLMAP image_undistorter…",
         "run_patchmatch": "COLMAP patch_match_stereo…",
         "run_fuse": "COLMAP stereo_fusion…",
-        "run_mesher": "Mesh reconstruction (poisson_mesher)…",
+        "run_mesher": "Mesh reconstruction…",
+        "run_stream": "Streaming: extraction, features, matching and registration in chunks…",
         "done_all": "All done.",
         "tools_test_begin": "### Testing tools ###",
         "tools_test_end": "### Test finished ###",
@@ -357,6 +486,25 @@ I18N = {
         "dlg_vcredist_title": "VC++ runtime missing",
         "dlg_vcredist_msg": "Microsoft VC++ runtime seems missing. Install now?",
         "dlg_vcredist_info": "Microsoft VC++ runtime must be installed for the script to work, script will exit. After installing the VC++ runtime, run the script again.",
+        "advanced_btn": "Advanced…",
+        "advanced_title": "Advanced options",
+        "race_cb": "Mapper race: run GLOMAP and COLMAP concurrently, keep the better result",
+        "interp_cb": "Interpolate camera track to full frame rate (SLERP/spline)",
+        "densify_cb": "Densify: add missing frames to solved scenes instead of remapping",
+        "two_pass_cb": "Two-pass: fast proxy solve, then full-resolution refinement",
+        "streaming_cb": "Streaming: track while frames are still being extracted (in chunks)",
+        "intrinsics_cb": "Intrinsics library: reuse solved camera parameters per camera/lens",
+        "intrinsics_fix_cb": "Keep known intrinsics fixed in the mapper",
+        "joint_cb": "Joint reconstruction: all listed videos into one scene (same set)",
+        "dense_kf_cb": "Mesh: dense reconstruction on automatically chosen keyframes only",
+        "dense_profile": "Dense profile:",
+        "dense_final": "Final",
+        "dense_preview": "Preview (fast, reduced resolution)",
+        "mesher": "Mesher:",
+        "decimate_cb": "Decimate point cloud before Poisson (voxel grid, outlier removal)",
+        "deadline": "Time budget (min, empty = off):",
+        "deadline_video": "per video",
+        "deadline_batch": "for the batch",
 }
 }
 
@@ -701,6 +849,11 @@ if not ensure_tkinter():
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+try:
+    import numpy as np  # optional: beschleunigt Modell-Lesen, Kamera-Tracks, Proxy-Vergleiche und das Ausdünnen von Punktwolken
+except ImportError:
+    np = None
+
 APP_TITLE = f"AutoTracker GUI (Python) – {OS_NAME}"
 DEFAULT_DIRS = {
     "sfm": "01 GLOMAP",
@@ -714,11 +867,133 @@ DEFAULT_DIRS = {
 # Führt einen Prozess aus, loggt stdout live.
 # Windows: setzt Qt/OpenGL Variablen.
 # Bei Fehlern: Fallback mit Offscreen + Software OpenGL.
-def run_cmd(cmd_list, cwd=None, log_fn=None):
-    """Run a command, stream output, and on Windows retry COLMAP if Qt/GL fallback is needed."""
+# --- Prozess-Priorität pro Stufe ---
+# nice-Level, I/O-Klasse (ionice) und CPU-Affinität werden unter POSIX als Befehlspräfix
+# (nice -n / ionice -c / taskset -c) gesetzt: sie gelten schon vor dem exec des Tools, ohne
+# preexec_fn (die GUI nutzt mehrere Threads) und ohne ungedrosseltes Zeitfenster. Schlüssel:
+# "ffmpeg", COLMAP-/GLOMAP-Unterbefehl oder "default"; settings.json "stage_scheduling" überschreibt.
+DEFAULT_STAGE_SCHED = {
+    "default": {"nice": 5},
+    "ffmpeg": {"nice": 10, "ionice": "idle"},
+    "mapper": {"nice": 5, "affinity": "physical"},
+}
+IONICE_CLASSES = {"realtime": "1", "best-effort": "2", "idle": "3"}
+
+def stage_key(cmd):
+    exe = Path(str(cmd[0])).name.lower()
+    if "ffmpeg" in exe: return "ffmpeg"
+    if ("colmap" in exe or "glomap" in exe) and len(cmd) > 1: return cmd[1]
+    return "default"
+
+def stage_sched(cmd, overrides=None):
+    """Scheduling settings for a tool command: defaults, then per-stage overrides."""
+    key = stage_key(cmd); overrides = overrides or {}
+    sched = dict(DEFAULT_STAGE_SCHED["default"]); sched.update(overrides.get("default", {}))
+    sched.update(DEFAULT_STAGE_SCHED.get(key, {})); sched.update(overrides.get(key, {}))
+    return sched
+
+def parse_cpu_list(text):
+    """Parse a CPU list like "0-3,6" into sorted CPU ids."""
+    cpus = set()
+    for part in str(text).split(","):
+        part = part.strip()
+        if not part: continue
+        lo, _, hi = part.partition("-"); cpus.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(cpus)
+
+def physical_cpus():
+    """One logical CPU per physical core (Linux sysfs) within the current affinity mask, or None."""
+    try: allowed = sorted(os.sched_getaffinity(0))
+    except AttributeError: return None
+    seen = set(); cpus = []
+    for cpu in allowed:
+        try: siblings = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list").read_text().strip()
+        except OSError: siblings = str(cpu)
+        if siblings not in seen: seen.add(siblings); cpus.append(cpu)
+    return cpus
+
+def resolve_affinity(spec):
+    """CPU ids for an affinity spec ("physical", "0-3,6" or a list); None means no pinning."""
+    if not spec or spec == "all": return None
+    cpus = physical_cpus() if spec == "physical" else parse_cpu_list(",".join(map(str, spec)) if isinstance(spec, list) else spec)
+    return cpus or None
+
+def sched_prefix(sched):
+    """Command prefix applying nice level, I/O class and CPU affinity (POSIX); returns (prefix, what is set)."""
+    prefix, done = [], []
+    if os.name == "nt" or not sched: return prefix, done
+    nice = int(sched.get("nice") or 0)
+    if nice > 0 and shutil.which("nice"):
+        prefix += ["nice", "-n", str(nice)]; done.append(f"nice {nice}")
+    cls = IONICE_CLASSES.get(sched.get("ionice") or "")
+    if cls and sys.platform.startswith("linux") and shutil.which("ionice"):
+        prefix += ["ionice", "-c", cls]; done.append(f"ionice {sched['ionice']}")
+    cpus = resolve_affinity(sched.get("affinity"))
+    if cpus and shutil.which("taskset"):
+        cpu_list = ",".join(map(str, cpus))
+        prefix += ["taskset", "-c", cpu_list]; done.append(f"CPUs {cpu_list}")
+    return prefix, done
+
+# Jeder Unterprozess startet in einer eigenen Prozessgruppe, damit ein Abbruch den ganzen
+# Prozessbaum beendet (COLMAP unter Windows startet z. B. über COLMAP.bat).
+PROCESS_GROUP_KWARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+CANCELLED_RC = 130
+
+# --- Thread-Budget ---
+# Ein globales Kern-Budget wird auf gleichzeitig laufende Stufen verteilt; jede Tool-Zeile
+# bekommt ihre Thread-Anzahl explizit (statt dass jedes Tool alle Kerne belegt).
+COLMAP_THREAD_FLAGS = {
+    "feature_extractor": "--SiftExtraction.num_threads",
+    "sequential_matcher": "--SiftMatching.num_threads",
+    "matches_importer": "--SiftMatching.num_threads",
+    "mapper": "--Mapper.num_threads",
+    "image_registrator": "--Mapper.num_threads",
+    "point_triangulator": "--Mapper.num_threads",
+    "stereo_fusion": "--StereoFusion.num_threads",
+    "poisson_mesher": "--PoissonMeshing.num_threads",
+    "delaunay_mesher": "--DelaunayMeshing.num_threads",
+}
+
+class ThreadBudget:
+    """Hands out thread counts from a fixed core budget to concurrently running stages."""
+    def __init__(self, total=0):
+        self.total = int(total) or os.cpu_count() or 1
+        self._lock = threading.Lock(); self._used = 0
+
+    def acquire(self, concurrent=1):
+        """Reserve an equal share for one of ``concurrent`` stages, limited to what is still free."""
+        with self._lock:
+            n = max(1, min(self.total // max(1, concurrent), self.total - self._used))
+            self._used += n
+            return n
+
+    def release(self, n):
+        with self._lock: self._used = max(0, self._used - n)
+
+def with_thread_flags(cmd, threads):
+    """Return ``cmd`` with the thread-count options of ffmpeg or the COLMAP subcommand added."""
+    cmd = list(cmd); exe = Path(str(cmd[0])).name.lower()
+    if "ffmpeg" in exe and "-i" in cmd and "-threads" not in cmd:
+        i = cmd.index("-i"); cmd[i:i] = ["-threads", str(threads), "-filter_threads", str(threads)]
+    elif "colmap" in exe and len(cmd) > 1 and cmd[1] in COLMAP_THREAD_FLAGS and COLMAP_THREAD_FLAGS[cmd[1]] not in cmd:
+        cmd += [COLMAP_THREAD_FLAGS[cmd[1]], str(threads)]
+    return cmd
+
+def run_cmd(cmd_list, cwd=None, log_fn=None, on_start=None, sched=None):
+    """Run a command, stream output, and on Windows retry COLMAP if Qt/GL fallback is needed.
+
+    ``on_start`` is called with each started Popen object so callers can terminate it.
+    ``sched`` (nice/ionice/affinity, see stage_sched) is applied via sched_prefix before exec.
+    """
+    # Präfix nur, wenn das Tool selbst auffindbar ist; sonst bleibt der FileNotFoundError von Popen erhalten.
+    prefix, done = sched_prefix(sched) if shutil.which(str(cmd_list[0])) else ([], [])
+    if done and log_fn: log_fn(f"[SCHED] {', '.join(done)}")
     def _popen(env=None):
-        return subprocess.Popen(cmd_list, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                universal_newlines=True, bufsize=1, env=env)
+        kwargs = dict(PROCESS_GROUP_KWARGS)
+        if os.name == "nt" and sched and int(sched.get("nice") or 0) > 0:
+            kwargs["creationflags"] |= subprocess.IDLE_PRIORITY_CLASS if int(sched["nice"]) >= 15 else subprocess.BELOW_NORMAL_PRIORITY_CLASS
+        return subprocess.Popen(prefix + list(cmd_list), cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                universal_newlines=True, bufsize=1, env=env, **kwargs)
     # Prepare env for first attempt (inject Qt paths for COLMAP/GLOMAP on Windows)
     env = None
     try:
@@ -766,6 +1041,7 @@ def run_cmd(cmd_list, cwd=None, log_fn=None):
     except FileNotFoundError as e:
         if log_fn: log_fn(f"[ERROR] {e}")
         return 1
+    if on_start: on_start(proc)
     lines = []
     for line in proc.stdout:
         s = line.rstrip()
@@ -784,6 +1060,7 @@ def run_cmd(cmd_list, cwd=None, log_fn=None):
             env2['QT_OPENGL'] = 'software'
             try:
                 proc2 = _popen(env2)
+                if on_start: on_start(proc2)
                 for line in proc2.stdout:
                     s = line.rstrip()
                     if log_fn: log_fn(s)
@@ -796,6 +1073,62 @@ def run_cmd(cmd_list, cwd=None, log_fn=None):
     return rc
 
 
+def _signal_process_group(proc, kill):
+    if os.name == "nt":
+        cmd = ["taskkill", "/T", "/PID", str(proc.pid)] + (["/F"] if kill else [])
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        os.killpg(proc.pid, signal.SIGKILL if kill else signal.SIGTERM)
+
+def terminate_procs(procs, grace=5.0):
+    """Terminate running Popens with their process groups, escalating to kill after ``grace`` seconds."""
+    running = [p for p in procs if p is not None and p.poll() is None]
+    for proc in running:
+        try: _signal_process_group(proc, kill=False)
+        except Exception: pass
+    deadline = time.monotonic() + grace
+    for proc in running:
+        try: proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            try: _signal_process_group(proc, kill=True)
+            except Exception:
+                try: proc.kill()
+                except Exception: pass
+        except Exception:
+            pass
+
+def terminate_proc(proc, grace=5.0):
+    """Terminate a running Popen and its process group, escalating to kill after ``grace`` seconds."""
+    terminate_procs([proc], grace)
+
+def snapshot_outputs(cmd):
+    """Output paths of a tool command (--output_path, the stereo maps of --workspace_path, ffmpeg image pattern)
+    with their current entries."""
+    outs = [Path(cmd[i + 1]) for i, arg in enumerate(cmd[:-1]) if arg == "--output_path"]
+    outs += [Path(cmd[i + 1]) / "stereo" / sub for i, arg in enumerate(cmd[:-1]) if arg == "--workspace_path"
+             for sub in DENSE_STEREO_SUBDIRS]
+    if "%" in str(cmd[-1]): outs.append(Path(cmd[-1]).parent)
+    return {p: (set(p.iterdir()) if p.is_dir() else p.exists()) for p in outs}
+
+# patch_match_stereo schreibt in diese (von image_undistorter angelegten) Ordner
+DENSE_STEREO_SUBDIRS = ("depth_maps", "normal_maps", "consistency_graphs")
+
+def remove_partial_outputs(snapshot, started):
+    """Remove what a cancelled command created or modified since ``started`` (epoch seconds)."""
+    def _rm(p):
+        if p.is_dir(): shutil.rmtree(p, ignore_errors=True)
+        else: p.unlink(missing_ok=True)
+    for path, before in snapshot.items():
+        try:
+            if isinstance(before, set):
+                for child in (path.iterdir() if path.is_dir() else ()):
+                    if child not in before or child.stat().st_mtime >= started: _rm(child)
+            elif path.exists() and (not before or path.stat().st_mtime >= started):
+                _rm(path)
+        except OSError:
+            pass
+
+
 def run_and_capture(cmd_list, cwd=None):
     try:
         res = subprocess.run(cmd_list, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
@@ -870,6 +1203,1823 @@ def pkg_install(pm, pkgs, log_fn):
         return 1
     return subprocess.run(wrapped).returncode
 
+# --- COLMAP-Datenbank ---
+# Liest database.db read-only per sqlite3.
+def colmap_db_connect(db_path):
+    """Open a COLMAP database read-only."""
+    return sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+
+def colmap_db_image_count(db_path) -> int:
+    """Return the number of images in a COLMAP database (0 if unreadable)."""
+    try:
+        con = colmap_db_connect(db_path)
+        try:
+            return int(con.execute("SELECT COUNT(*) FROM images").fetchone()[0])
+        finally:
+            con.close()
+    except Exception:
+        return 0
+
+# --- COLMAP-Modell (binär) ---
+# Liest cameras.bin / images.bin / points3D.bin direkt per mmap + struct, ohne einen
+# COLMAP-Prozess zu starten. Punkt-Arrays zeigen ohne Kopie in die Datei: mit NumPy als
+# strukturierte np.frombuffer-Sichten, sonst als memoryview-Slices.
+ColmapCamera = collections.namedtuple("ColmapCamera", ["id", "model", "width", "height", "params"])
+ColmapImage = collections.namedtuple("ColmapImage", ["id", "qvec", "tvec", "camera_id", "name", "points2d"])
+ColmapPoint3D = collections.namedtuple("ColmapPoint3D", ["id", "xyz", "rgb", "error", "track"])
+
+# model_id -> (Name, Anzahl Parameter), siehe colmap/sensor/models.h
+COLMAP_CAMERA_MODELS = {
+    0: ("SIMPLE_PINHOLE", 3), 1: ("PINHOLE", 4), 2: ("SIMPLE_RADIAL", 4), 3: ("RADIAL", 5),
+    4: ("OPENCV", 8), 5: ("OPENCV_FISHEYE", 8), 6: ("FULL_OPENCV", 12), 7: ("FOV", 5),
+    8: ("SIMPLE_RADIAL_FISHEYE", 4), 9: ("RADIAL_FISHEYE", 5), 10: ("THIN_PRISM_FISHEYE", 12),
+    11: ("RAD_TAN_THIN_PRISM_FISHEYE", 16),
+}
+
+POINT2D_DTYPE = np.dtype([("x", "<f8"), ("y", "<f8"), ("point3D_id", "<i8")]) if np is not None else None
+TRACK_DTYPE = np.dtype([("image_id", "<i4"), ("point2D_idx", "<i4")]) if np is not None else None
+
+def _records(buf, off, count, size, dtype):
+    """Zero-copy view of ``count`` fixed-size records: structured array with NumPy, else memoryview."""
+    if dtype is None: return buf[off:off + size * count]
+    return np.frombuffer(buf, dtype=dtype, count=count, offset=off)
+
+def record_count(view, size):
+    """Number of records in a points2d/track view."""
+    return len(view) if hasattr(view, "dtype") else len(view) // size
+
+def iter_records(view, fmt):
+    """Tuples of a points2d (<ddq) or track (<ii) view."""
+    return view.tolist() if hasattr(view, "dtype") else struct.iter_unpack(fmt, view)
+
+def _map_file(path):
+    """Return a read-only memoryview over a file (empty files yield an empty view)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"")
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+def read_cameras_bin(path):
+    buf = _map_file(path); off = 8
+    cameras = {}
+    for _ in range(struct.unpack_from("<Q", buf, 0)[0]):
+        cam_id, model_id, width, height = struct.unpack_from("<iiQQ", buf, off); off += 24
+        name, n_params = COLMAP_CAMERA_MODELS[model_id]
+        params = struct.unpack_from(f"<{n_params}d", buf, off); off += 8 * n_params
+        cameras[cam_id] = ColmapCamera(cam_id, name, width, height, params)
+    return cameras
+
+def read_images_bin(path):
+    """Read images.bin; ``points2d`` is a zero-copy view of (x, y, point3D_id) records (<ddq, POINT2D_DTYPE)."""
+    buf = _map_file(path); off = 8
+    images = {}
+    for _ in range(struct.unpack_from("<Q", buf, 0)[0]):
+        img_id, qw, qx, qy, qz, tx, ty, tz, cam_id = struct.unpack_from("<i7di", buf, off); off += 64
+        end = off
+        while buf[end] != 0: end += 1
+        name = bytes(buf[off:end]).decode("utf-8"); off = end + 1
+        n_pts = struct.unpack_from("<Q", buf, off)[0]; off += 8
+        images[img_id] = ColmapImage(img_id, (qw, qx, qy, qz), (tx, ty, tz), cam_id, name, _records(buf, off, n_pts, 24, POINT2D_DTYPE))
+        off += 24 * n_pts
+    return images
+
+def read_points3d_bin(path):
+    """Read points3D.bin; ``track`` is a zero-copy view of (image_id, point2D_idx) records (<ii, TRACK_DTYPE)."""
+    buf = _map_file(path); off = 8
+    points = {}
+    for _ in range(struct.unpack_from("<Q", buf, 0)[0]):
+        pid, x, y, z, r, g, b, err, n_track = struct.unpack_from("<Q3d3BdQ", buf, off); off += 51
+        points[pid] = ColmapPoint3D(pid, (x, y, z), (r, g, b), err, _records(buf, off, n_track, 8, TRACK_DTYPE))
+        off += 8 * n_track
+    return points
+
+def read_colmap_model(model_dir):
+    """Read a binary COLMAP/GLOMAP model; returns (cameras, images, points3D)."""
+    model_dir = Path(model_dir)
+    return (read_cameras_bin(model_dir / "cameras.bin"), read_images_bin(model_dir / "images.bin"),
+            read_points3d_bin(model_dir / "points3D.bin"))
+
+def _fmt_floats(values):
+    return " ".join(repr(float(v)) for v in values)
+
+def write_colmap_model_txt(model, out_dir):
+    """Write cameras.txt / images.txt / points3D.txt in COLMAP's text format."""
+    cameras, images, points = model
+    out_dir = Path(out_dir); out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "cameras.txt", "w", encoding="utf-8") as f:
+        f.write("# Camera list with one line of data per camera:\n#   CAMERA_ID, MODEL, WIDTH, HEIGHT, PARAMS[]\n")
+        f.write(f"# Number of cameras: {len(cameras)}\n")
+        for cam in cameras.values():
+            f.write(f"{cam.id} {cam.model} {cam.width} {cam.height} {_fmt_floats(cam.params)}\n")
+    n_obs = sum(record_count(img.points2d, 24) for img in images.values())
+    with open(out_dir / "images.txt", "w", encoding="utf-8") as f:
+        f.write("# Image list with two lines of data per image:\n"
+                "#   IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME\n#   POINTS2D[] as (X, Y, POINT3D_ID)\n")
+        f.write(f"# Number of images: {len(images)}, mean observations per image: {n_obs / len(images) if images else 0}\n")
+        for img in images.values():
+            f.write(f"{img.id} {_fmt_floats(img.qvec)} {_fmt_floats(img.tvec)} {img.camera_id} {img.name}\n")
+            f.write(" ".join(f"{x!r} {y!r} {pid}" for x, y, pid in iter_records(img.points2d, "<ddq")) + "\n")
+    n_track = sum(record_count(p.track, 8) for p in points.values())
+    with open(out_dir / "points3D.txt", "w", encoding="utf-8") as f:
+        f.write("# 3D point list with one line of data per point:\n"
+                "#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n")
+        f.write(f"# Number of points: {len(points)}, mean track length: {n_track / len(points) if points else 0}\n")
+        for p in points.values():
+            track = " ".join(f"{i} {j}" for i, j in iter_records(p.track, "<ii"))
+            f.write(f"{p.id} {_fmt_floats(p.xyz)} {p.rgb[0]} {p.rgb[1]} {p.rgb[2]} {p.error!r} {track}\n")
+
+def colmap_db_images(db_path):
+    """Image name -> (image_id, camera_id) of a COLMAP database."""
+    con = colmap_db_connect(db_path)
+    try:
+        return {name: (img_id, cam_id) for img_id, name, cam_id in con.execute("SELECT image_id, name, camera_id FROM images")}
+    finally:
+        con.close()
+
+def align_model_to_db(model, db_rows):
+    """Renumber images and cameras of ``model`` by image name to match a database (``colmap_db_images``).
+
+    Returns a model with known poses only (no 2D/3D points), as point_triangulator expects it;
+    raises ValueError if an image is missing from the database.
+    """
+    cameras, images, _ = model
+    missing = [img.name for img in images.values() if img.name not in db_rows]
+    if missing: raise ValueError(f"{len(missing)} Bild(er) fehlen in der Datenbank, z. B. {missing[0]}")
+    new_cameras, new_images = {}, {}
+    for img in sorted(images.values(), key=lambda img: db_rows[img.name][0]):
+        img_id, cam_id = db_rows[img.name]
+        new_cameras.setdefault(cam_id, cameras[img.camera_id]._replace(id=cam_id))
+        new_images[img_id] = img._replace(id=img_id, camera_id=cam_id, points2d=_records(memoryview(b""), 0, 0, 24, POINT2D_DTYPE))
+    return new_cameras, new_images, {}
+
+def model_db_mismatches(model, db_rows):
+    """Names of model images whose image/camera ID differs from the database."""
+    return [img.name for img in model[1].values() if db_rows.get(img.name) != (img.id, img.camera_id)]
+
+def model_stats(model):
+    """Registered images, 3D points, observations, mean track length and mean reprojection error."""
+    _, images, points = model
+    obs = sum(record_count(p.track, 8) for p in points.values())
+    return {
+        "registered": len(images),
+        "points": len(points),
+        "observations": obs,
+        "mean_track_length": round(obs / len(points), 4) if points else 0.0,
+        "mean_reproj_error": round(statistics.fmean(p.error for p in points.values()), 4) if points else float("inf"),
+    }
+
+def colmap_model_stats(model_dir):
+    """Stats of a binary model directory, or None if it is missing or unreadable."""
+    try:
+        return model_stats(read_colmap_model(model_dir))
+    except Exception:
+        return None
+
+# COLMAP kodiert Bildpaare als pair_id = id1 * 2147483647 + id2 (id1 < id2).
+COLMAP_MAX_IMAGE_ID = 2147483647
+
+def pair_id_to_image_ids(pair_id):
+    id2 = pair_id % COLMAP_MAX_IMAGE_ID
+    return (pair_id - id2) // COLMAP_MAX_IMAGE_ID, id2
+
+def colmap_db_stats(db_path):
+    """Return image names, keypoint counts per image and verified matches per pair."""
+    con = colmap_db_connect(db_path)
+    try:
+        images = {int(i): n for i, n in con.execute("SELECT image_id, name FROM images")}
+        keypoints = {int(i): int(r) for i, r in con.execute("SELECT image_id, rows FROM keypoints")}
+        pairs = []
+        try:
+            for pair_id, rows in con.execute("SELECT pair_id, rows FROM two_view_geometries WHERE rows > 0"):
+                pairs.append((*pair_id_to_image_ids(int(pair_id)), int(rows)))
+        except sqlite3.OperationalError:
+            pass  # noch nicht gematcht
+    finally:
+        con.close()
+    return {"images": images, "keypoints": keypoints, "verified_pairs": pairs}
+
+# --- Frühabbruch-Prüfungen ---
+# Günstige Checks zwischen den Stufen, bevor Mapper und Dense-Stufen Zeit kosten.
+def check_feature_gate(db, cfg):
+    """Return (ok, message) for the keypoint distribution after feature extraction."""
+    kp = list(db["keypoints"].values())
+    if not kp:
+        return False, "keine Keypoints in der Datenbank"
+    min_kp = int(cfg.get("gate_min_keypoints", 300))
+    low = sum(1 for k in kp if k < min_kp) / len(kp)
+    msg = f"Keypoints/Bild Median {statistics.median(kp):.0f}, {low:.0%} der Bilder unter {min_kp}"
+    return low <= float(cfg.get("gate_max_low_keypoint_fraction", 0.3)), msg
+
+def match_graph_components(image_ids, pairs, min_matches):
+    """Count connected components of the verified match graph (isolated images count as components)."""
+    parent = {i: i for i in image_ids}
+    def _find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]; x = parent[x]
+        return x
+    for a, b, rows in pairs:
+        if rows >= min_matches and a in parent and b in parent:
+            ra, rb = _find(a), _find(b)
+            if ra != rb: parent[ra] = rb
+    return len({_find(i) for i in parent})
+
+def check_match_gate(db, cfg, overlap):
+    """Return (ok, message) for neighbour coverage and connectivity after matching."""
+    order = {img_id: idx for idx, (img_id, _) in enumerate(sorted(db["images"].items(), key=lambda kv: kv[1]))}
+    if not order:
+        return False, "keine Bilder in der Datenbank"
+    min_matches = int(cfg.get("gate_min_pair_matches", 30))
+    linked = set()
+    for a, b, rows in db["verified_pairs"]:
+        if rows >= min_matches and a in order and b in order and abs(order[a] - order[b]) <= max(1, int(overlap)):
+            linked.update((a, b))
+    frac = len(linked) / len(order)
+    comps = match_graph_components(order.keys(), db["verified_pairs"], min_matches)
+    msg = f"{frac:.0%} der Bilder mit verifizierten Nachbar-Matches, {comps} Zusammenhangskomponente(n)"
+    ok = frac >= float(cfg.get("gate_min_neighbour_fraction", 0.8)) and comps <= int(cfg.get("gate_max_components", 3))
+    return ok, msg
+
+# --- Gemeinsame Projektdateien ---
+# stage_times.json, stage_memory.json, intrinsics_library.json und metrics_summary.csv im
+# Scenes-Ordner schreiben GUI und Worker gleichzeitig: Lesen, Zusammenführen und Schreiben
+# geschehen unter <Datei>.lock (O_EXCL), ersetzt wird atomar über eine temporäre Datei. Eine
+# Sperre, die SHARED_LOCK_STALE_S lang unverändert bleibt (Absturz), wird wie eine abgelaufene
+# Lease per Umbenennen übernommen; gemessen wird mit der eigenen Uhr.
+SHARED_LOCK_STALE_S = 10.0
+
+def write_file_atomic(path, text):
+    path = Path(path); tmp = path.with_name(f"{path.name}.{platform.node()}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f: f.write(text); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _acquire_file_lock(lock, stale_s):
+    seen = None
+    while True:
+        try: os.close(os.open(str(lock), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)); return
+        except FileExistsError: pass
+        try: st = lock.stat(); sig = (st.st_ino, st.st_mtime_ns)
+        except OSError: continue
+        if not seen or seen[0] != sig: seen = (sig, time.monotonic())
+        elif time.monotonic() - seen[1] >= stale_s:
+            stale = lock.with_name(f"{lock.name}.{platform.node()}.{os.getpid()}.{threading.get_ident()}.stale")
+            try: os.rename(lock, stale); st = stale.stat()
+            except OSError: seen = None; continue
+            if (st.st_ino, st.st_mtime_ns) != sig:  # inzwischen neu belegt: zurückstellen
+                try: os.link(stale, lock)
+                except OSError: pass
+            stale.unlink(missing_ok=True); seen = None; continue
+        time.sleep(0.05)
+
+def update_shared_file(path, update, load, dump):
+    """Read-merge-write a project file shared by GUI and workers under a lock file; returns the merged content."""
+    lock = Path(f"{path}.lock"); _acquire_file_lock(lock, SHARED_LOCK_STALE_S)
+    try:
+        data = load(path); update(data)
+        write_file_atomic(path, dump(data))
+        return data
+    finally:
+        lock.unlink(missing_ok=True)
+
+def dump_json(data):
+    return json.dumps(data, indent=2)
+
+# --- Rekonstruktions-Metriken ---
+# Pro Szene: Keypoints/Bild, verifizierte Matches/Paar, registrierte Bilder, 3D-Punkte,
+# Track-Länge, Reprojektionsfehler. Ergebnis als metrics.json im Szenenordner;
+# metrics_summary.csv sammelt eine Zeile pro Szene über alle Läufe und Worker.
+METRICS_FILE = "metrics.json"
+METRICS_SUMMARY_FILE = "metrics_summary.csv"
+METRICS_FIELDS = ["scene", "images_total", "images_registered", "registered_ratio", "keypoints_mean",
+                  "keypoints_median", "keypoints_min", "verified_pairs", "matches_per_pair_mean",
+                  "points3d", "mean_track_length", "mean_reproj_error"]
+
+def compute_scene_metrics(scene_dir):
+    """Collect reconstruction quality metrics for one scene directory."""
+    scene_dir = Path(scene_dir)
+    metrics = {k: None for k in METRICS_FIELDS}; metrics["scene"] = scene_dir.name
+    db_path = scene_dir / "database.db"
+    if db_path.exists():
+        try:
+            db = colmap_db_stats(db_path)
+        except Exception:
+            db = None
+        if db:
+            kp = list(db["keypoints"].values()); matches = [r for _, _, r in db["verified_pairs"]]
+            metrics["images_total"] = len(db["images"])
+            if kp:
+                metrics["keypoints_mean"] = round(statistics.fmean(kp), 1)
+                metrics["keypoints_median"] = statistics.median(kp)
+                metrics["keypoints_min"] = min(kp)
+            metrics["verified_pairs"] = len(matches)
+            if matches: metrics["matches_per_pair_mean"] = round(statistics.fmean(matches), 1)
+    model = colmap_model_stats(scene_dir / "sparse" / "0")
+    if model:
+        metrics["images_registered"] = model["registered"]
+        metrics["points3d"] = model.get("points")
+        metrics["mean_track_length"] = model.get("mean_track_length")
+        metrics["mean_reproj_error"] = model.get("mean_reproj_error")
+        if metrics["images_total"]:
+            metrics["registered_ratio"] = round(model["registered"] / metrics["images_total"], 4)
+    return metrics
+
+def write_scene_metrics(scene_dir, metrics):
+    with open(Path(scene_dir) / METRICS_FILE, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+
+def _csv_number(text):
+    if text in (None, ""): return None
+    try: return int(text)
+    except ValueError: pass
+    try: return float(text)
+    except ValueError: return text
+
+def read_metrics_summary(path):
+    """Rows of metrics_summary.csv with numbers parsed; [] if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f: rows = list(csv.DictReader(f))
+    except OSError:
+        return []
+    return [{k: v if k == "scene" else _csv_number(v) for k, v in r.items() if k in METRICS_FIELDS} for r in rows if r.get("scene")]
+
+def write_metrics_summary(scenes_dir, rows):
+    """Merge one CSV row per scene into the summary (a newer row replaces the scene's old one); returns all rows."""
+    def _merge(existing):
+        index = {r["scene"]: i for i, r in enumerate(existing)}
+        for row in rows:
+            if row["scene"] in index: existing[index[row["scene"]]] = row
+            else: index[row["scene"]] = len(existing); existing.append(row)
+    def _dump(all_rows):
+        buf = io.StringIO()
+        w = csv.DictWriter(buf, fieldnames=METRICS_FIELDS, extrasaction="ignore"); w.writeheader()
+        for row in all_rows: w.writerow(row)
+        return buf.getvalue()
+    return update_shared_file(Path(scenes_dir) / METRICS_SUMMARY_FILE, _merge, read_metrics_summary, _dump)
+
+def find_metric_outliers(rows, cfg):
+    """Return {scene: [reasons]} for absolute threshold misses and batch outliers (median ± 3 MAD)."""
+    out = {}
+    def _flag(scene, reason): out.setdefault(scene, []).append(reason)
+    for r in rows:
+        ratio, err, kp = r.get("registered_ratio"), r.get("mean_reproj_error"), r.get("keypoints_median")
+        if ratio is None: _flag(r["scene"], "kein Modell")
+        elif ratio < cfg.get("metrics_min_registered_ratio", 0.9): _flag(r["scene"], f"registriert {ratio:.0%}")
+        if err is not None and err > cfg.get("metrics_max_reproj_error", 1.5): _flag(r["scene"], f"Reprojektionsfehler {err:.2f}px")
+        if kp is not None and kp < cfg.get("metrics_min_keypoints", 500): _flag(r["scene"], f"Keypoints/Bild {kp:.0f}")
+    if len(rows) >= 3:
+        for key in ("keypoints_median", "matches_per_pair_mean", "mean_track_length", "mean_reproj_error"):
+            vals = [r[key] for r in rows if r.get(key) is not None]
+            if len(vals) < 3: continue
+            med = statistics.median(vals); mad = statistics.median(abs(v - med) for v in vals)
+            if mad <= 0: continue
+            for r in rows:
+                v = r.get(key)
+                if v is not None and abs(v - med) > 3 * mad:
+                    _flag(r["scene"], f"{key}={v} (Median {med})")
+    return out
+
+# --- ffprobe ---
+def ffprobe_path(ffmpeg):
+    """Return the ffprobe executable next to ffmpeg, falling back to PATH."""
+    if ffmpeg:
+        exe = Path(ffmpeg)
+        cand = exe.with_name(exe.name.lower().replace("ffmpeg", "ffprobe"))
+        if cand.exists(): return str(cand)
+    return which_first(["ffprobe.exe", "ffprobe"] if IS_WINDOWS else ["ffprobe"])
+
+def _parse_rate(rate):
+    try:
+        num, _, den = str(rate).partition("/")
+        return float(num) / float(den or 1) if float(den or 1) else None
+    except (TypeError, ValueError):
+        return None
+
+def ffprobe_video_info(ffmpeg, video_path):
+    """Return fps, frame count, duration, size and metadata tags of the first video stream (or None)."""
+    probe = ffprobe_path(ffmpeg)
+    if not probe: return None
+    code, out = run_and_capture([probe, "-v", "error", "-select_streams", "v:0",
+                                 "-show_entries", "stream=width,height,r_frame_rate,avg_frame_rate,nb_frames,duration:stream_tags:format=duration:format_tags",
+                                 "-of", "json", str(video_path)])
+    if code != 0: return None
+    try:
+        data = json.loads(out); stream = (data.get("streams") or [{}])[0]; fmt = data.get("format") or {}
+    except (ValueError, IndexError):
+        return None
+    fps = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+    try: duration = float(stream.get("duration") or fmt.get("duration") or 0) or None
+    except ValueError: duration = None
+    try: nb_frames = int(stream.get("nb_frames") or 0) or None
+    except ValueError: nb_frames = None
+    if nb_frames is None and fps and duration: nb_frames = int(round(fps * duration))
+    tags = {**(fmt.get("tags") or {}), **(stream.get("tags") or {})}
+    return {"fps": fps, "nb_frames": nb_frames, "duration": duration,
+            "width": stream.get("width"), "height": stream.get("height"), "tags": tags}
+
+# --- Extraktions-Info ---
+# extraction.json im Szenenordner merkt sich Video, Sampling und fps, damit Export,
+# Interpolation und spätere Läufe Bildnamen auf Quell-Frames zurückführen können.
+EXTRACTION_FILE = "extraction.json"
+
+def load_extraction_info(scene_dir):
+    try:
+        with open(Path(scene_dir) / EXTRACTION_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_extraction_info(scene_dir, info):
+    with open(Path(scene_dir) / EXTRACTION_FILE, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+
+def image_source_frame(name, step):
+    """Map an extracted image name to its 0-based source frame.
+
+    frame_%06d.jpg is the 1-based output order of the sampled extraction, src_%06d.jpg
+    (densify) carries the source frame directly.
+    """
+    m = re.search(r"src_(\d+)\.jpg$", Path(name).name, re.IGNORECASE)
+    if m: return int(m.group(1))
+    m = re.search(r"frame_(\d+)\.jpg$", Path(name).name, re.IGNORECASE)
+    if not m: return None
+    return (int(m.group(1)) - 1) * max(1, int(step))
+
+def densify_pairs(new_frames, solved_frames, neighbours=2):
+    """Match pairs for densify: each new frame against its nearest solved frames on both sides
+    and against the previous new frame. Both arguments map source frame -> image name."""
+    solved = sorted(solved_frames); pairs = []; prev = None
+    for src in sorted(new_frames):
+        idx = bisect.bisect_left(solved, src)
+        for s in solved[max(0, idx - neighbours):idx + neighbours]:
+            pairs.append((new_frames[src], solved_frames[s]))
+        if prev is not None:
+            pairs.append((new_frames[prev], new_frames[src]))
+        prev = src
+    return pairs
+
+# --- Gemeinsame Rekonstruktion mehrerer Videos ---
+# Jedes Video liegt als Unterordner images/<video>/ in einer gemeinsamen Datenbank. Innerhalb
+# eines Videos sequenzielle Paare, zwischen Videos wenige Paare nach Ähnlichkeit winziger
+# Graustufen-Proxies (normierte Kreuzkorrelation). Mit NumPy als Matrixprodukt über alle Proxies,
+# sonst grob gegen höchstens CROSS_MAX_CANDIDATES Proxies pro Video und fein um die besten Treffer.
+THUMB_SIZE = 16
+CROSS_MAX_CANDIDATES = 256
+
+def sequential_pairs(names, overlap):
+    return [(names[i], names[j]) for i in range(len(names)) for j in range(i + 1, min(len(names), i + 1 + overlap))]
+
+def ffmpeg_thumbnails(ffmpeg, img_dir, size=THUMB_SIZE):
+    """Return {image name: zero-mean unit-length grayscale vector} for frame_*.jpg in img_dir."""
+    names = sorted(p.name for p in Path(img_dir).glob("frame_*.jpg"))
+    if not names: return {}
+    start = image_source_frame(names[0], 1) + 1
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin", "-start_number", str(start),
+           "-i", str(Path(img_dir) / "frame_%06d.jpg"), "-vf", f"scale={size}:{size}:flags=area,format=gray",
+           "-f", "rawvideo", "-pix_fmt", "gray", "-"]
+    try:
+        raw = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+    except Exception:
+        return {}
+    n = size * size; thumbs = {}
+    for name, off in zip(names, range(0, len(raw) - n + 1, n)):
+        px = raw[off:off + n]; mean = sum(px) / n
+        vec = [v - mean for v in px]; norm = math.sqrt(sum(v * v for v in vec))
+        if norm > 0: thumbs[name] = [v / norm for v in vec]
+    return thumbs
+
+def cross_video_pairs(thumbs, stride=5, per_frame=2):
+    """Sparse pairs between videos: every stride-th frame of each video against its per_frame
+    most similar proxies in every other video. thumbs maps video -> {image name: vector}."""
+    pairs = set(); names = {video: sorted(own) for video, own in thumbs.items() if own}
+    mats = {video: np.asarray([thumbs[video][n] for n in ns], dtype=np.float32) for video, ns in names.items()} if np is not None else None
+    for a, own_names in names.items():
+        queries = own_names[::max(1, stride)]
+        for b, other_names in names.items():
+            if b == a: continue
+            if mats is not None:
+                best = top_matches_np(mats[a][::max(1, stride)], mats[b], other_names, per_frame)
+            else:
+                best = [top_matches(thumbs[a][q], thumbs[b], other_names, per_frame) for q in queries]
+            for qname, matches in zip(queries, best):
+                pairs.update(tuple(sorted((qname, name))) for name in matches)
+    return sorted(pairs)
+
+def top_matches_np(queries, candidates, names, k):
+    """Names of the k most similar (positive NCC) candidates per query row (NumPy)."""
+    scores = queries @ candidates.T; k = min(k, len(names))
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [[names[j] for j in row if scores[i, j] > 0] for i, row in enumerate(top)]
+
+def top_matches(q, other, names, k, max_candidates=CROSS_MAX_CANDIDATES):
+    """Names of the k most similar (positive NCC) proxies in ``other``: every n-th coarsely, then their neighbours."""
+    dot = lambda j: sum(x * y for x, y in zip(q, other[names[j]]))
+    step = max(1, math.ceil(len(names) / max_candidates))
+    coarse = sorted(range(0, len(names), step), key=dot, reverse=True)[:k]
+    fine = {j for c in coarse for j in range(max(0, c - step + 1), min(len(names), c + step))}
+    return [names[j] for score, j in sorted(((dot(j), j) for j in fine), reverse=True)[:k] if score > 0]
+
+def model_subset(model, prefix):
+    """Restrict a model to the images whose name starts with prefix (one video of a joint scene)."""
+    cameras, images, points = model
+    return cameras, {k: img for k, img in images.items() if img.name.startswith(prefix)}, points
+
+# --- Dense-Keyframes ---
+# Videoframes sind stark redundant; für image_undistorter/patch_match_stereo reicht eine
+# überdeckende Teilmenge des Sparse-Modells (Auswahl in Bildnamen-, also Zeitreihenfolge).
+def select_dense_keyframes(model, baseline_ratio=0.05, max_angle=10.0, min_overlap=0.6):
+    """Return the sorted image names of a covering keyframe subset of a sparse model."""
+    _, images, points = model
+    views = []; depths = []
+    for img in sorted(images.values(), key=lambda im: im.name):
+        R = qvec_to_rotmat(img.qvec); t = img.tvec
+        center = [-sum(R[k][i] * t[k] for k in range(3)) for i in range(3)]
+        pids = {pid for _, _, pid in iter_records(img.points2d, "<ddq") if pid != -1 and pid in points}
+        for pid in itertools.islice(pids, 50):
+            X = points[pid].xyz; z = sum(R[2][k] * X[k] for k in range(3)) + t[2]
+            if z > 0: depths.append(z)
+        views.append((img.name, center, R[2], pids))
+    if not views: return []
+    min_baseline = baseline_ratio * (statistics.median(depths) if depths else 1.0)
+    cos_max = math.cos(math.radians(max_angle))
+    keys = [views[0]]
+    for view in views[1:]:
+        _, center, axis, pids = view; _, k_center, k_axis, k_pids = keys[-1]
+        baseline = math.dist(center, k_center)
+        cos_angle = sum(a * b for a, b in zip(axis, k_axis))
+        overlap = len(pids & k_pids) / len(k_pids) if k_pids else 0.0
+        if baseline > min_baseline or cos_angle < cos_max or overlap < min_overlap:
+            keys.append(view)
+    if keys[-1] is not views[-1]: keys.append(views[-1])
+    return [name for name, _, _, _ in keys]
+
+# --- Dense-Profile ---
+# "preview": reduzierte Auflösung, wenige Iterationen, nur photometrisch; "final": COLMAP-Standard
+# mit geometrischer Konsistenz. Tiefenkarten eines früheren Laufs mit gleicher Signatur
+# (Profil, Bildauswahl, Sparse-Modell) werden wiederverwendet.
+DENSE_PROFILES = {
+    "final": {"undistort": [], "patch_match": ["--PatchMatchStereo.geom_consistency", "1"],
+              "fusion": ["--input_type", "geometric"]},
+    "preview": {"undistort": ["--max_image_size", "1000"],
+                "patch_match": ["--PatchMatchStereo.max_image_size", "1000", "--PatchMatchStereo.num_iterations", "3",
+                                "--PatchMatchStereo.geom_consistency", "0"],
+                "fusion": ["--input_type", "photometric"]},
+}
+DENSE_SIGNATURE_FILE = "stereo_signature.json"
+
+def dense_profile_max_size(profile):
+    """PatchMatchStereo.max_image_size of a dense profile, or None for full resolution."""
+    args = DENSE_PROFILES[profile]["patch_match"]; flag = "--PatchMatchStereo.max_image_size"
+    return int(args[args.index(flag) + 1]) if flag in args else None
+
+def dense_signature(sparse_model_dir, profile, image_list=None):
+    """Fingerprint of everything the depth maps depend on."""
+    h = hashlib.sha1()
+    for name in ("cameras.bin", "images.bin"):
+        with open(Path(sparse_model_dir) / name, "rb") as f:
+            h.update(f.read())
+    if image_list: h.update(Path(image_list).read_bytes())
+    return {"profile": profile, "undistort": DENSE_PROFILES[profile]["undistort"],
+            "patch_match": DENSE_PROFILES[profile]["patch_match"], "inputs": h.hexdigest()}
+
+def dense_depth_maps_reusable(dense_dir, signature):
+    """True if dense_dir holds complete depth maps computed with the same signature."""
+    try:
+        with open(Path(dense_dir) / DENSE_SIGNATURE_FILE, "r", encoding="utf-8") as f:
+            if json.load(f) != signature: return False
+    except Exception:
+        return False
+    kind = DENSE_PROFILES[signature["profile"]]["fusion"][-1]
+    images = [p for p in (Path(dense_dir) / "images").rglob("*") if p.is_file()]
+    depth_dir = Path(dense_dir) / "stereo" / "depth_maps"
+    return bool(images) and all((depth_dir / p.relative_to(Path(dense_dir) / "images")).with_name(f"{p.name}.{kind}.bin").exists()
+                                for p in images)
+
+# --- Punktwolken-Ausdünnung ---
+# fused.ply (binary_little_endian) wird per mmap gelesen, auf ein Voxel-Raster gemittelt und
+# Voxel mit zu wenigen belegten Nachbarn (Ausreißer) verworfen, bevor der Mesher läuft.
+# Mit NumPy vektorisiert (Voxel-Schlüssel als int64, np.unique), sonst in reinem Python.
+_PLY_TYPES = {"char": "b", "int8": "b", "uchar": "B", "uint8": "B", "short": "h", "int16": "h",
+              "ushort": "H", "uint16": "H", "int": "i", "int32": "i", "uint": "I", "uint32": "I",
+              "float": "f", "float32": "f", "double": "d", "float64": "d"}
+_PLY_TYPE_NAMES = {"b": "char", "B": "uchar", "h": "short", "H": "ushort", "i": "int", "I": "uint", "f": "float", "d": "double"}
+
+def read_ply_header(buf):
+    """Return (vertex count, [(property, struct code)], data offset) of a binary little-endian PLY."""
+    head = bytes(buf[:65536]); end = head.find(b"end_header\n")
+    if not head.startswith(b"ply") or end < 0:
+        raise ValueError("keine PLY-Datei")
+    count = None; props = []; in_vertex = False
+    for line in head[:end].decode("ascii").splitlines()[1:]:
+        parts = line.split()
+        if not parts: continue
+        if parts[0] == "format" and parts[1] != "binary_little_endian":
+            raise ValueError(f"PLY-Format {parts[1]} nicht unterstützt")
+        if parts[0] == "element":
+            if count is None and parts[1] != "vertex":
+                raise ValueError("PLY: vertex muss das erste Element sein")
+            in_vertex = parts[1] == "vertex"
+            if in_vertex: count = int(parts[2])
+        elif parts[0] == "property" and in_vertex:
+            if parts[1] == "list": raise ValueError("PLY: Listen-Properties bei Vertices nicht unterstützt")
+            props.append((parts[2], _PLY_TYPES[parts[1]]))
+    if count is None:
+        raise ValueError("PLY ohne Vertices")
+    return count, props, end + len(b"end_header\n")
+
+def sparse_extent(points, lo=0.05, hi=0.95):
+    """Diagonal of the lo..hi percentile box of sparse 3D points (robust scene scale)."""
+    if not points: return 0.0
+    axes = [sorted(p.xyz[k] for p in points.values()) for k in range(3)]
+    n = len(axes[0]) - 1
+    return math.dist([a[int(lo * n)] for a in axes], [a[int(hi * n)] for a in axes])
+
+def _ply_vertex_header(props, count):
+    return ("ply\nformat binary_little_endian 1.0\n"
+            f"element vertex {count}\n"
+            + "".join(f"property {_PLY_TYPE_NAMES[c]} {n}\n" for n, c in props)
+            + "end_header\n").encode("ascii")
+
+def _decimate_np(src, dst, count, props, off, voxel, min_neighbours):
+    """NumPy variant of decimate_point_cloud; None if the voxel grid does not fit into int64 keys."""
+    dtype = np.dtype([(n, "<" + c) for n, c in props])
+    data = np.fromfile(src, dtype=dtype, count=count, offset=off)
+    if not len(data):
+        with open(dst, "wb") as f: f.write(_ply_vertex_header(props, 0))
+        return 0
+    cells = np.floor(np.stack([data["x"], data["y"], data["z"]], axis=1).astype(np.float64) / voxel).astype(np.int64)
+    lo = cells.min(axis=0) - 1; dims = cells.max(axis=0) - lo + 2  # Rand von 1, damit Nachbarn nicht überlaufen
+    if float(dims[0]) * float(dims[1]) * float(dims[2]) >= 2 ** 62: return None
+    keys = ((cells[:, 0] - lo[0]) * dims[1] + (cells[:, 1] - lo[1])) * dims[2] + (cells[:, 2] - lo[2])
+    del cells
+    uniq, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel(); del keys
+    neighbours = np.zeros(len(uniq), dtype=np.int32)
+    for dx, dy, dz in itertools.product((-1, 0, 1), repeat=3):
+        if (dx, dy, dz) == (0, 0, 0): continue
+        probe = uniq + (dx * dims[1] + dy) * dims[2] + dz
+        idx = np.minimum(np.searchsorted(uniq, probe), len(uniq) - 1)
+        neighbours += uniq[idx] == probe
+    keep = neighbours >= min_neighbours
+    out = np.empty(int(keep.sum()), dtype=dtype); means = {}
+    for n, c in props:
+        means[n] = (np.bincount(inverse, weights=data[n].astype(np.float64), minlength=len(uniq)) / counts)[keep]
+    if {"nx", "ny", "nz"} <= set(means):
+        length = np.sqrt(means["nx"] ** 2 + means["ny"] ** 2 + means["nz"] ** 2); length[length == 0] = 1.0
+        for n in ("nx", "ny", "nz"): means[n] /= length
+    for n, c in props: out[n] = means[n] if c in "fd" else np.rint(means[n])
+    with open(dst, "wb") as f:
+        f.write(_ply_vertex_header(props, len(out))); out.tofile(f)
+    return len(out)
+
+def decimate_point_cloud(src, dst, voxel, min_neighbours=2):
+    """Voxel-grid downsample a PLY point cloud and drop voxels with fewer than min_neighbours
+    occupied neighbours (26-neighbourhood). Returns (points in, points out)."""
+    buf = _map_file(src)
+    count, props, off = read_ply_header(buf)
+    if np is not None:
+        kept = _decimate_np(src, dst, count, props, off, voxel, min_neighbours)
+        if kept is not None: return count, kept
+    names = [n for n, _ in props]; fmt = "<" + "".join(c for _, c in props); size = struct.calcsize(fmt)
+    ix, iy, iz = names.index("x"), names.index("y"), names.index("z")
+    inv = 1.0 / voxel; cells = {}
+    for rec in struct.iter_unpack(fmt, buf[off:off + count * size]):
+        key = (math.floor(rec[ix] * inv), math.floor(rec[iy] * inv), math.floor(rec[iz] * inv))
+        acc = cells.get(key)
+        if acc is None: cells[key] = [1, *rec]
+        else:
+            acc[0] += 1
+            for k, v in enumerate(rec, start=1): acc[k] += v
+    offsets = [d for d in itertools.product((-1, 0, 1), repeat=3) if d != (0, 0, 0)]
+    keep = [acc for (x, y, z), acc in cells.items()
+            if sum((x + dx, y + dy, z + dz) in cells for dx, dy, dz in offsets) >= min_neighbours]
+    normals = [names.index(n) for n in ("nx", "ny", "nz")] if {"nx", "ny", "nz"} <= set(names) else None
+    with open(dst, "wb") as f:
+        f.write(_ply_vertex_header(props, len(keep)))
+        for acc in keep:
+            vals = [v / acc[0] for v in acc[1:]]
+            if normals:
+                length = math.sqrt(sum(vals[k] * vals[k] for k in normals)) or 1.0
+                for k in normals: vals[k] /= length
+            f.write(struct.pack(fmt, *(v if c in "fd" else int(round(v)) for v, (_, c) in zip(vals, props))))
+    return count, len(keep)
+
+def proc_status_kb(pid, field):
+    """Read a kB field (e.g. VmRSS, VmHWM) from /proc/<pid>/status; None where unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"): return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def available_memory_kb():
+    """Available physical memory in KiB (Linux /proc/meminfo, Windows GlobalMemoryStatusEx), else None."""
+    if os.name == "nt":
+        try:
+            import ctypes
+            class _MemoryStatusEx(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong)] + \
+                           [(n, ctypes.c_ulonglong) for n in ("ullTotalPhys", "ullAvailPhys", "ullTotalPageFile", "ullAvailPageFile",
+                                                               "ullTotalVirtual", "ullAvailVirtual", "ullAvailExtendedVirtual")]
+            st = _MemoryStatusEx(); st.dwLength = ctypes.sizeof(st)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(st)): return st.ullAvailPhys // 1024
+        except Exception:
+            pass
+        return None
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"): return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def watch_process_memory(proc, result, interval=0.5, min_available_kb=None):
+    """Poll the peak RSS of a running process into result["peak_kb"] (Linux) until it exits.
+
+    With ``min_available_kb`` the process is terminated once available memory drops below it,
+    before the OOM killer steps in; result["oom_guard"] is set in that case.
+    """
+    def _poll():
+        while proc.poll() is None:
+            kb = proc_status_kb(proc.pid, "VmHWM")
+            if kb: result["peak_kb"] = max(kb, result.get("peak_kb", 0))
+            avail = available_memory_kb() if min_available_kb else None
+            if avail is not None and avail < min_available_kb:
+                result["oom_guard"] = True; terminate_proc(proc, grace=3.0); return
+            time.sleep(interval)
+    threading.Thread(target=_poll, daemon=True).start()
+
+# --- Speicherbedarf schwerer Stufen ---
+# Spitzen-RAM pro Arbeitseinheit (patch_match_stereo/stereo_fusion: kB pro Megapixel der
+# Dense-Bilder, Mesher: kB pro MB Eingabe-PLY). Startwerte, danach gemessene Werte aus
+# stage_memory.json im Scenes-Ordner (Maximum der letzten Läufe).
+STAGE_MEMORY_FILE = "stage_memory.json"
+DEFAULT_STAGE_MEMORY = {"patch_match_stereo": 30000, "stereo_fusion": 15000, "poisson_mesher": 60000, "delaunay_mesher": 80000}
+
+def load_stage_memory(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def estimate_stage_memory(history, stage, workload, margin=1.2):
+    """Estimated peak memory (KiB) of a stage for the given workload, or None."""
+    if not workload: return None
+    ratio = max(history.get(stage) or [DEFAULT_STAGE_MEMORY.get(stage, 0)])
+    return int(ratio * workload * margin) or None
+
+def record_stage_memory(history, stage, workload, peak_kb, keep=20):
+    history[stage] = (history.get(stage) or [])[-(keep - 1):] + [round(peak_kb / workload, 1)]
+
+# --- Warteschlange ---
+# Priorität (hoch/normal/niedrig) geht vor; innerhalb einer Stufe entscheidet die Listenreihenfolge
+# oder – mit SJF – die kürzeste erwartete Laufzeit. Aging: wer aging_s Sekunden wartet, steigt
+# eine Prioritätsstufe, damit lange oder niedrig priorisierte Jobs nicht verhungern.
+QUEUE_PRIORITIES = {"high": 1, "normal": 0, "low": -1}
+
+def next_job(pending, priorities, expected, waited, sjf=False, aging_s=1800.0, deferred=()):
+    """Index into ``pending`` of the video to run next; deferred videos only when nothing else is left."""
+    def _key(item):
+        idx, video = item
+        prio = priorities.get(video, 0) + (int(waited.get(video, 0) // aging_s) if aging_s > 0 else 0)
+        cost = expected.get(video) if sjf else 0
+        return (video in deferred, -prio, float("inf") if cost is None else cost, idx)
+    return min(enumerate(pending), key=_key)[0] if pending else None
+
+# --- Ordnerüberwachung ---
+# Meldet neue oder geänderte Videos in "02 VIDEOS", sobald ihre Größe stable_s Sekunden lang
+# unverändert ist. Linux (lokales Dateisystem): inotify. Sonst Polling: der Ordner wird nur neu
+# gelistet, wenn sich seine mtime ändert (Datei neu, umbenannt, gelöscht); noch wachsende
+# Kandidaten werden einzeln per stat geprüft. Auf Netzlaufwerken meldet inotify Änderungen
+# anderer Rechner nicht, daher dort Polling. In-place überschriebene Dateien ändern die
+# Ordner-mtime nicht und fallen beim Polling erst beim seltenen Voll-Scan auf.
+VIDEO_EXTS = {".mp4", ".mov", ".avi", ".mkv", ".m4v", ".wmv", ".mpg", ".mpeg"}
+WATCH_RESCAN_S = 600
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "lustre",
+                    "fuse.sshfs", "fuse.glusterfs", "fuse.ceph", "davfs", "fuse.davfs2"}
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+IN_CREATE, IN_DELETE, IN_Q_OVERFLOW = 0x100, 0x200, 0x4000
+
+def mount_fs_type(path):
+    """Filesystem type of the mount containing ``path`` (Linux /proc/self/mounts), or None."""
+    try:
+        target = os.path.realpath(path); best, fstype = "", None
+        with open("/proc/self/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3: continue
+                mnt = parts[1].replace("\\040", " ")
+                if (target == mnt or target.startswith(mnt.rstrip("/") + "/")) and len(mnt) >= len(best):
+                    best, fstype = mnt, parts[2]
+        return fstype
+    except OSError:
+        return None
+
+class Inotify:
+    """Minimal ctypes binding of inotify for a single directory (Linux)."""
+    def __init__(self, path, mask):
+        import ctypes, ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(path)), ctypes.c_uint32(mask)) < 0:
+            err = ctypes.get_errno(); os.close(self.fd); raise OSError(err, "inotify_add_watch fehlgeschlagen")
+
+    def read(self, timeout):
+        """Events as (mask, file name) arriving within ``timeout`` seconds."""
+        if not select.select([self.fd], [], [], timeout)[0]: return []
+        try: buf = os.read(self.fd, 65536)
+        except BlockingIOError: return []
+        events, pos = [], 0
+        while pos + 16 <= len(buf):
+            _wd, mask, _cookie, size = struct.unpack_from("iIII", buf, pos)
+            events.append((mask, os.fsdecode(buf[pos + 16:pos + 16 + size].rstrip(b"\0"))))
+            pos += 16 + size
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class FolderWatcher:
+    """Background watcher reporting video files once their size has been stable for ``stable_s``.
+
+    Files present at start form the baseline and are only reported when they change later.
+    ``on_ready(path, changed)`` and ``log(text)`` are called on the watcher thread.
+    """
+    def __init__(self, folder, on_ready, stable_s=10.0, poll_s=2.0, mode="auto", exts=VIDEO_EXTS, log=None):
+        self.folder = Path(folder); self.on_ready = on_ready; self.stable_s = stable_s; self.poll_s = poll_s
+        self.exts = exts; self.log = log or (lambda text: None)
+        if mode == "auto":
+            mode = "inotify" if sys.platform.startswith("linux") and mount_fs_type(self.folder) not in NETWORK_FS_TYPES else "poll"
+        self.mode = mode
+        self._stop = threading.Event(); self._index = {}; self._pending = {}; self._dir_mtime = None
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start(); return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _scan(self, initial=False):
+        """List the folder once and diff it against the index."""
+        try: dir_mtime = self.folder.stat().st_mtime_ns
+        except OSError: return
+        seen = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for e in it:
+                    if Path(e.name).suffix.lower() in self.exts and e.is_file():
+                        st = e.stat(); seen[e.name] = (st.st_size, st.st_mtime_ns)
+        except OSError: return
+        # grobe mtime-Auflösung (FAT, SMB): eine gerade geänderte Ordner-mtime beim nächsten Mal erneut listen
+        self._dir_mtime = dir_mtime if time.time_ns() - dir_mtime > 2_000_000_000 else None
+        if initial: self._index = seen; return
+        for name, sig in seen.items():
+            if self._index.get(name) != sig: self._touch(name)
+        for name in set(self._index) - set(seen): self._forget(name)
+
+    def _touch(self, name):
+        if name in self._pending: return
+        try: st = (self.folder / name).stat()
+        except OSError: return
+        self._pending[name] = ((st.st_size, st.st_mtime_ns), time.monotonic())
+
+    def _forget(self, name):
+        self._index.pop(name, None); self._pending.pop(name, None)
+
+    def _check_pending(self):
+        now = time.monotonic()
+        for name, (sig, since) in list(self._pending.items()):
+            try: st = (self.folder / name).stat()
+            except OSError: self._pending.pop(name, None); continue
+            cur = (st.st_size, st.st_mtime_ns)
+            if cur != sig: self._pending[name] = (cur, now); continue
+            if now - since < self.stable_s: continue
+            del self._pending[name]
+            if self._index.get(name) == cur: continue
+            changed = name in self._index; self._index[name] = cur
+            try: self.on_ready(str(self.folder / name), changed)
+            except Exception as e: self.log(f"[WATCH] Fehler bei {name}: {e}")
+
+    def _loop(self):
+        ino = None
+        if self.mode == "inotify":
+            try: ino = Inotify(self.folder, IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+            except (OSError, AttributeError) as e:
+                self.log(f"[WATCH] inotify nicht verfügbar ({e}) – verwende Polling."); self.mode = "poll"
+        self._scan(initial=True); last_full = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if ino:
+                    for mask, name in ino.read(min(self.poll_s, 1.0)):
+                        if mask & IN_Q_OVERFLOW: self._scan()
+                        elif Path(name).suffix.lower() not in self.exts: continue
+                        elif mask & (IN_MOVED_FROM | IN_DELETE): self._forget(name)
+                        else: self._touch(name)
+                else:
+                    if self._stop.wait(self.poll_s): break
+                    try: dir_mtime = self.folder.stat().st_mtime_ns
+                    except OSError: continue
+                    if dir_mtime != self._dir_mtime or time.monotonic() - last_full >= WATCH_RESCAN_S:
+                        self._scan(); last_full = time.monotonic()
+                self._check_pending()
+        finally:
+            if ino: ino.close()
+
+# --- Job-Datenbank ---
+# jobs.db im Projektordner (SQLite im WAL-Modus, jede Änderung eine Transaktion): Warteschlange
+# mit Position und Priorität, Versuche pro Job und abgeschlossene Stufen mit Laufzeit. Ein beim
+# Start noch offener Versuch (Absturz, App geschlossen) wird als "interrupted" beendet; der Job
+# kommt zurück in die Warteschlange und setzt nach der letzten abgeschlossenen Stufe fort.
+JOB_DB_FILE = "jobs.db"
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY, video TEXT NOT NULL UNIQUE, state TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0, position INTEGER NOT NULL DEFAULT 0, completed TEXT NOT NULL DEFAULT '',
+    added REAL NOT NULL, updated REAL NOT NULL, error TEXT);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY, job_id INTEGER NOT NULL REFERENCES jobs(id), host TEXT, pid INTEGER,
+    started REAL NOT NULL, finished REAL, outcome TEXT);
+CREATE TABLE IF NOT EXISTS stages (
+    id INTEGER PRIMARY KEY, attempt_id INTEGER NOT NULL REFERENCES attempts(id), stage TEXT NOT NULL,
+    started REAL NOT NULL, seconds REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS attempts_job ON attempts(job_id);
+"""
+JOB_FINAL_STATES = ("done", "failed", "cancelled")
+
+class JobStore:
+    """Durable video queue with attempts and per-stage timings, safe to use from several threads."""
+    def __init__(self, path):
+        self.path = Path(path); self._lock = threading.Lock()
+        self._con = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL"); self._con.execute("PRAGMA synchronous=NORMAL")
+        with self._con: self._con.executescript(JOB_SCHEMA)
+
+    def _tx(self, fn):
+        with self._lock, self._con:
+            return fn(self._con)
+
+    def close(self):
+        with self._lock: self._con.close()
+
+    def sync_queue(self, videos, priorities):
+        """Mirror the queue order; new videos are queued, queued videos no longer listed are removed."""
+        def _sync(con):
+            now = time.time()
+            for pos, video in enumerate(videos):
+                con.execute("INSERT INTO jobs (video, position, priority, added, updated) VALUES (?, ?, ?, ?, ?) "
+                            "ON CONFLICT(video) DO UPDATE SET position=excluded.position, priority=excluded.priority, "
+                            "state=CASE WHEN state='removed' THEN 'queued' ELSE state END",
+                            (video, pos, priorities.get(video, 0), now, now))
+            listed = set(videos)
+            for (video,) in con.execute("SELECT video FROM jobs WHERE state='queued'").fetchall():
+                if video not in listed: con.execute("UPDATE jobs SET state='removed', updated=? WHERE video=?", (now, video))
+        self._tx(_sync)
+
+    def queued(self):
+        """Queued jobs in queue order as (video, priority, completed stages)."""
+        rows = self._tx(lambda con: con.execute("SELECT video, priority, completed FROM jobs WHERE state='queued' "
+                                                "ORDER BY position, id").fetchall())
+        return [(v, p, [s for s in c.split(",") if s]) for v, p, c in rows]
+
+    def recover(self):
+        """Close attempts left open by a crash; their jobs go back to the queue. Returns the videos."""
+        def _recover(con):
+            now = time.time()
+            con.execute("UPDATE attempts SET finished=?, outcome='interrupted' WHERE finished IS NULL", (now,))
+            videos = [v for (v,) in con.execute("SELECT video FROM jobs WHERE state='running'")]
+            con.execute("UPDATE jobs SET state='queued', updated=? WHERE state='running'", (now,))
+            return videos
+        return self._tx(_recover)
+
+    def begin(self, video):
+        """Start an attempt; returns (attempt id, stages already completed by earlier attempts)."""
+        def _begin(con):
+            now = time.time()
+            con.execute("INSERT INTO jobs (video, added, updated) VALUES (?, ?, ?) ON CONFLICT(video) DO NOTHING", (video, now, now))
+            job_id, state, completed = con.execute("SELECT id, state, completed FROM jobs WHERE video=?", (video,)).fetchone()
+            if state == "done": completed = ""  # erneuter Lauf eines fertigen Jobs beginnt von vorn
+            con.execute("UPDATE jobs SET state='running', completed=?, error=NULL, updated=? WHERE id=?", (completed, now, job_id))
+            cur = con.execute("INSERT INTO attempts (job_id, host, pid, started) VALUES (?, ?, ?, ?)",
+                              (job_id, platform.node(), os.getpid(), now))
+            return cur.lastrowid, [s for s in completed.split(",") if s]
+        return self._tx(_begin)
+
+    def stage_done(self, attempt_id, stage, started, seconds):
+        def _stage(con):
+            con.execute("INSERT INTO stages (attempt_id, stage, started, seconds) VALUES (?, ?, ?, ?)",
+                        (attempt_id, stage, started, seconds))
+            job_id, completed = con.execute("SELECT j.id, j.completed FROM jobs j JOIN attempts a ON a.job_id=j.id "
+                                            "WHERE a.id=?", (attempt_id,)).fetchone()
+            stages = [s for s in completed.split(",") if s]
+            if stage not in stages: stages.append(stage)
+            con.execute("UPDATE jobs SET completed=?, updated=? WHERE id=?", (",".join(stages), time.time(), job_id))
+        self._tx(_stage)
+
+    def invalidate(self, video):
+        """Forget completed stages, e.g. after the source video was replaced."""
+        self._tx(lambda con: con.execute("UPDATE jobs SET completed='', updated=? WHERE video=?", (time.time(), video)))
+
+    def finish(self, attempt_id, outcome, error=None):
+        """End an attempt: done/failed/cancelled are final job states, anything else re-queues the job."""
+        def _finish(con):
+            now = time.time()
+            con.execute("UPDATE attempts SET finished=?, outcome=? WHERE id=?", (now, outcome, attempt_id))
+            con.execute("UPDATE jobs SET state=?, error=?, updated=? WHERE id=(SELECT job_id FROM attempts WHERE id=?)",
+                        (outcome if outcome in JOB_FINAL_STATES else "queued", error, now, attempt_id))
+        self._tx(_finish)
+
+# --- Worker-Modus: Jobs über Lease-Dateien verteilen ---
+# Mehrere Rechner mit demselben Projekt-Share arbeiten "02 VIDEOS" ohne zentralen Dienst ab: ein
+# Worker belegt ein Video mit Scenes/.leases/<Video>.lease (O_EXCL, auch auf NFS/SMB atomar) und
+# erneuert die mtime der Lease regelmäßig (Heartbeat). Wer eine fremde Lease ttl Sekunden lang
+# unverändert sieht, übernimmt sie per Umbenennen (nur einer gewinnt); gemessen wird mit der
+# eigenen Uhr, Uhrabweichungen zwischen Rechnern spielen keine Rolle. Die Lease führt die
+# erledigten Stufen mit, der nächste Worker setzt dort fort. Ergebnis: <Video>.done/.failed;
+# ein abgebrochener Job geht als <Video>.queued zurück. jobs.db bleibt beim GUI, denn SQLite im
+# WAL-Modus funktioniert auf Netzlaufwerken nicht rechnerübergreifend.
+LEASE_DIR = ".leases"
+
+class LeaseQueue:
+    """Job queue on a shared filesystem: claim videos with lease files, heartbeat, take over expired leases.
+
+    Provides the JobStore methods the pipeline uses (begin, stage_done, finish); the attempt id is the video.
+    """
+    def __init__(self, videos_dir, scenes_dir, worker_id, ttl=60.0, max_attempts=3, stable_s=10.0, log=None):
+        self.videos_dir = Path(videos_dir); self.scenes_dir = Path(scenes_dir); self.dir = self.scenes_dir / LEASE_DIR
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id; self.ttl = ttl; self.max_attempts = max_attempts; self.stable_s = stable_s
+        self.log = log or (lambda text: None)
+        self._seen = {}; self._sizes = {}; self._held = {}; self._lock = threading.Lock()
+
+    def _path(self, video, suffix=".lease"):
+        return self.dir / (Path(video).stem + suffix)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, path, data, exclusive=False):
+        """Create ``path`` exclusively (claim) or replace it atomically (update)."""
+        payload = json.dumps(data, indent=2).encode("utf-8")
+        if exclusive:
+            fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            try: os.write(fd, payload); os.fsync(fd)
+            finally: os.close(fd)
+            return
+        tmp = path.with_name(f"{path.name}.{self.worker_id}.tmp")
+        with open(tmp, "wb") as f: f.write(payload); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _expired(self, path):
+        """True once the lease has been unchanged (inode, mtime, size) for ttl seconds on our clock."""
+        try: st = path.stat()
+        except OSError: return False
+        sig = (st.st_ino, st.st_mtime_ns, st.st_size); seen = self._seen.get(path.name)
+        if not seen or seen[0] != sig:
+            self._seen[path.name] = (sig, time.monotonic()); return False
+        return time.monotonic() - seen[1] >= self.ttl
+
+    def _stable(self, name, st, now):
+        """True once size and mtime have been unchanged for stable_s seconds (like FolderWatcher)."""
+        sig = (st.st_size, st.st_mtime_ns); seen = self._sizes.get(name)
+        if not seen or seen[0] != sig:
+            self._sizes[name] = seen = (sig, now)
+        return now - seen[1] >= self.stable_s
+
+    def pending(self, stable_only=True):
+        """Unfinished videos, oldest first. Existing scenes without a lease were processed in the GUI.
+
+        With ``stable_only`` a video is only offered once it is no longer being copied.
+        """
+        entries = []
+        try:
+            with os.scandir(self.videos_dir) as it:
+                for e in it:
+                    if Path(e.name).suffix.lower() not in VIDEO_EXTS: continue
+                    try:
+                        if e.is_file(): entries.append((e.stat(), e))
+                    except OSError: continue  # zwischen Auflisten und stat gelöscht oder umbenannt
+        except OSError: return []
+        now = time.monotonic(); videos = []
+        names = {e.name for _, e in entries}; self._sizes = {k: v for k, v in self._sizes.items() if k in names}
+        for st, e in sorted(entries, key=lambda x: (x[0].st_mtime, x[1].name)):
+            if any(self._path(e.path, sfx).exists() for sfx in (".done", ".failed")): continue
+            if (self.scenes_dir / Path(e.name).stem).exists() and not any(self._path(e.path, sfx).exists() for sfx in (".lease", ".queued")): continue
+            if not self._stable(e.name, st, now) and stable_only: continue
+            videos.append(e.path)
+        return videos
+
+    def claim(self):
+        """Claim the next free or expired job; returns the video or None."""
+        for video in self.pending():
+            if self.holds(video): continue
+            lease = self._path(video); queued = self._path(video, ".queued"); prior = self._read(queued); attempt = prior.get("attempt", 1)
+            if lease.exists():
+                if not self._expired(lease): continue
+                stale = self._take_over(lease)
+                if stale is None: continue
+                prior = stale; attempt = stale.get("attempt", 1) + 1
+                self.log(f"[WORKER] Lease von {stale.get('worker', '?')} für {Path(video).name} abgelaufen – übernehme (Versuch {attempt})")
+                if attempt > self.max_attempts:
+                    self._write(self._path(video, ".failed"), {"worker": self.worker_id, "finished": time.time(),
+                                "error": f"Lease {self.max_attempts}× abgelaufen (Worker abgestürzt?)"})
+                    continue
+            data = {"video": video, "worker": self.worker_id, "host": platform.node(), "pid": os.getpid(),
+                    "token": os.urandom(8).hex(), "attempt": attempt, "claimed": time.time(), "completed": prior.get("completed", [])}
+            try: self._write(lease, data, exclusive=True)
+            except FileExistsError: continue
+            queued.unlink(missing_ok=True)
+            if attempt > self.max_attempts:  # zu oft zurückgestellt; erst nach dem exklusiven Claim, damit nur ein Worker entscheidet
+                self.log(f"[WORKER] {Path(video).name} {self.max_attempts}× zurückgestellt – markiere als fehlgeschlagen")
+                self._write(self._path(video, ".failed"), {"worker": self.worker_id, "attempt": attempt, "finished": time.time(),
+                            "error": f"{self.max_attempts}× zurückgestellt (zu wenig Plattenplatz)"})
+                lease.unlink(missing_ok=True); continue
+            with self._lock: self._held[video] = data
+            return video
+        return None
+
+    def _take_over(self, lease):
+        """Move an expired lease aside; returns its content, or None when another worker was faster."""
+        sig = self._seen.get(lease.name, (None,))[0]
+        stale = lease.with_name(f"{lease.name}.{self.worker_id}.stale")
+        try: os.rename(lease, stale)
+        except OSError: return None
+        try: st = stale.stat(); moved = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError: return None
+        data = self._read(stale)
+        if moved != sig:  # in der Zwischenzeit erneuert oder neu belegt: zurückstellen
+            try: os.link(stale, lease)
+            except OSError: pass
+            stale.unlink(missing_ok=True); return None
+        stale.unlink(missing_ok=True); self._seen.pop(lease.name, None)
+        return data
+
+    def holds(self, video):
+        """True while this worker holds the lease of ``video``."""
+        return video in self._held
+
+    def owns(self, video):
+        held = self._held.get(video)
+        return bool(held) and self._read(self._path(video)).get("token") == held["token"]
+
+    def heartbeat(self):
+        """Renew all held leases; returns the videos whose lease was lost."""
+        lost = []
+        for video in list(self._held):
+            if not self.owns(video):
+                lost.append(video)
+                with self._lock: self._held.pop(video, None)
+                continue
+            try: os.utime(self._path(video))
+            except OSError: pass
+        return lost
+
+    def begin(self, video):
+        held = self._held.get(video)
+        return video, list(held["completed"]) if held else []
+
+    def stage_done(self, video, stage, started, seconds):
+        with self._lock:
+            held = self._held.get(video)
+            if not held or stage in held["completed"]: return
+            held["completed"].append(stage)
+        if self.owns(video): self._write(self._path(video), held)
+
+    def finish(self, video, outcome, error=None):
+        """done/failed leave a marker; anything else (cancelled, deferred) puts the job back as .queued.
+
+        A deferral counts as an attempt, so a job that never fits is marked failed after max_attempts.
+        """
+        with self._lock: held = self._held.pop(video, None)
+        if not held or self._read(self._path(video)).get("token") != held["token"]: return
+        if outcome in ("done", "failed"):
+            self._write(self._path(video, f".{outcome}"), {"worker": self.worker_id, "attempt": held["attempt"],
+                                                            "finished": time.time(), "error": error})
+            self._path(video).unlink(missing_ok=True)
+        elif outcome == "deferred":
+            self._write(self._path(video, ".queued"), {**held, "attempt": held["attempt"] + 1})
+            self._path(video).unlink(missing_ok=True)
+        else:
+            os.replace(self._path(video), self._path(video, ".queued"))
+
+    def sync_queue(self, videos, priorities): pass
+    def invalidate(self, video): pass
+    def close(self): pass
+
+# --- Zeitmodell und Deadline-Planer ---
+# Laufzeit einer Stufe = Rate × Arbeitsmenge. Raten lernen aus früheren Läufen (stage_times.json
+# im Scenes-Ordner, Median der letzten Läufe); die Startwerte sind grobe Erfahrungswerte.
+# Der Planer wählt aus Sampling, Skalierung, max_image_size, Overlap, Mapper und Dense-Profil
+# die Kombination mit der höchsten Qualität, deren Vorhersage ins Zeitbudget passt.
+STAGE_TIME_FILE = "stage_times.json"
+TIMING_FILE = "timing.json"
+DEFAULT_STAGE_TIMES = {                          # Sekunden pro Einheit
+    "extract": 0.01,                             # Quell-Frame
+    "features_gpu": 0.05, "features_cpu": 0.6,   # Bild-Megapixel (nach max_image_size)
+    "matching_gpu": 0.01, "matching_cpu": 0.08,  # Bildpaar × Megapixel
+    "mapper_glomap": 0.15, "mapper_colmap": 0.8, # Bild
+    "dense": 2.0,                                # Dense-Megapixel (Undistort + PatchMatch + Fusion)
+    "mesh": 60.0,                                # Szene
+}
+PLAN_STAGES = ("extract", "features", "matching", "mapper", "dense", "mesh")
+# Nach einer Stufe stehen diese Parameter fest und werden beim Nachplanen nicht mehr verändert
+PLAN_FIXED_AFTER = {"extract": ("step", "long_side"), "features": ("max_image_size",), "matching": ("overlap",),
+                    "mapper": ("mapper",), "dense": ("dense_profile",)}
+PLAN_STEPS = (1, 2, 3, 4, 6, 8, 12)
+PLAN_LONG_SIDES = (1920, 1280, 960)
+PLAN_MAX_SIZES = (2048, 1600, 1024)
+PLAN_OVERLAPS = (10, 6)
+DENSE_KEYFRAME_SHARE = 0.3  # grobe Annahme für den Anteil Dense-Keyframes
+
+def load_stage_times(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def stage_time_rate(history, key):
+    return statistics.median(history.get(key) or [DEFAULT_STAGE_TIMES[key]])
+
+def record_stage_time(history, key, workload, seconds, keep=20):
+    if workload > 0: history[key] = (history.get(key) or [])[-(keep - 1):] + [round(seconds / workload, 6)]
+
+def plan_workloads(plan, video):
+    """Rate key and workload of every stage a plan runs.
+
+    ``video`` holds nb_frames, width and height, optionally the real image count after extraction
+    (images) and the share of images used for dense reconstruction (dense_share).
+    """
+    w, h = video["width"], video["height"]; long = plan["long_side"]; short = long * min(w, h) / max(w, h)
+    images = video.get("images") or max(1, video["nb_frames"] // plan["step"])
+    eff = min(plan["max_image_size"], long); mp = eff * eff * short / long / 1e6
+    dev = "gpu" if plan["use_gpu"] else "cpu"
+    work = {"extract": ("extract", video["nb_frames"]), "features": (f"features_{dev}", images * mp),
+            "matching": (f"matching_{dev}", images * plan["overlap"] * mp), "mapper": (f"mapper_{plan['mapper']}", images)}
+    if plan.get("dense_profile"):
+        dense_long = min(long, dense_profile_max_size(plan["dense_profile"]) or long)
+        work["dense"] = ("dense", images * video.get("dense_share", DENSE_KEYFRAME_SHARE) * dense_long * dense_long * short / long / 1e6)
+        work["mesh"] = ("mesh", 1)
+    return work
+
+def predict_stage_times(plan, video, history, done=()):
+    return {stage: stage_time_rate(history, key) * load for stage, (key, load) in plan_workloads(plan, video).items()
+            if stage not in done}
+
+def plan_quality(plan, video):
+    """Bigger is better: more frames first, then feature resolution, overlap and the final dense profile."""
+    images = max(1, video["nb_frames"] // plan["step"])
+    return (math.log2(images) + 0.8 * math.log2(min(plan["max_image_size"], plan["long_side"]))
+            + 0.3 * math.log2(plan["overlap"]) + (1.0 if plan.get("dense_profile") == "final" else 0.0))
+
+def plan_for_budget(video, choices, budget, history, done=()):
+    """Best plan from ``choices`` (option lists per parameter) whose predicted remaining time fits ``budget``.
+
+    Returns (plan, predicted, fits); without a fitting plan the fastest one is returned with fits=False.
+    """
+    keys = list(choices); best = fastest = None
+    for values in itertools.product(*(choices[k] for k in keys)):
+        plan = dict(zip(keys, values)); plan["max_image_size"] = min(plan["max_image_size"], plan["long_side"])
+        total = sum(predict_stage_times(plan, video, history, done).values())
+        if fastest is None or total < fastest[1]: fastest = (plan, total)
+        if total <= budget:
+            rank = (plan_quality(plan, video), -total)
+            if best is None or rank > best[1]: best = (plan, rank)
+    plan, fits = (best[0], True) if best else (fastest[0], False)
+    return plan, predict_stage_times(plan, video, history, done), fits
+
+def plan_choices(video, step, long_side, max_img, overlap, use_gpu, mappers, dense_profile, scale_free=True):
+    """Option lists for the planner, never better than the user's own settings."""
+    long = min(long_side, max(video["width"], video["height"]))
+    longs = [long] + ([l for l in PLAN_LONG_SIDES if l < long] if scale_free else [])
+    top = min(max_img, long)
+    return {"step": [s for s in PLAN_STEPS if s >= step] or [step], "long_side": longs,
+            "max_image_size": [top] + [m for m in PLAN_MAX_SIZES if m < top],
+            "overlap": [overlap] + [o for o in PLAN_OVERLAPS if o < overlap], "use_gpu": [use_gpu], "mapper": list(mappers),
+            "dense_profile": [None] if not dense_profile else ["final", "preview"] if dense_profile == "final" else ["preview"]}
+
+def dense_megapixels(dense_dir, max_size=None):
+    """Total megapixels of the undistorted images, optionally capped at max_size per side."""
+    total = 0.0
+    for p in (Path(dense_dir) / "images").rglob("*"):
+        size = jpeg_size(p) if p.is_file() else None
+        if not size: continue
+        w, h = size; scale = min(1.0, max_size / max(w, h)) if max_size else 1.0
+        total += w * h * scale * scale / 1e6
+    return total
+
+def sparse_megapixels(model_dir, max_size=None, image_list=None):
+    """Megapixels the undistorter will write for a sparse model (before undistortion runs)."""
+    cameras = read_cameras_bin(Path(model_dir) / "cameras.bin")
+    names = set(Path(image_list).read_text(encoding="utf-8").splitlines()) if image_list else None
+    total = 0.0
+    for img in read_images_bin(Path(model_dir) / "images.bin").values():
+        if names is not None and img.name not in names: continue
+        cam = cameras[img.camera_id]; scale = min(1.0, max_size / max(cam.width, cam.height)) if max_size else 1.0
+        total += cam.width * cam.height * scale * scale / 1e6
+    return total
+
+# --- Plattenplatz ---
+# Projektion des Platzbedarfs pro Video (Frames aus einer Stichprobe, Datenbank, Dense-Workspace)
+# und Aufräumen regenerierbarer Zwischenstände fertiger Szenen, wenn der Platz knapp wird.
+DB_BYTES_PER_IMAGE = 1.2e6          # Keypoints + Deskriptoren (~8k SIFT-Features) + Matches
+DENSE_BYTES_PER_PIXEL = 32          # Tiefen- und Normalenkarten, photometrisch + geometrisch
+RETENTION_PATHS = ["dense/stereo", "dense/images", "dense/fused_decimated.ply", "database_proxy.db",
+                   "database_full.db", "sparse/0_proxy", "sparse/0_known", "_densify"]
+
+def project_scene_footprint(frames, jpeg_bytes, width, height, mesh=False, dense_fraction=0.35):
+    """Projected bytes per stage for a video of ``frames`` extracted images."""
+    return {"frames": frames * jpeg_bytes, "database": frames * DB_BYTES_PER_IMAGE,
+            "dense": frames * dense_fraction * (2 * jpeg_bytes + DENSE_BYTES_PER_PIXEL * width * height) if mesh else 0}
+
+def path_size(path):
+    path = Path(path)
+    if path.is_file(): return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) if path.is_dir() else 0
+
+def retention_cleanup(scenes_dir, need_bytes, exclude=(), keep_frames=True, log_fn=None):
+    """Delete regenerable intermediates of finished scenes (oldest first) until ``need_bytes``
+    are freed. Finished scenes are those with metrics.json; returns the freed bytes."""
+    scenes = [d for d in Path(scenes_dir).iterdir() if d.is_dir() and (d / METRICS_FILE).exists() and d.name not in exclude]
+    scenes.sort(key=lambda d: (d / METRICS_FILE).stat().st_mtime)
+    paths = RETENTION_PATHS + ([] if keep_frames else ["images"])
+    freed = 0
+    for rel in paths:  # zuerst die größten/unkritischsten Zwischenstände aller Szenen
+        for scene in scenes:
+            if freed >= need_bytes: return freed
+            target = scene / rel
+            if not target.exists(): continue
+            size = path_size(target)
+            if target.is_dir(): shutil.rmtree(target, ignore_errors=True)
+            else: target.unlink(missing_ok=True)
+            if rel == "dense/stereo": (scene / "dense" / DENSE_SIGNATURE_FILE).unlink(missing_ok=True)
+            freed += size
+            if log_fn: log_fn(f"[DISK] Aufgeräumt: {scene.name}/{rel} ({size / 1e9:.2f} GB)")
+    return freed
+
+# --- Autotuning ---
+# Mikro-Benchmarks (Feature-Extraktion + sequentielles Matching) auf einer kurzen Stichprobe
+# über max_image_size × Threads × GPU/CPU. Gewählt wird die schnellste Variante, deren
+# Match-Qualität nah an der besten liegt; Overlap = größter Frame-Abstand, der noch zuverlässig
+# verifiziert. Profile liegen pro Rechner neben settings.json, Schlüssel = Hardware + Tool-Versionen.
+AUTOTUNE_FILE = Path(__file__).resolve().parent / "autotune.json"
+AUTOTUNE_MAX_SIZES = (1024, 2048, 4096)
+AUTOTUNE_MAX_OVERLAP = 25
+
+def hardware_fingerprint():
+    """Return (fingerprint, description) from CPU, core count, RAM and GPU name."""
+    mem_kb = 0
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemTotal:"): mem_kb = int(line.split()[1]); break
+    except OSError:
+        pass
+    gpu = ""
+    if shutil.which("nvidia-smi"):
+        code, out = run_and_capture(["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"])
+        if code == 0: gpu = ", ".join(l.strip() for l in out.splitlines() if l.strip())
+    desc = f"{platform.system()} {platform.machine()} {platform.processor() or '?'}, {os.cpu_count()} CPUs, " \
+           f"{mem_kb // 1048576} GB RAM, GPU: {gpu or '-'}"
+    return hashlib.sha1(desc.encode("utf-8")).hexdigest()[:16], desc
+
+def tool_versions(*tools):
+    """First output line of each tool's version/help call."""
+    versions = []
+    for tool in tools:
+        if not tool: continue
+        code, out = run_and_capture([tool, "-version" if "ffmpeg" in Path(tool).name.lower() else "-h"])
+        versions.append(f"{Path(tool).name}: " + next((l.strip() for l in out.splitlines() if l.strip()), f"exit {code}"))
+    return versions
+
+def autotune_key(fingerprint, versions):
+    return hashlib.sha1("\n".join([fingerprint, *versions]).encode("utf-8")).hexdigest()[:16]
+
+def load_autotune_profiles(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def save_autotune_profiles(path, profiles):
+    tmp = Path(path).with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp, path)
+
+def autotune_grid(width, threads_total, gpu):
+    """Benchmark configurations; sizes above the frame width collapse into one full-resolution run."""
+    sizes = sorted({min(s, width) for s in AUTOTUNE_MAX_SIZES}) if width else list(AUTOTUNE_MAX_SIZES)
+    threads = sorted({threads_total, max(1, threads_total // 2)})
+    return [{"max_image_size": s, "threads": t, "use_gpu": g} for g in ((True, False) if gpu else (False,))
+            for s in sizes for t in threads]
+
+def _neighbour_distances(db, min_matches):
+    """Frame distance of every verified pair with at least ``min_matches`` inliers."""
+    order = {img_id: idx for idx, (img_id, _) in enumerate(sorted(db["images"].items(), key=lambda kv: kv[1]))}
+    return len(order), [abs(order[a] - order[b]) for a, b, rows in db["verified_pairs"]
+                        if rows >= min_matches and a in order and b in order]
+
+def match_quality(db, min_matches=30):
+    """Verified matches per image: mean inliers of adjacent pairs times the share of adjacent pairs that verify."""
+    order = {img_id: idx for idx, (img_id, _) in enumerate(sorted(db["images"].items(), key=lambda kv: kv[1]))}
+    if len(order) < 2: return 0.0
+    adjacent = [rows for a, b, rows in db["verified_pairs"]
+                if a in order and b in order and abs(order[a] - order[b]) == 1 and rows >= min_matches]
+    return sum(adjacent) / (len(order) - 1)
+
+def overlap_from_matches(db, min_matches=30, min_fraction=0.5, max_overlap=AUTOTUNE_MAX_OVERLAP):
+    """Largest frame distance up to which most pairs still verify; a longer window only costs matching time."""
+    n, dists = _neighbour_distances(db, min_matches)
+    counts = {}
+    for d in dists: counts[d] = counts.get(d, 0) + 1
+    overlap = 1
+    for d in range(1, min(max_overlap, n - 1) + 1):
+        if counts.get(d, 0) / (n - d) < min_fraction: break
+        overlap = d
+    return overlap
+
+def select_autotune_result(results, quality_ratio=0.8):
+    """Fastest successful run whose match quality reaches ``quality_ratio`` of the best one."""
+    ok = [r for r in results if r.get("quality", 0) > 0]
+    if not ok: return None
+    best_q = max(r["quality"] for r in ok)
+    return min((r for r in ok if r["quality"] >= quality_ratio * best_q), key=lambda r: r["seconds"])
+
+# --- Kamera-Mathematik ---
+def qvec_to_rotmat(q):
+    w, x, y, z = q
+    return [[1 - 2*y*y - 2*z*z, 2*x*y - 2*w*z, 2*x*z + 2*w*y],
+            [2*x*y + 2*w*z, 1 - 2*x*x - 2*z*z, 2*y*z - 2*w*x],
+            [2*x*z - 2*w*y, 2*y*z + 2*w*x, 1 - 2*x*x - 2*y*y]]
+
+def rotmat_to_qvec(R):
+    """Convert a rotation matrix to a unit quaternion (w, x, y, z) with w >= 0."""
+    tr = R[0][0] + R[1][1] + R[2][2]
+    if tr > 0:
+        s = math.sqrt(tr + 1.0) * 2
+        q = (0.25 * s, (R[2][1] - R[1][2]) / s, (R[0][2] - R[2][0]) / s, (R[1][0] - R[0][1]) / s)
+    elif R[0][0] > R[1][1] and R[0][0] > R[2][2]:
+        s = math.sqrt(1.0 + R[0][0] - R[1][1] - R[2][2]) * 2
+        q = ((R[2][1] - R[1][2]) / s, 0.25 * s, (R[0][1] + R[1][0]) / s, (R[0][2] + R[2][0]) / s)
+    elif R[1][1] > R[2][2]:
+        s = math.sqrt(1.0 + R[1][1] - R[0][0] - R[2][2]) * 2
+        q = ((R[0][2] - R[2][0]) / s, (R[0][1] + R[1][0]) / s, 0.25 * s, (R[1][2] + R[2][1]) / s)
+    else:
+        s = math.sqrt(1.0 + R[2][2] - R[0][0] - R[1][1]) * 2
+        q = ((R[1][0] - R[0][1]) / s, (R[0][2] + R[2][0]) / s, (R[1][2] + R[2][1]) / s, 0.25 * s)
+    n = math.sqrt(sum(c * c for c in q))
+    q = tuple(c / n for c in q)
+    return q if q[0] >= 0 else tuple(-c for c in q)
+
+def rotmat_to_euler_zxy(R):
+    """Euler angles in degrees for rotation order ZXY (Nuke default): R = Ry * Rx * Rz."""
+    sx = max(-1.0, min(1.0, -R[1][2]))
+    rx = math.asin(sx)
+    if abs(sx) < 0.999999:
+        ry = math.atan2(R[0][2], R[2][2]); rz = math.atan2(R[1][0], R[1][1])
+    else:  # Gimbal-Lock: Z auf 0 festhalten
+        ry = math.atan2(-R[2][0], R[0][0]); rz = 0.0
+    return tuple(math.degrees(a) for a in (rx, ry, rz))
+
+def qvec_to_rotmat_np(q):
+    """Vectorised qvec_to_rotmat for (N, 4) quaternions; returns (N, 3, 3)."""
+    w, x, y, z = np.asarray(q, dtype=np.float64).T
+    return np.stack([1 - 2*y*y - 2*z*z, 2*x*y - 2*w*z, 2*x*z + 2*w*y,
+                     2*x*y + 2*w*z, 1 - 2*x*x - 2*z*z, 2*y*z - 2*w*x,
+                     2*x*z - 2*w*y, 2*y*z + 2*w*x, 1 - 2*x*x - 2*y*y], axis=1).reshape(-1, 3, 3)
+
+def rotmat_to_qvec_np(R):
+    """Vectorised rotmat_to_qvec for (N, 3, 3) matrices (same branches); returns (N, 4) with w >= 0."""
+    r = lambda i, j: R[:, i, j]
+    tr = r(0, 0) + r(1, 1) + r(2, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):  # nicht gewählte Zweige dürfen NaN liefern
+        s0 = np.sqrt(tr + 1.0) * 2; s1 = np.sqrt(1.0 + r(0, 0) - r(1, 1) - r(2, 2)) * 2
+        s2 = np.sqrt(1.0 + r(1, 1) - r(0, 0) - r(2, 2)) * 2; s3 = np.sqrt(1.0 + r(2, 2) - r(0, 0) - r(1, 1)) * 2
+        cands = [np.stack([0.25 * s0, (r(2, 1) - r(1, 2)) / s0, (r(0, 2) - r(2, 0)) / s0, (r(1, 0) - r(0, 1)) / s0], axis=1),
+                 np.stack([(r(2, 1) - r(1, 2)) / s1, 0.25 * s1, (r(0, 1) + r(1, 0)) / s1, (r(0, 2) + r(2, 0)) / s1], axis=1),
+                 np.stack([(r(0, 2) - r(2, 0)) / s2, (r(0, 1) + r(1, 0)) / s2, 0.25 * s2, (r(1, 2) + r(2, 1)) / s2], axis=1),
+                 np.stack([(r(1, 0) - r(0, 1)) / s3, (r(0, 2) + r(2, 0)) / s3, (r(1, 2) + r(2, 1)) / s3, 0.25 * s3], axis=1)]
+    c0 = tr > 0; c1 = ~c0 & (r(0, 0) > r(1, 1)) & (r(0, 0) > r(2, 2)); c2 = ~c0 & ~c1 & (r(1, 1) > r(2, 2))
+    q = np.select([c0[:, None], c1[:, None], c2[:, None]], cands[:3], cands[3])
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return np.where(q[:, :1] >= 0, q, -q)
+
+def rotmat_to_euler_zxy_np(R):
+    """Vectorised rotmat_to_euler_zxy for (N, 3, 3) matrices; returns (N, 3) degrees."""
+    sx = np.clip(-R[:, 1, 2], -1.0, 1.0); regular = np.abs(sx) < 0.999999
+    ry = np.where(regular, np.arctan2(R[:, 0, 2], R[:, 2, 2]), np.arctan2(-R[:, 2, 0], R[:, 0, 0]))
+    rz = np.where(regular, np.arctan2(R[:, 1, 0], R[:, 1, 1]), 0.0)
+    return np.degrees(np.stack([np.arcsin(sx), ry, rz], axis=1))
+
+def camera_intrinsics(cam):
+    """Return fx, fy, cx, cy and distortion parameters of a ColmapCamera."""
+    p = list(cam.params)
+    if cam.model in ("SIMPLE_PINHOLE", "SIMPLE_RADIAL", "RADIAL", "SIMPLE_RADIAL_FISHEYE", "RADIAL_FISHEYE"):
+        return {"fx": p[0], "fy": p[0], "cx": p[1], "cy": p[2], "dist": p[3:]}
+    return {"fx": p[0], "fy": p[1], "cx": p[2], "cy": p[3], "dist": p[4:]}
+
+# --- Kamera-Track-Export ---
+# Wandelt registrierte Bilder (COLMAP world-to-camera, +Z Blickrichtung, Y nach unten) in
+# camera-to-world Posen mit -Z Blickrichtung / Y nach oben (Blender- und Nuke-Konvention).
+# Die Welt wird dazu um 180° um X gedreht, eine COLMAP-Identitätskamera bleibt so unrotiert.
+# Mit NumPy werden alle Frames auf einmal umgerechnet und zusätzlich als NPZ geschrieben.
+_FLIP_YZ = ((1, 0, 0), (0, -1, 0), (0, 0, -1))
+TRACK_CSV_FIELDS = ["frame", "source_frame", "image", "tx", "ty", "tz", "qw", "qx", "qy", "qz",
+                    "rx", "ry", "rz", "fx", "fy", "cx", "cy", "width", "height", "flag", "confidence"]
+
+def _matmul(A, B):
+    return [[sum(A[i][k] * B[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+
+def build_camera_track(model, step=1):
+    """Return per-frame camera poses sorted by source frame, quaternions sign-continuous."""
+    cameras, images, _ = model
+    regs = [(image_source_frame(img.name, step), img) for img in images.values()]
+    regs = sorted(((src, img) for src, img in regs if src is not None), key=lambda r: r[0])
+    if np is not None and regs: return _camera_track_np(cameras, regs)
+    frames = []
+    for src, img in regs:
+        R = qvec_to_rotmat(img.qvec); t = img.tvec
+        Rt = [[R[j][i] for j in range(3)] for i in range(3)]
+        center = [-sum(Rt[i][k] * t[k] for k in range(3)) for i in range(3)]
+        center = [center[0], -center[1], -center[2]]
+        R_c2w = _matmul(_FLIP_YZ, _matmul(Rt, _FLIP_YZ))
+        cam = cameras[img.camera_id]
+        frames.append({"frame": src + 1, "source_frame": src, "image": img.name,
+                       "location": center, "quaternion": list(rotmat_to_qvec(R_c2w)),
+                       "rotation_zxy": list(rotmat_to_euler_zxy(R_c2w)),
+                       "camera": {"model": cam.model, "width": cam.width, "height": cam.height, **camera_intrinsics(cam)}})
+    for prev, cur in zip(frames, frames[1:]):
+        if sum(a * b for a, b in zip(prev["quaternion"], cur["quaternion"])) < 0:
+            cur["quaternion"] = [-c for c in cur["quaternion"]]
+    return frames
+
+def _camera_track_np(cameras, regs):
+    """build_camera_track for all frames at once; ``regs`` are (source_frame, image) sorted by frame."""
+    Rt = qvec_to_rotmat_np([img.qvec for _, img in regs]).transpose(0, 2, 1)
+    flip = np.array([1.0, -1.0, -1.0])
+    centers = -np.einsum("nij,nj->ni", Rt, np.array([img.tvec for _, img in regs], dtype=np.float64)) * flip
+    R_c2w = Rt * flip[:, None] * flip[None, :]
+    quats = rotmat_to_qvec_np(R_c2w)
+    # Vorzeichen stetig halten: jedes Paar mit negativem Skalarprodukt kehrt alle folgenden um
+    dots = np.einsum("ni,ni->n", quats[:-1], quats[1:])
+    quats[1:] *= np.cumprod(np.where(dots < 0, -1.0, 1.0))[:, None]
+    eulers = rotmat_to_euler_zxy_np(R_c2w)
+    intr = {cid: {"model": cameras[cid].model, "width": cameras[cid].width, "height": cameras[cid].height,
+                  **camera_intrinsics(cameras[cid])} for cid in {img.camera_id for _, img in regs}}
+    return [{"frame": src + 1, "source_frame": src, "image": img.name, "location": loc, "quaternion": q,
+             "rotation_zxy": e, "camera": dict(intr[img.camera_id])}
+            for (src, img), loc, q, e in zip(regs, centers.tolist(), quats.tolist(), eulers.tolist())]
+
+def write_track_csv(frames, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f); w.writerow(TRACK_CSV_FIELDS)
+        for fr in frames:
+            c = fr["camera"]
+            w.writerow([fr["frame"], fr["source_frame"], fr["image"], *fr["location"], *fr["quaternion"],
+                        *fr["rotation_zxy"], c["fx"], c["fy"], c["cx"], c["cy"], c["width"], c["height"],
+                        fr.get("flag", "solved"), fr.get("confidence", 1.0)])
+
+def write_track_chan(frames, path):
+    """Nuke .chan: frame tx ty tz rx ry rz (degrees, rotation order ZXY)."""
+    with open(path, "w", encoding="utf-8") as f:
+        for fr in frames:
+            f.write(" ".join([str(fr["frame"])] + [f"{v:.6f}" for v in (*fr["location"], *fr["rotation_zxy"])]) + "\n")
+
+def write_track_json(frames, path, fps=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"fps": fps, "convention": "camera-to-world, camera looks -Z, Y up", "frames": frames}, f, indent=1)
+
+_BLENDER_SCRIPT = '''# AutoTracker camera track – in Blender: Scripting > Open > Run Script
+import json, bpy
+DATA = json.loads(%r)
+frames = DATA["frames"]
+cam0 = frames[0]["camera"]
+scene = bpy.context.scene
+if DATA.get("fps"):
+    scene.render.fps = max(1, round(DATA["fps"])); scene.render.fps_base = scene.render.fps / DATA["fps"]
+scene.render.resolution_x = cam0["width"]; scene.render.resolution_y = cam0["height"]
+scene.frame_start = frames[0]["frame"]; scene.frame_end = frames[-1]["frame"]
+data = bpy.data.cameras.new(%r)
+data.sensor_fit = "HORIZONTAL"; data.sensor_width = 36.0
+obj = bpy.data.objects.new(%r, data)
+scene.collection.objects.link(obj)
+obj.rotation_mode = "QUATERNION"
+for fr in frames:
+    c = fr["camera"]
+    obj.location = fr["location"]; obj.rotation_quaternion = fr["quaternion"]
+    obj.keyframe_insert("location", frame=fr["frame"]); obj.keyframe_insert("rotation_quaternion", frame=fr["frame"])
+    data.lens = c["fx"] * data.sensor_width / c["width"]
+    data.shift_x = -(c["cx"] - c["width"] / 2.0) / c["width"]
+    data.shift_y = (c["cy"] - c["height"] / 2.0) / c["width"]
+    for prop in ("lens", "shift_x", "shift_y"):
+        data.keyframe_insert(prop, frame=fr["frame"])
+scene.camera = obj
+'''
+
+def write_track_blender(frames, path, name, fps=None):
+    payload = json.dumps({"fps": fps, "frames": frames}, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_BLENDER_SCRIPT % (payload, name, name))
+
+def write_track_npz(frames, path, fps=None):
+    """NumPy archive: one array per CSV column, location (N, 3), quaternion (N, 4), rotation_zxy (N, 3)."""
+    cams = [fr["camera"] for fr in frames]
+    np.savez(path, fps=np.float64(fps or np.nan),
+             frame=np.array([fr["frame"] for fr in frames]), source_frame=np.array([fr["source_frame"] for fr in frames]),
+             image=np.array([fr["image"] for fr in frames], dtype=str),
+             location=np.array([fr["location"] for fr in frames], dtype=np.float64).reshape(-1, 3),
+             quaternion=np.array([fr["quaternion"] for fr in frames], dtype=np.float64).reshape(-1, 4),
+             rotation_zxy=np.array([fr["rotation_zxy"] for fr in frames], dtype=np.float64).reshape(-1, 3),
+             **{k: np.array([c[k] for c in cams]) for k in ("fx", "fy", "cx", "cy", "width", "height")},
+             flag=np.array([fr.get("flag", "solved") for fr in frames], dtype=str),
+             confidence=np.array([fr.get("confidence", 1.0) for fr in frames], dtype=np.float64))
+
+def export_camera_track(frames, out_dir, name, fps=None, suffix=""):
+    """Write CSV, Nuke .chan, JSON, a Blender script and (with NumPy) an NPZ; returns the written paths."""
+    out_dir = Path(out_dir); out_dir.mkdir(parents=True, exist_ok=True)
+    paths = [out_dir / f"{name}{suffix}.csv", out_dir / f"{name}{suffix}.chan",
+             out_dir / f"{name}{suffix}.json", out_dir / f"{name}{suffix}_blender.py"]
+    write_track_csv(frames, paths[0]); write_track_chan(frames, paths[1])
+    write_track_json(frames, paths[2], fps); write_track_blender(frames, paths[3], name, fps)
+    if np is not None:
+        paths.append(out_dir / f"{name}{suffix}.npz"); write_track_npz(frames, paths[4], fps)
+    return paths
+
+# --- Interpolation auf volle Framerate ---
+# Solved-Frames (jeder N-te oder adaptiv) werden auf jeden Quell-Frame hochgerechnet:
+# Rotation per SLERP, Position per zeitbasiertem Catmull-Rom-Spline. Zeitbasis sind die
+# ffprobe-Zeitstempel, damit VFR-Material korrekt abgetastet wird. Mit NumPy wird die ganze
+# Sequenz auf einmal berechnet, sonst Frame für Frame.
+def ffprobe_frame_times(ffmpeg, video_path):
+    """Sorted presentation timestamps (seconds) of all video frames, or None."""
+    probe = ffprobe_path(ffmpeg)
+    if not probe: return None
+    code, out = run_and_capture([probe, "-v", "error", "-select_streams", "v:0",
+                                 "-show_entries", "packet=pts_time", "-of", "csv=p=0", str(video_path)])
+    if code != 0: return None
+    times = []
+    for line in out.splitlines():
+        try: times.append(float(line.strip().strip(",")))
+        except ValueError: continue
+    return sorted(times) or None
+
+def quat_slerp(q0, q1, u):
+    dot = sum(a * b for a, b in zip(q0, q1))
+    if dot < 0: q1 = [-c for c in q1]; dot = -dot
+    if dot > 0.9995:
+        q = [a + u * (b - a) for a, b in zip(q0, q1)]
+    else:
+        theta = math.acos(min(1.0, dot)); s = math.sin(theta)
+        w0 = math.sin((1 - u) * theta) / s; w1 = math.sin(u * theta) / s
+        q = [w0 * a + w1 * b for a, b in zip(q0, q1)]
+    n = math.sqrt(sum(c * c for c in q))
+    return [c / n for c in q]
+
+def _catmull_rom(p0, p1, p2, p3, t0, t1, t2, t3, t):
+    """Non-uniform Catmull-Rom (cubic Hermite with time-based tangents) between p1 and p2."""
+    dt = t2 - t1; s = (t - t1) / dt
+    h00, h10, h01, h11 = 2*s**3 - 3*s**2 + 1, s**3 - 2*s**2 + s, -2*s**3 + 3*s**2, s**3 - s**2
+    out = []
+    for a, b, c, d in zip(p0, p1, p2, p3):
+        m1 = (c - a) / (t2 - t0) if t2 > t0 else 0.0
+        m2 = (d - b) / (t3 - t1) if t3 > t1 else 0.0
+        out.append(h00 * b + h10 * dt * m1 + h01 * c + h11 * dt * m2)
+    return out
+
+def interpolate_camera_track(frames, times, max_gap=12):
+    """Return one entry per source frame; each carries ``flag`` and ``confidence``.
+
+    flag: solved | interpolated | gap (solved neighbours more than ``max_gap`` frames apart)
+    | held (outside the solved range, pose of the nearest solved frame).
+    """
+    solved = sorted(frames, key=lambda f: f["source_frame"])
+    if not solved or not times: return []
+    if np is not None: return _interpolate_track_np(solved, times, max_gap)
+    keys = [f["source_frame"] for f in solved]; n = len(times)
+    t_of = lambda i: times[min(max(i, 0), n - 1)]
+    out = []; seg = 0
+    for src in range(n):
+        while seg + 1 < len(keys) and keys[seg + 1] <= src: seg += 1
+        a = solved[seg]
+        if src == a["source_frame"]:
+            out.append({**a, "flag": "solved", "confidence": 1.0}); continue
+        if src < keys[0] or seg + 1 >= len(keys):
+            near = solved[0] if src < keys[0] else solved[-1]
+            dist = abs(src - near["source_frame"])
+            out.append({**near, "frame": src + 1, "source_frame": src, "image": "", "flag": "held",
+                        "confidence": round(max(0.0, 1.0 - dist / max(1, max_gap)) * 0.5, 3)}); continue
+        b = solved[seg + 1]; p = solved[seg - 1] if seg > 0 else a; nx = solved[seg + 2] if seg + 2 < len(solved) else b
+        ta, tb, t = t_of(a["source_frame"]), t_of(b["source_frame"]), t_of(src)
+        u = (t - ta) / (tb - ta) if tb > ta else (src - a["source_frame"]) / (b["source_frame"] - a["source_frame"])
+        q = quat_slerp(a["quaternion"], b["quaternion"], u)
+        if tb > ta:
+            loc = _catmull_rom(p["location"], a["location"], b["location"], nx["location"],
+                               t_of(p["source_frame"]), ta, tb, t_of(nx["source_frame"]), t)
+        else:
+            loc = [x + u * (y - x) for x, y in zip(a["location"], b["location"])]
+        gap = b["source_frame"] - a["source_frame"]
+        dist = min(src - a["source_frame"], b["source_frame"] - src)
+        conf = max(0.0, 1.0 - dist / max(1, max_gap))
+        out.append({"frame": src + 1, "source_frame": src, "image": "", "location": loc, "quaternion": q,
+                    "rotation_zxy": list(rotmat_to_euler_zxy(qvec_to_rotmat(q))),
+                    "camera": (a if u < 0.5 else b)["camera"],
+                    "flag": "interpolated" if gap <= max_gap else "gap", "confidence": round(conf, 3)})
+    return out
+
+def _interpolate_track_np(solved, times, max_gap):
+    """interpolate_camera_track for the whole sequence at once (``solved`` sorted by source frame)."""
+    keys = np.array([f["source_frame"] for f in solved]); n = len(times); K = len(keys)
+    T = np.asarray(times, dtype=np.float64); t_of = lambda i: T[np.clip(i, 0, n - 1)]
+    src = np.arange(n); seg = np.searchsorted(keys, src, side="right") - 1
+    is_solved = (seg >= 0) & (keys[np.clip(seg, 0, K - 1)] == src)
+    held = ~is_solved & ((seg < 0) | (seg + 1 >= K))
+    idx = np.nonzero(~is_solved & ~held)[0]
+    a = seg[idx]; b = a + 1; p = np.maximum(a - 1, 0); nx = np.minimum(a + 2, K - 1)
+    ka, kb, s_ = keys[a], keys[b], src[idx]
+    ta, tb, t = t_of(ka), t_of(kb), T[idx]
+    timed = tb > ta
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.where(timed, (t - ta) / (tb - ta), (s_ - ka) / (kb - ka))
+        # SLERP (fast parallele Quaternionen linear)
+        Q = np.array([f["quaternion"] for f in solved], dtype=np.float64); q0 = Q[a]; q1 = Q[b]
+        dot = np.einsum("ni,ni->n", q0, q1); q1 = np.where(dot[:, None] < 0, -q1, q1); dot = np.abs(dot)
+        theta = np.arccos(np.minimum(1.0, dot)); sin = np.sin(theta); lin = dot > 0.9995
+        w0 = np.where(lin, 1 - u, np.sin((1 - u) * theta) / sin); w1 = np.where(lin, u, np.sin(u * theta) / sin)
+        q = w0[:, None] * q0 + w1[:, None] * q1; q /= np.linalg.norm(q, axis=1, keepdims=True)
+        # zeitbasierter Catmull-Rom, ohne Zeitbasis linear
+        L = np.array([f["location"] for f in solved], dtype=np.float64)
+        t0, t3 = t_of(keys[p]), t_of(keys[nx]); dt = tb - ta; s = ((t - ta) / dt)[:, None]
+        m1 = np.where((tb > t0)[:, None], (L[b] - L[p]) / (tb - t0)[:, None], 0.0)
+        m2 = np.where((t3 > ta)[:, None], (L[nx] - L[a]) / (t3 - ta)[:, None], 0.0)
+        spline = ((2*s**3 - 3*s**2 + 1) * L[a] + (s**3 - 2*s**2 + s) * dt[:, None] * m1
+                  + (-2*s**3 + 3*s**2) * L[b] + (s**3 - s**2) * dt[:, None] * m2)
+        loc = np.where(timed[:, None], spline, L[a] + u[:, None] * (L[b] - L[a]))
+    euler = rotmat_to_euler_zxy_np(qvec_to_rotmat_np(q))
+    conf = np.maximum(0.0, 1.0 - np.minimum(s_ - ka, kb - s_) / max(1, max_gap))
+    interp = {int(i): {"frame": int(i) + 1, "source_frame": int(i), "image": "", "location": lc, "quaternion": qq,
+                       "rotation_zxy": e, "camera": solved[ai if uu < 0.5 else ai + 1]["camera"],
+                       "flag": "interpolated" if g <= max_gap else "gap", "confidence": round(c, 3)}
+              for i, ai, uu, lc, qq, e, g, c in zip(idx.tolist(), a.tolist(), u.tolist(), loc.tolist(), q.tolist(),
+                                                    euler.tolist(), (kb - ka).tolist(), conf.tolist())}
+    out = []
+    for i, sg, sv, hd in zip(range(n), seg.tolist(), is_solved.tolist(), held.tolist()):
+        if sv: out.append({**solved[sg], "flag": "solved", "confidence": 1.0})
+        elif hd:
+            near = solved[0] if sg < 0 else solved[-1]; dist = abs(i - near["source_frame"])
+            out.append({**near, "frame": i + 1, "source_frame": i, "image": "", "flag": "held",
+                        "confidence": round(max(0.0, 1.0 - dist / max(1, max_gap)) * 0.5, 3)})
+        else: out.append(interp[i])
+    return out
+
+# --- Intrinsics-Bibliothek ---
+# Pro Projekt (Scenes-Ordner) werden gelöste Kamera-Parameter gespeichert, Schlüssel:
+# Kameramodell | Auflösung | Hersteller-/Modell-/Objektiv-Tags aus ffprobe.
+INTRINSICS_LIBRARY_FILE = "intrinsics_library.json"
+_INTRINSICS_TAG_RE = re.compile(r"make|model|lens|manufacturer", re.IGNORECASE)
+
+def jpeg_size(path):
+    """Return (width, height) from the SOF marker of a JPEG file, or None."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(2) != b"\xff\xd8": return None
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF: return None
+                if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7: continue
+                seg_len = struct.unpack(">H", f.read(2))[0]
+                if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                    h, w = struct.unpack(">xHH", f.read(5)); return w, h
+                f.seek(seg_len - 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+def intrinsics_key(camera_model, width, height, tags):
+    """Return (key, has_tags) identifying a camera body/lens at a given resolution."""
+    sig = ";".join(f"{k.lower()}={str(v).strip()}" for k, v in sorted((tags or {}).items())
+                   if _INTRINSICS_TAG_RE.search(k) and "handler" not in k.lower() and str(v).strip())
+    return f"{camera_model}|{width}x{height}|{sig}", bool(sig)
+
+def load_intrinsics_library(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
 def log_cmd(cmd, log_fn, cwd=None):
     txt = " ".join(shlex.quote(str(c)) for c in cmd)
     if cwd: txt += f"  (cwd={cwd})"
@@ -1272,6 +3422,16 @@ def find_in_nested_subdir_with_bin(top: Path, base_subdir: str, program_subdir:
         if p.exists(): return str(p.resolve())
     return None
 
+def detect_tools(top: Path, use_path=True):
+    """ffmpeg/COLMAP/GLOMAP from the project folders, on Linux optionally from PATH; missing ones are None."""
+    names = {tool: [f"{tool}.exe", tool] if IS_WINDOWS else [tool] for tool in ("ffmpeg", "colmap", "glomap")}
+    found = {"ffmpeg": find_in_subdir_with_bin(top, DEFAULT_DIRS["ffmpeg"], names["ffmpeg"])}
+    for tool in ("colmap", "glomap"):
+        found[tool] = find_in_nested_subdir_with_bin(top, DEFAULT_DIRS["sfm"], tool, names[tool]) or find_in_subdir_with_bin(top, DEFAULT_DIRS["sfm"], names[tool])
+    if OS_NAME == "Linux" and use_path:
+        for tool, path in found.items(): found[tool] = path or which_first(names[tool])
+    return found
+
 def looks_like_05_script(name: str) -> bool:
     s = name.strip().lower().replace(" ", "").replace("-", "").replace("_", "")
     return s in ("05script", "05scripts", "05scriptfolder")
@@ -1316,6 +3476,13 @@ class AutoTrackerGUI(tk.Tk):
         self.title(self.S["app_title"].format(os=OS_NAME))
         self.geometry("1120x930"); self.minsize(1000, 830)
         self._worker = None; self._stop_flag = False; self._elapsed_start = None; self._elapsed_job = None
+        self._camera_args = []; self._mapper_args = {}  # pro Video, gesetzt aus der Intrinsics-Bibliothek
+        self._cancel = None; self._stage_skipped = False; self._active_procs = set(); self._cancelled_procs = set(); self._procs_lock = threading.Lock()
+        self._threads = ThreadBudget(); self._stage_concurrency = 1  # >1 während parallel laufender Stufen
+        self._plan = {}; self._timing = None  # Deadline-Plan (Sampling/Skalierung) und Zeitmessung pro Video
+        self._queue_lock = threading.Lock(); self._queue_order = []; self._enqueued = {}; self._priorities = {}; self._requeue = set()
+        self._jobs = None; self._job_attempt = None; self._resume = set(); self._last_error = None  # jobs.db, offener Versuch
+        self._watcher = None  # Ordnerüberwachung "02 VIDEOS"
 
         # --- top bar with language dropdown ---
         topbar = ttk.Frame(self); topbar.pack(fill="x", padx=10, pady=(10, 0))
@@ -1401,6 +3568,20 @@ class AutoTrackerGUI(tk.Tk):
         self.use_gpu_var = tk.BooleanVar(value=True)
         gpu_frame = ttk.Frame(self.opts_frame); gpu_frame.pack(fill="x", padx=8, pady=(0, 6))
         self.cb_gpu = ttk.Checkbutton(gpu_frame, text=self.S["gpu_check"], variable=self.use_gpu_var); self.cb_gpu.grid(row=0, column=0, sticky="w")
+        gpu_frame.grid_columnconfigure(1, weight=1)
+        self.btn_advanced = ttk.Button(gpu_frame, text=self.S["advanced_btn"], command=self._open_advanced_dialog); self.btn_advanced.grid(row=0, column=1, sticky="e")
+        # erweiterte Optionen (Dialog „Erweitert…“)
+        self.race_mappers_var = tk.BooleanVar(value=False)
+        self.interp_full_var = tk.BooleanVar(value=True)
+        self.densify_var = tk.BooleanVar(value=False)
+        self.two_pass_var = tk.BooleanVar(value=False)
+        self.streaming_var = tk.BooleanVar(value=False)
+        self.intrinsics_lib_var = tk.BooleanVar(value=True); self.intrinsics_fix_var = tk.BooleanVar(value=False)
+        self.joint_var = tk.BooleanVar(value=False)
+        self.dense_kf_var = tk.BooleanVar(value=True)
+        self.dense_profile_var = tk.StringVar(value="final")
+        self.mesher_var = tk.StringVar(value="poisson"); self.decimate_var = tk.BooleanVar(value=True)
+        self.deadline_var = tk.StringVar(value=""); self.deadline_scope_var = tk.StringVar(value="video")
 
         more_opts = ttk.Frame(self.opts_frame); more_opts.pack(fill="x", padx=8, pady=(0, 6))
         self.jpeg_q_var = tk.StringVar(value="2"); self.sift_max_img_var = tk.StringVar(value="4096"); self.seq_overlap_var = tk.StringVar(value="15")
@@ -1429,6 +3610,13 @@ class AutoTrackerGUI(tk.Tk):
         self.btn_add_videos = ttk.Button(btns, text=self.S["add_videos"], command=self.add_videos); self.btn_add_videos.pack(fill="x", pady=(0, 4))
         self.btn_remove_sel = ttk.Button(btns, text=self.S["remove_sel"], command=self.remove_selected); self.btn_remove_sel.pack(fill="x")
         self.btn_clear_list = ttk.Button(btns, text=self.S["clear_list"], command=self.clear_videos); self.btn_clear_list.pack(fill="x", pady=(4, 0))
+        self.btn_move_up = ttk.Button(btns, text=self.S["move_up"], command=lambda: self.move_selected(-1)); self.btn_move_up.pack(fill="x", pady=(12, 0))
+        self.btn_move_down = ttk.Button(btns, text=self.S["move_down"], command=lambda: self.move_selected(1)); self.btn_move_down.pack(fill="x", pady=(4, 0))
+        self.lbl_priority = ttk.Label(btns, text=self.S["priority"]); self.lbl_priority.pack(fill="x", pady=(8, 0))
+        self.priority_box = ttk.Combobox(btns, state="readonly", width=12, values=[self.S["prio_high"], self.S["prio_normal"], self.S["prio_low"]])
+        self.priority_box.current(1); self.priority_box.pack(fill="x"); self.priority_box.bind("<<ComboboxSelected>>", self._on_priority_selected)
+        self.sjf_var = tk.BooleanVar(value=False)
+        self.cb_sjf = ttk.Checkbutton(btns, text=self.S["sjf_cb"], variable=self.sjf_var); self.cb_sjf.pack(fill="x", pady=(8, 0))
 
         self.scenes_dir_var = tk.StringVar(value=str(Path(self.top_dir_var.get()) / DEFAULT_DIRS["scenes"]))
         out_frame = ttk.Frame(self); out_frame.pack(fill="x", padx=10, pady=(0, 6))
@@ -1439,13 +3627,17 @@ class AutoTrackerGUI(tk.Tk):
         run_frame = ttk.Frame(self); run_frame.pack(fill="x", padx=10, pady=(6, 6))
         self.run_btn = ttk.Button(run_frame, text=self.S["start"], command=self.start_run); self.run_btn.pack(side="left")
         self.btn_test = ttk.Button(run_frame, text=self.S["test_tools"], command=self.test_tools); self.btn_test.pack(side="left", padx=(8, 0))
+        self.btn_autotune = ttk.Button(run_frame, text=self.S["autotune"], command=self.start_autotune); self.btn_autotune.pack(side="left", padx=(8, 0))
+        self.btn_stop_stage = ttk.Button(run_frame, text=self.S["stop_stage"], state="disabled", command=lambda: self.cancel_run("stage")); self.btn_stop_stage.pack(side="left", padx=(8, 0))
+        self.btn_stop_video = ttk.Button(run_frame, text=self.S["stop_video"], state="disabled", command=lambda: self.cancel_run("video")); self.btn_stop_video.pack(side="left", padx=(4, 0))
+        self.btn_stop_batch = ttk.Button(run_frame, text=self.S["stop_batch"], state="disabled", command=lambda: self.cancel_run("batch")); self.btn_stop_batch.pack(side="left", padx=(4, 0))
         self.elapsed_prefix = self.S["elapsed"]
         self.elapsed_var = tk.StringVar(value=f"{self.elapsed_prefix}: 00:00:00"); ttk.Label(run_frame, textvariable=self.elapsed_var).pack(side="left", padx=(8, 0))
         self.progress = ttk.Progressbar(run_frame, mode="determinate"); self.progress.pack(side="left", fill="x", expand=True, padx=10)
 
         self.log = tk.Text(self, height=16, wrap="word"); self.log.pack(fill="both", expand=False, padx=10, pady=(6, 10))
         self.top_dir_var.trace_add("write", self._on_top_changed)
-        self._maybe_offer_create_structure(); self._auto_detect_tools(); self.load_existing_videos()  # populate video list
+        self._maybe_offer_create_structure(); self._auto_detect_tools(); self._open_job_store(); self.load_existing_videos(); self._start_watcher()  # populate video list
 
     # ---- language handlers ----
     def _on_lang_changed(self, *_):
@@ -1491,6 +3683,7 @@ class AutoTrackerGUI(tk.Tk):
         self.rb_h.configure(text=self.S["res_only_h"])
         self.rb_wh.configure(text=self.S["res_wh"])
         self.cb_gpu.configure(text=self.S["gpu_check"])
+        self.btn_advanced.configure(text=self.S["advanced_btn"])
         self.lbl_jpeg.configure(text=self.S["jpeg_q"])
         self.lbl_sift.configure(text=self.S["sift_max"])
         self.lbl_overlap.configure(text=self.S["seq_overlap"])
@@ -1504,12 +3697,19 @@ class AutoTrackerGUI(tk.Tk):
         self.btn_add_videos.configure(text=self.S["add_videos"])
         self.btn_remove_sel.configure(text=self.S["remove_sel"])
         self.btn_clear_list.configure(text=self.S["clear_list"])
+        self.btn_move_up.configure(text=self.S["move_up"]); self.btn_move_down.configure(text=self.S["move_down"])
+        self.lbl_priority.configure(text=self.S["priority"]); self.cb_sjf.configure(text=self.S["sjf_cb"])
+        prio = self.priority_box.current()
+        self.priority_box.configure(values=[self.S["prio_high"], self.S["prio_normal"], self.S["prio_low"]]); self.priority_box.current(prio)
 
         self.lbl_scenes.configure(text=self.S["scenes_dir"])
         self.btn_browse_scenes.configure(text=self.S["browse"])
 
         self.run_btn.configure(text=self.S["start"])
         self.btn_test.configure(text=self.S["test_tools"])
+        self.btn_autotune.configure(text=self.S["autotune"])
+        self.btn_stop_stage.configure(text=self.S["stop_stage"]); self.btn_stop_video.configure(text=self.S["stop_video"])
+        self.btn_stop_batch.configure(text=self.S["stop_batch"])
 
         self.elapsed_prefix = self.S["elapsed"]
         # update displayed string but keep time value
@@ -1544,7 +3744,7 @@ class AutoTrackerGUI(tk.Tk):
         self._auto_detect_tools()
         self.settings["top_dir"] = str(top)  # persist selected top_dir
         save_settings(self.settings)
-        self.clear_videos(); self.load_existing_videos()  # refresh video list
+        self.video_list.delete(0, "end"); self._open_job_store(); self.load_existing_videos(); self._start_watcher()  # refresh video list
 
     def _project_missing_dirs(self, top: Path):
         base_dirs = [top / DEFAULT_DIRS["sfm"], top / DEFAULT_DIRS["videos"], top / DEFAULT_DIRS["ffmpeg"], top / DEFAULT_DIRS["scenes"], top / DEFAULT_DIRS["sources"]]
@@ -1575,29 +3775,13 @@ class AutoTrackerGUI(tk.Tk):
         self._auto_detect_tools(); messagebox.showinfo(self.S["dlg_done"], self.S["dlg_structure_created"])
 
     def _auto_detect_tools(self):
-        top = Path(self.top_dir_var.get())
-        ff_names = ["ffmpeg.exe", "ffmpeg"] if IS_WINDOWS else ["ffmpeg"]
-        cm_names = ["colmap.exe", "colmap"] if IS_WINDOWS else ["colmap"]
-        gm_names = ["glomap.exe", "glomap"] if IS_WINDOWS else ["glomap"]
-
-        ff_path = find_in_subdir_with_bin(top, DEFAULT_DIRS["ffmpeg"], ff_names)
-        # also check nested '03 FFMPEG/bin' which find_in_subdir_with_bin already covers; but keep PATH fallback auto if allowed
-        if (not ff_path) and (OS_NAME == "Linux") and self.use_path_linux_var.get():
-            ff_path = which_first(ff_names)
-        if ff_path: self.ffmpeg_entry.set_text(ff_path)
-        else: self.ffmpeg_entry.set_placeholder(self.ffmpeg_placeholder)
-
-        cm_path = find_in_nested_subdir_with_bin(top, DEFAULT_DIRS["sfm"], "colmap", cm_names) or find_in_subdir_with_bin(top, DEFAULT_DIRS["sfm"], cm_names)
-        if (not cm_path) and (OS_NAME == "Linux") and self.use_path_linux_var.get():
-            cm_path = which_first(cm_names)
-        if cm_path: self.colmap_entry.set_text(cm_path)
-        else: self.colmap_entry.set_placeholder(self.colmap_placeholder)
-
-        gm_path = find_in_nested_subdir_with_bin(top, DEFAULT_DIRS["sfm"], "glomap", gm_names) or find_in_subdir_with_bin(top, DEFAULT_DIRS["sfm"], gm_names)
-        if (not gm_path) and (OS_NAME == "Linux") and self.use_path_linux_var.get():
-            gm_path = which_first(gm_names)
-        if gm_path: self.glomap_entry.set_text(gm_path)
-        else: self.glomap_entry.set_placeholder(self.glomap_placeholder)
+        # PATH fallback auto if allowed
+        found = detect_tools(Path(self.top_dir_var.get()), self.use_path_linux_var.get())
+        for tool, entry, placeholder in (("ffmpeg", self.ffmpeg_entry, self.ffmpeg_placeholder),
+                                         ("colmap", self.colmap_entry, self.colmap_placeholder),
+                                         ("glomap", self.glomap_entry, self.glomap_placeholder)):
+            if found[tool]: entry.set_text(found[tool])
+            else: entry.set_placeholder(placeholder)
 
     def _detect_from_system_path(self):
         if OS_NAME != "Linux":
@@ -2331,7 +4515,7 @@ class AutoTrackerGUI(tk.Tk):
         # scan project video directory and add found files once
         vids_dir = Path(self.top_dir_var.get()) / DEFAULT_DIRS["videos"]
         scenes_dir = Path(self.top_dir_var.get()) / DEFAULT_DIRS["scenes"]
-        exts = {".mp4", ".mov", ".avi", ".mkv", ".m4v", ".wmv", ".mpg", ".mpeg"}
+        exts = VIDEO_EXTS
         if vids_dir.exists():
             existing = set(self.video_list.get(0, "end"))
             for f in vids_dir.iterdir():
@@ -2342,18 +4526,67 @@ class AutoTrackerGUI(tk.Tk):
                     if p not in existing:
                         self.video_list.insert("end", p)
                         existing.add(p)
+        self._sync_queue()
 
     # ---- Video UI ----
     def add_videos(self):
         files = filedialog.askopenfilenames(title=self.S["dlg_pick_videos"],
             filetypes=[("Video","*.mp4 *.MP4 *.mov *.MOV *.avi *.AVI *.mkv *.MKV *.m4v *.M4V *.wmv *.WMV *.mpg *.MPG *.mpeg *.MPEG"), ("All files","*.*")])
         for f in files: self.video_list.insert("end", f)
+        self._sync_queue()
 
     def remove_selected(self):
         for idx in reversed(self.video_list.curselection()): self.video_list.delete(idx)
+        self._sync_queue()
 
     def clear_videos(self):
+        self.video_list.delete(0, "end"); self._sync_queue()
+
+    # --- Warteschlange ---
+    # Die Liste ist die Warteschlange: Reihenfolge, Prioritäten und neue Einträge gelten auch
+    # während eines Laufs, denn der nächste Job wird erst gewählt, wenn der vorige fertig ist.
+    def _sync_queue(self):
+        order = list(self.video_list.get(0, "end")); now = time.time()
+        with self._queue_lock:
+            self._queue_order = order
+            for v in order: self._enqueued.setdefault(v, now)
+        colors = {1: "#b00020", -1: "#888888"}
+        for idx, v in enumerate(order): self.video_list.itemconfig(idx, foreground=colors.get(self._priorities.get(v, 0), ""))
+        if self._jobs:
+            try: self._jobs.sync_queue(order, self._priorities)
+            except Exception as e: self.log_line(f"[JOBS] Warnung: Warteschlange nicht gespeichert: {e}")
+
+    def _next_queued(self, done, deferred, expected):
+        """Pick the next video of the running batch; returns (video, other pending videos)."""
+        with self._queue_lock:
+            done.difference_update(self._requeue); self._requeue.clear()  # geänderte Videos erneut verarbeiten
+            pending = [v for v in self._queue_order if v not in done]
+        if not pending: return None, []
+        now = time.time(); sjf = bool(self.sjf_var.get())
+        aging_s = float(self.settings.get("queue_aging_min", 30)) * 60
+        idx = next_job(pending, self._priorities, {v: expected(v) for v in pending} if sjf else {},
+                       {v: now - self._enqueued.get(v, now) for v in pending}, sjf, aging_s, deferred)
+        video = pending.pop(idx)
+        if sjf and expected(video) is not None: self.log_line(f"[QUEUE] Nächster Job: {Path(video).name} (~{expected(video) / 60:.1f} min)")
+        return video, pending
+
+    def move_selected(self, delta):
+        sel = list(self.video_list.curselection())
+        if not sel: return
+        items = list(self.video_list.get(0, "end")); picked = [items[i] for i in sel]
+        rest = [v for i, v in enumerate(items) if i not in sel]
+        pos = max(0, min(len(rest), sel[0] + delta))
+        items = rest[:pos] + picked + rest[pos:]
         self.video_list.delete(0, "end")
+        for v in items: self.video_list.insert("end", v)
+        for i in range(pos, pos + len(picked)): self.video_list.selection_set(i)
+        self._sync_queue()
+
+    def _on_priority_selected(self, _event=None):
+        level = ("high", "normal", "low")[self.priority_box.current()]
+        for idx in self.video_list.curselection():
+            self._priorities[self.video_list.get(idx)] = QUEUE_PRIORITIES[level]
+        self._sync_queue()
 
     # ---- Laufzeit-Anzeige ----
     def _start_elapsed(self):
@@ -2382,14 +4615,68 @@ class AutoTrackerGUI(tk.Tk):
             messagebox.showerror("Fehler", self.S["err_ffmpeg"]); return
         if not colmap or not Path(colmap).exists():
             messagebox.showerror("Fehler", self.S["err_colmap"]); return
-        self._stop_flag = False; self.run_btn.config(state="disabled")
+        self._stop_flag = False; self._cancel = None; self._set_running(True)
         self.progress.config(value=0, maximum=len(videos)); self.log.delete("1.0", "end"); self._start_elapsed()
         self._worker = threading.Thread(target=self._run_pipeline, args=(videos, ffmpeg, colmap, glomap), daemon=True); self._worker.start()
 
+    # --- Abbruch ---
+    # Stufe: die gerade laufenden Prozesse beenden; jeder _run_cmd erkennt an seinem eigenen Prozess,
+    # ob er abgebrochen wurde (auch wenn parallel weitere laufen, z. B. Mapper-Rennen, Streaming).
+    # Die Pipeline behandelt das wie einen Fehler der Stufe; abgebrochene Dense-/Mesh-Stufen werden
+    # übersprungen und die Szene trotzdem abgeschlossen.
+    # Video: zusätzlich keine weiteren Stufen für dieses Video; Batch: danach kein weiteres Video.
+    def _run_cmd(self, cmd, log_fn=None, on_start=None):
+        """run_cmd for pipeline tools: registers the process for cancellation and removes
+        partial outputs when it gets cancelled."""
+        if self._cancel in ("video", "batch"): return CANCELLED_RC
+        log_fn = log_fn or self.log_line
+        sched = stage_sched(cmd, self.settings.get("stage_scheduling"))
+        lease = threads = self._threads.acquire(self._stage_concurrency)
+        cpus = resolve_affinity(sched.get("affinity"))
+        if cpus: threads = min(threads, len(cpus))
+        cmd = with_thread_flags(cmd, threads); log_fn(" ".join(shlex.quote(str(c)) for c in cmd))
+        snapshot = snapshot_outputs(cmd); started = time.time(); mine = []
+        def _on_start(proc):
+            mine.append(proc)
+            with self._procs_lock: self._active_procs.add(proc)
+            if self._cancel: terminate_proc(proc, grace=0.5)
+            elif on_start: on_start(proc)
+        try:
+            code = run_cmd(cmd, log_fn=log_fn, on_start=_on_start, sched=sched)
+        finally:
+            self._threads.release(lease)
+            with self._procs_lock:
+                self._active_procs = {p for p in self._active_procs if p.poll() is None}
+                stage_cancelled = any(p in self._cancelled_procs for p in mine); self._cancelled_procs.difference_update(mine)
+        if not (self._cancel or stage_cancelled): return code
+        remove_partial_outputs(snapshot, started)
+        if stage_cancelled: self._stage_skipped = True
+        return CANCELLED_RC
+
+    def cancel_run(self, level):
+        if not (self._worker and self._worker.is_alive()): return
+        with self._procs_lock: procs = list(self._active_procs)
+        if level == "stage" and not procs:
+            self.log_line("[STOP] Keine laufende Stufe."); return
+        if level == "batch": self._stop_flag = True
+        if level == "stage":
+            with self._procs_lock: self._cancelled_procs.update(procs)
+        else: self._cancel = level
+        self.log_line({"stage": "[STOP] Breche aktuelle Stufe ab…", "video": "[STOP] Breche aktuelles Video ab…",
+                       "batch": "[STOP] Breche Batch ab…"}[level])
+        threading.Thread(target=terminate_procs, args=(procs, 0.5), daemon=True).start()
+
+    def _set_running(self, running):
+        for btn in (self.run_btn, self.btn_autotune): btn.config(state="disabled" if running else "normal")
+        for btn in (self.btn_stop_stage, self.btn_stop_video, self.btn_stop_batch):
+            btn.config(state="normal" if running else "disabled")
+
     def log_line(self, text):
+        if text.startswith(("[ERROR]", "[FATAL]")): self._last_error = text
         self.log.insert("end", text + "\n"); self.log.see("end"); self.update_idletasks()
 
     def _build_scale_filter(self):
+        if self._plan.get("scale"): return self._plan["scale"]
         mode = self.res_mode.get(); w = self.width_var.get().strip(); h = self.height_var.get().strip()
         if mode == "keep": return None
         if mode == "w" and w.isdigit(): return f"scale={w}:-2"
@@ -2397,135 +4684,1226 @@ class AutoTrackerGUI(tk.Tk):
         if mode == "wh" and w.isdigit() and h.isdigit(): return f"scale={w}:{h}"
         return None
 
+    def _sampling_step(self):
+        if "step" in self._plan: return self._plan["step"]
+        if self.fps_mode.get() != "every": return 1
+        try: return max(1, int(self.every_n_var.get().strip()))
+        except ValueError: return 2
+
     def _build_sampling_filters(self):
-        filters = []; mode = self.fps_mode.get()
-        if mode == "every":
-            try: n = max(1, int(self.every_n_var.get().strip()))
-            except ValueError: n = 2
-            if n > 1: filters.append(f"select=not(mod(n\\,{n}))")
+        filters = []; n = self._sampling_step()
+        if n > 1: filters.append(f"select=not(mod(n\\,{n}))")
         return filters if filters else None
 
     # --- ffmpeg Frame-Extraktion ---
     # Erstellt Filterkette (FPS, Skalierung), speichert JPEG Frames.
-    def _ffmpeg_extract(self, ffmpeg, video_path, img_dir):
+    def _ffmpeg_extract(self, ffmpeg, video_path, img_dir, samp_filters=None, sample=None, on_start=None):
         q = self.jpeg_q_var.get().strip() or "2"
-        scale_f = self._build_scale_filter(); samp_filters = self._build_sampling_filters()
+        scale_f = self._build_scale_filter(); samp_filters = samp_filters or self._build_sampling_filters()
         vf_chain = []; 
         if samp_filters: vf_chain.extend(samp_filters)
         if scale_f: vf_chain.append(scale_f)
         vf_arg = ",".join(vf_chain) if vf_chain else None
-        cmd = [ffmpeg, "-hide_banner", "-loglevel", "info", "-nostdin", "-i", video_path, "-qscale:v", q]
+        cmd = [ffmpeg, "-hide_banner", "-loglevel", "info", "-nostdin"]
+        if sample: cmd += ["-ss", f"{sample[0]:.3f}"]  # (Startzeit, Frames) für Stichproben
+        cmd += ["-i", video_path, "-qscale:v", q]
         if vf_arg: cmd.extend(["-vf", vf_arg, "-vsync", "vfr"])
+        if sample: cmd += ["-frames:v", str(sample[1])]
         out_pattern = str(Path(img_dir) / "frame_%06d.jpg"); cmd.append(out_pattern)
-        self.log_line(" ".join(shlex.quote(c) for c in cmd))
-        return run_cmd(cmd, log_fn=self.log_line)
+        return self._run_cmd(cmd, on_start=on_start)
 
-    def _colmap_feature_extractor(self, colmap, db_path, img_dir, max_img_size, use_gpu: bool):
+    def _colmap_feature_extractor(self, colmap, db_path, img_dir, max_img_size, use_gpu: bool, extra_args=None, per_folder=False):
         cmd = [colmap, "feature_extractor", "--database_path", db_path, "--image_path", img_dir,
-               "--ImageReader.single_camera", "1", "--SiftExtraction.max_image_size", str(max_img_size)]
-        if use_gpu:
-            cmd += ["--SiftExtraction.use_gpu", "1"]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
-
-    def _colmap_sequential_matcher(self, colmap, db_path, overlap, use_gpu: bool):
+               "--ImageReader.single_camera_per_folder" if per_folder else "--ImageReader.single_camera", "1",
+               "--SiftExtraction.max_image_size", str(max_img_size)]
+        cmd += ["--SiftExtraction.use_gpu", "1" if use_gpu else "0"]
+        if "--ImageReader.existing_camera_id" not in (extra_args or []): cmd += self._camera_args
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd)
+
+    def _colmap_sequential_matcher(self, colmap, db_path, overlap, use_gpu: bool, extra_args=None):
         cmd = [colmap, "sequential_matcher", "--database_path", db_path, "--SequentialMatching.overlap", str(overlap),
                "--SiftMatching.use_gpu", "1" if use_gpu else "0"]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
-
-    def _glomap_mapper(self, glomap, db_path, img_dir, sparse_dir):
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd)
+
+    # --- Frühabbruch ---
+    # Prüft database.db nach Feature-Extraktion bzw. Matching. Bei Fehlschlag wird je nach
+    # gate_fallback einmal mit robusteren Parametern wiederholt oder das Video übersprungen.
+    def _gate(self, check, db_path, *args):
+        if not self.settings.get("gate_enabled", True): return True
+        try: ok, msg = check(colmap_db_stats(db_path), self.settings, *args)
+        except Exception as e:
+            self.log_line(f"[GATE] Prüfung nicht möglich: {e}"); return True
+        self.log_line(f"[GATE] {'OK' if ok else 'NICHT BESTANDEN'}: {msg}")
+        return ok
+
+    def _features_with_gate(self, colmap, db_path, img_dir, max_img, use_gpu):
+        code = self._colmap_feature_extractor(colmap, db_path, img_dir, max_img, use_gpu)
+        if code != 0 or self._gate(check_feature_gate, db_path): return code, True
+        if self.settings.get("gate_fallback", "retry") != "retry": return code, False
+        # Fallback: niedrigere Peak-Schwelle liefert mehr Keypoints auf kontrastarmem Material
+        self.log_line("[GATE] Fallback: Feature-Extraktion mit niedrigerer Peak-Schwelle wiederholen…")
+        Path(db_path).unlink(missing_ok=True)
+        code = self._colmap_feature_extractor(colmap, db_path, img_dir, max_img, use_gpu,
+                                              extra_args=["--SiftExtraction.peak_threshold", "0.002"])
+        return code, code != 0 or self._gate(check_feature_gate, db_path)
+
+    def _matching_with_gate(self, colmap, db_path, overlap, use_gpu):
+        code = self._colmap_sequential_matcher(colmap, db_path, overlap, use_gpu)
+        if code != 0 or self._gate(check_match_gate, db_path, overlap): return code, True
+        if self.settings.get("gate_fallback", "retry") != "retry": return code, False
+        # Fallback: doppelter Overlap + quadratischer Overlap überbrückt kurze Aussetzer
+        overlap2 = max(2, int(overlap)) * 2
+        self.log_line(f"[GATE] Fallback: Matching mit Overlap {overlap2} (quadratic_overlap) wiederholen…")
+        code = self._colmap_sequential_matcher(colmap, db_path, overlap2, use_gpu,
+                                               extra_args=["--SequentialMatching.quadratic_overlap", "1"])
+        return code, code != 0 or self._gate(check_match_gate, db_path, overlap2)
+
+    def _glomap_mapper(self, glomap, db_path, img_dir, sparse_dir, log_fn=None, on_start=None):
+        log = log_fn or self.log_line
         cmd = [glomap, "mapper", "--database_path", db_path, "--image_path", img_dir, "--output_path", sparse_dir]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+        cmd += self._mapper_args.get("glomap", [])
+        return self._run_cmd(cmd, log_fn=log, on_start=on_start)
 
-    def _colmap_mapper(self, colmap, db_path, img_dir, sparse_dir):
+    def _colmap_mapper(self, colmap, db_path, img_dir, sparse_dir, log_fn=None, on_start=None):
+        log = log_fn or self.log_line
         cmd = [colmap, "mapper", "--database_path", db_path, "--image_path", img_dir, "--output_path", sparse_dir]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+        cmd += self._mapper_args.get("colmap", [])
+        return self._run_cmd(cmd, log_fn=log, on_start=on_start)
+
+    def _colmap_matches_importer(self, colmap, db_path, pairs_path, use_gpu: bool):
+        cmd = [colmap, "matches_importer", "--database_path", db_path, "--match_list_path", pairs_path,
+               "--match_type", "pairs", "--SiftMatching.use_gpu", "1" if use_gpu else "0"]
+        return self._run_cmd(cmd)
+
+    def _colmap_image_registrator(self, colmap, db_path, in_path, out_path):
+        cmd = [colmap, "image_registrator", "--database_path", db_path, "--input_path", in_path, "--output_path", out_path]
+        return self._run_cmd(cmd)
+
+    def _colmap_point_triangulator(self, colmap, db_path, img_dir, in_path, out_path):
+        cmd = [colmap, "point_triangulator", "--database_path", db_path, "--image_path", img_dir,
+               "--input_path", in_path, "--output_path", out_path, "--clear_points", "1"]
+        return self._run_cmd(cmd)
+
+    def _colmap_bundle_adjuster(self, colmap, in_path, out_path, extra_args=None):
+        cmd = [colmap, "bundle_adjuster", "--input_path", in_path, "--output_path", out_path]
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd)
+
+    # --- Mapper-Race ---
+    # GLOMAP und COLMAP laufen parallel in getrennte Ordner. Der erste Lauf, der das
+    # Qualitäts-Gate besteht, gewinnt und der andere wird beendet; sonst wird auf beide
+    # gewartet und das bessere Modell genommen. Der Gewinner landet in sparse/0.
+    def _mapper_race(self, glomap, colmap, db_path, img_dir, sparse_dir):
+        """Race GLOMAP against COLMAP and promote the winning model to ``sparse_dir/0``."""
+        race_dir = Path(sparse_dir).parent / "sparse_race"
+        shutil.rmtree(race_dir, ignore_errors=True)
+        total = colmap_db_image_count(db_path)
+        min_ratio = float(self.settings.get("race_min_registered_ratio", 0.8))
+        max_err = float(self.settings.get("race_max_reproj_error", 1.5))
+        mappers = {"glomap": (self._glomap_mapper, glomap), "colmap": (self._colmap_mapper, colmap)}
+        procs = {}; cancelled = set(); lock = threading.Lock(); results = queue.Queue()
+
+        def _run(name):
+            fn, exe = mappers[name]
+            out_dir = race_dir / name; out_dir.mkdir(parents=True, exist_ok=True)
+            def _on_start(proc):
+                with lock:
+                    procs[name] = proc; kill = name in cancelled
+                if kill: terminate_proc(proc)
+            try:
+                code = fn(exe, db_path, img_dir, str(out_dir), log_fn=lambda s: self.log_line(f"[{name}] {s}"), on_start=_on_start)
+            except Exception as e:
+                self.log_line(f"[{name}] [ERROR] {e}"); code = 1
+            results.put((name, code))
+
+        threads = [threading.Thread(target=_run, args=(n,), daemon=True) for n in mappers]
+        self._stage_concurrency = len(mappers)
+        for t in threads: t.start()
+        winner = None; candidates = {}
+        for _ in mappers:
+            name, code = results.get()
+            stats = colmap_model_stats(race_dir / name / "0") if code == 0 else None
+            if stats is None:
+                self.log_line(f"[RACE] {name}: kein verwertbares Modell (exit={code})."); continue
+            ratio = stats["registered"] / total if total else 0.0
+            err = stats.get("mean_reproj_error", float("inf"))
+            self.log_line(f"[RACE] {name}: {stats['registered']}/{total} Bilder registriert ({ratio:.0%}), Reprojektionsfehler {err:.3f}px")
+            candidates[name] = stats
+            if ratio >= min_ratio and err <= max_err:
+                winner = name; break
+        if winner:
+            with lock:
+                others = [n for n in mappers if n != winner]
+                cancelled.update(others); running = [procs.get(n) for n in others]
+            for proc in running: terminate_proc(proc)
+        elif candidates:
+            winner = max(candidates, key=lambda n: (candidates[n]["registered"], -candidates[n].get("mean_reproj_error", float("inf"))))
+            self.log_line(f"[RACE] Kein Lauf erfüllt das Qualitäts-Gate – nehme bestes Modell ({winner}).")
+        for t in threads: t.join()
+        self._stage_concurrency = 1
+        if not winner:
+            shutil.rmtree(race_dir, ignore_errors=True); return 1
+        dst = Path(sparse_dir) / "0"
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.move(str(race_dir / winner / "0"), str(dst))
+        shutil.rmtree(race_dir, ignore_errors=True)
+        self.log_line(f"[RACE] Gewinner: {winner} -> {dst}")
+        return 0
 
-    def _colmap_model_converter(self, colmap, in_path, out_path):
-        cmd = [colmap, "model_converter", "--input_path", in_path, "--output_path", out_path, "--output_type", "TXT"]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+    # --- TXT-Export ---
+    # Schreibt das Modell als TXT nach sparse/0 und kopiert es nach sparse/ (ersetzt model_converter).
+    def _export_model_txt(self, model_dir, sparse_dir):
+        try:
+            t0 = time.time(); model = read_colmap_model(model_dir)
+            write_colmap_model_txt(model, model_dir)
+            for name in ("cameras.txt", "images.txt", "points3D.txt"):
+                shutil.copyfile(Path(model_dir) / name, Path(sparse_dir) / name)
+            self.log_line(f"[MODEL] TXT-Export nach {model_dir} und {sparse_dir} ({time.time() - t0:.2f}s)")
+            return 0
+        except Exception as e:
+            self.log_line(f"[MODEL] Fehler beim TXT-Export: {e}"); return 1
 
-    def _colmap_image_undistorter(self, colmap, img_dir, sparse_dir, dense_dir):
+    def _colmap_image_undistorter(self, colmap, img_dir, sparse_dir, dense_dir, image_list=None, extra_args=None):
         cmd = [colmap, "image_undistorter", "--image_path", img_dir,
                "--input_path", f"{sparse_dir}/0", "--output_path", dense_dir]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+        if image_list: cmd += ["--image_list_path", str(image_list)]
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd)
 
-    def _colmap_patch_match_stereo(self, colmap, dense_dir):
+    def _colmap_patch_match_stereo(self, colmap, dense_dir, extra_args=None, on_start=None):
         cmd = [colmap, "patch_match_stereo", "--workspace_path", dense_dir,
                "--workspace_format", "COLMAP"]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd, on_start=on_start)
 
-    def _colmap_stereo_fusion(self, colmap, dense_dir):
+    def _colmap_stereo_fusion(self, colmap, dense_dir, extra_args=None, on_start=None):
         cmd = [colmap, "stereo_fusion", "--workspace_path", dense_dir,
                "--workspace_format", "COLMAP", "--output_path", f"{dense_dir}/fused.ply"]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd, on_start=on_start)
 
-    def _colmap_poisson_mesher(self, colmap, dense_dir):
-        cmd = [colmap, "poisson_mesher", "--input_path", f"{dense_dir}/fused.ply",
+    def _colmap_poisson_mesher(self, colmap, dense_dir, input_ply=None, extra_args=None, on_start=None):
+        cmd = [colmap, "poisson_mesher", "--input_path", str(input_ply or f"{dense_dir}/fused.ply"),
                "--output_path", f"{dense_dir}/meshed.ply"]
-        self.log_line(" ".join(shlex.quote(c) for c in cmd)); return run_cmd(cmd, log_fn=self.log_line)
+        if extra_args: cmd += list(extra_args)
+        return self._run_cmd(cmd, on_start=on_start)
+
+    def _colmap_delaunay_mesher(self, colmap, dense_dir, on_start=None):
+        cmd = [colmap, "delaunay_mesher", "--input_path", dense_dir, "--input_type", "dense",
+               "--output_path", f"{dense_dir}/meshed-delaunay.ply"]
+        return self._run_cmd(cmd, on_start=on_start)
+
+    # --- Mesh ---
+    # Poisson auf der (optional ausgedünnten) Punktwolke oder Delaunay auf dem Dense-Workspace;
+    # Laufzeit und Spitzen-RAM des Meshers werden geloggt.
+    def _mesh_stage(self, colmap, scene_dir, dense_dir):
+        if self.mesher_var.get() == "delaunay":
+            ply = Path(dense_dir) / "fused.ply"; workload = ply.stat().st_size / 1e6 if ply.exists() else 0
+            if not self._memory_shortfall("delaunay_mesher", workload):
+                return self._run_guarded("delaunay_mesher", workload,
+                                         lambda on_start: self._colmap_delaunay_mesher(colmap, str(dense_dir), on_start=on_start))
+            self.log_line("[MEM] Delaunay passt nicht in den Speicher – verwende Poisson (Tiefe nach Bedarf reduziert).")
+        ply = self._decimated_cloud(scene_dir, dense_dir); workload = ply.stat().st_size / 1e6 if ply.exists() else 0
+        depth = int(self.settings.get("poisson_depth", 13))
+        shortfall = self._memory_shortfall("poisson_mesher", workload)
+        if shortfall:
+            # jede Octree-Stufe weniger braucht grob ein Viertel des Speichers
+            need = estimate_stage_memory(self._mem_history, "poisson_mesher", workload); avail = need - shortfall
+            while depth > 8 and need > avail: depth -= 1; need //= 4
+            self.log_line(f"[MEM] Poisson-Tiefe reduziert auf {depth}")
+        args = ["--PoissonMeshing.depth", str(depth), "--PoissonMeshing.trim", str(self.settings.get("poisson_trim", 10))]
+        return self._run_guarded("poisson_mesher", workload,
+                                 lambda on_start: self._colmap_poisson_mesher(colmap, str(dense_dir), ply, args, on_start))
+
+    # --- Plattenplatz-Zulassung ---
+    def _project_footprint(self, ffmpeg, vpath, scenes_dir, mesh):
+        """Projected bytes per stage for one video, from ffprobe and one sample frame; None if unknown."""
+        info = ffprobe_video_info(ffmpeg, vpath) or {}
+        frames = info.get("nb_frames") or (info.get("duration") or 0) * (info.get("fps") or 0)
+        if not frames: return None
+        sample = Path(scenes_dir) / "_sample_frame.jpg"
+        scale_f = self._build_scale_filter()
+        cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-ss", f"{(info.get('duration') or 0) / 2:.3f}",
+               "-i", str(vpath), "-frames:v", "1", "-qscale:v", self.jpeg_q_var.get().strip() or "2"]
+        code, _ = run_and_capture(cmd + (["-vf", scale_f] if scale_f else []) + [str(sample)])
+        size = jpeg_size(sample) if code == 0 else None
+        jpeg_bytes = sample.stat().st_size if size else 0
+        sample.unlink(missing_ok=True)
+        if not size: return None
+        n = int(frames) // self._sampling_step()
+        footprint = project_scene_footprint(n, jpeg_bytes, size[0], size[1], mesh)
+        self.log_line(f"[DISK] Projektion: {n} Frames à {jpeg_bytes / 1e6:.2f} MB -> "
+                      + ", ".join(f"{k} {v / 1e9:.1f} GB" for k, v in footprint.items() if v))
+        return footprint
+
+    def _disk_admit(self, scenes_dir, need, current):
+        """True if ``need`` bytes fit on the scenes volume, after cleanup and waiting if necessary."""
+        reserve = float(self.settings.get("disk_reserve_gb", 2.0)) * 1e9
+        free = lambda: shutil.disk_usage(scenes_dir).free - reserve
+        if need <= 0 or free() >= need: return True
+        self.log_line(f"[DISK] Benötigt {need / 1e9:.1f} GB, frei {max(0.0, free()) / 1e9:.1f} GB (Reserve {reserve / 1e9:.1f} GB)")
+        if self.settings.get("retention_cleanup", True):
+            retention_cleanup(scenes_dir, need - free(), exclude={current},
+                              keep_frames=self.settings.get("retention_keep_frames", True), log_fn=self.log_line)
+        deadline = time.monotonic() + float(self.settings.get("disk_wait_s", 0))
+        while free() < need and time.monotonic() < deadline and not self._stop_flag:
+            time.sleep(10)
+        return free() >= need
+
+    # --- Speicher-Zulassung ---
+    # Vor schweren Stufen: geschätzten Spitzenbedarf mit freiem RAM vergleichen und ggf. warten;
+    # während der Stufe: Prozess stoppen, bevor der freie RAM unter die Reserve fällt.
+    def _memory_shortfall(self, stage, workload):
+        """Missing KiB for ``stage`` after waiting up to mem_wait_s: 0 if it fits, None if unknown."""
+        need = estimate_stage_memory(self._mem_history, stage, workload); avail = available_memory_kb()
+        if need is None or avail is None: return None
+        if avail >= need: return 0
+        deadline = time.monotonic() + float(self.settings.get("mem_wait_s", 120))
+        self.log_line(f"[MEM] {stage} braucht ca. {need / 1048576:.1f} GB, frei {avail / 1048576:.1f} GB – warte…")
+        while avail < need and time.monotonic() < deadline and not self._stop_flag:
+            time.sleep(5); avail = available_memory_kb()
+            if avail is None: return None
+        if avail < need: self.log_line(f"[MEM] Nicht genug freier Speicher für {stage}.")
+        return max(0, need - avail)
+
+    def _run_guarded(self, stage, workload, run):
+        result = {}; reserve = int(self.settings.get("mem_reserve_mb", 1024)) * 1024; t0 = time.perf_counter()
+        code = run(lambda proc: watch_process_memory(proc, result, min_available_kb=reserve))
+        peak_txt = f", Spitzen-RAM {result['peak_kb'] / 1048576:.2f} GB" if result.get("peak_kb") else ""
+        self.log_line(f"[MEM] {stage}: {time.perf_counter() - t0:.1f}s{peak_txt}")
+        if result.get("oom_guard"):
+            self.log_line(f"[MEM] {stage} gestoppt: weniger als {reserve // 1024} MB RAM frei."); return code or 1
+        if code == 0 and result.get("peak_kb") and workload:
+            record = lambda history: record_stage_memory(history, stage, workload, result["peak_kb"])
+            try: self._mem_history = update_shared_file(self._mem_history_path, record, load_stage_memory, dump_json)
+            except Exception as e:
+                record(self._mem_history); self.log_line(f"[MEM] Warnung: {STAGE_MEMORY_FILE} nicht geschrieben: {e}")
+        return code
+
+    def _admit_patch_match(self, model_dir, profile, image_list=None):
+        """Dense profile to run, decided from the sparse model before undistortion; preview if final does not fit."""
+        if profile == "preview": return profile
+        try: mp = sparse_megapixels(model_dir, dense_profile_max_size(profile), image_list)
+        except Exception: return profile
+        if not self._memory_shortfall("patch_match_stereo", mp): return profile
+        self.log_line("[MEM] Wechsle auf das Dense-Profil preview.")
+        return "preview"
+
+    def _decimated_cloud(self, scene_dir, dense_dir):
+        src = Path(dense_dir) / "fused.ply"; dst = Path(dense_dir) / "fused_decimated.ply"
+        if not self.decimate_var.get(): return src
+        t0 = time.perf_counter()
+        try:
+            extent = sparse_extent(read_points3d_bin(Path(scene_dir) / "sparse" / "0" / "points3D.bin"))
+            if extent <= 0: return src
+            voxel = extent * float(self.settings.get("mesh_voxel_ratio", 0.002))
+            n_in, n_out = decimate_point_cloud(src, dst, voxel, int(self.settings.get("mesh_min_neighbours", 2)))
+        except Exception as e:
+            self.log_line(f"[MESH] Ausdünnung nicht möglich ({e}) – verwende fused.ply."); return src
+        self.log_line(f"[MESH] Punktwolke ausgedünnt: {n_in} -> {n_out} Punkte (Voxel {voxel:.4g}, {time.perf_counter() - t0:.1f}s)")
+        return dst if n_out else src
 
     def _run_pipeline(self, videos, ffmpeg, colmap, glomap):
         try:
             scenes_dir = Path(self.scenes_dir_var.get()); scenes_dir.mkdir(parents=True, exist_ok=True)
             overlap = int(self.seq_overlap_var.get().strip() or "15"); max_img = int(self.sift_max_img_var.get().strip() or "4096")
-            use_gpu = bool(self.use_gpu_var.get()); do_mesh = bool(self.mesh_var.get())
+            use_gpu = bool(self.use_gpu_var.get()); do_mesh = bool(self.mesh_var.get()); race = bool(self.race_mappers_var.get())
+            densify = bool(self.densify_var.get()); two_pass = bool(self.two_pass_var.get()); streaming = bool(self.streaming_var.get())
+            proxy_img = int(self.settings.get("proxy_max_image_size", 1024))
             steps_total = 8 if do_mesh else 4
-            for i, video in enumerate(videos, start=1):
-                if self._stop_flag: break
+            batch_metrics = []
+            self._threads = ThreadBudget(self.settings.get("thread_budget", 0))
+            max_img, overlap, use_gpu = self._apply_autotune_profile(ffmpeg, colmap, max_img, overlap, use_gpu)
+            self._mem_history_path = scenes_dir / STAGE_MEMORY_FILE
+            self._mem_history = load_stage_memory(self._mem_history_path)
+            self._time_history_path = scenes_dir / STAGE_TIME_FILE
+            self._time_history = load_stage_times(self._time_history_path)
+            glomap_ok = bool(glomap) and Path(glomap).exists()
+            mappers = ["glomap", "colmap"] if glomap_ok else ["colmap"]
+            dense_base = (self.dense_profile_var.get() if self.dense_profile_var.get() in DENSE_PROFILES else "final") if do_mesh else None
+            deadline = self._deadline_seconds(); batch_deadline = deadline and self.deadline_scope_var.get() == "batch"
+            batch_start = time.perf_counter(); expected_s = {}
+            def expected(v):
+                """Predicted runtime of a video with the current settings (SJF and batch budget)."""
+                if v not in expected_s:
+                    info = self._timing_video(ffmpeg, v); expected_s[v] = None
+                    if info:
+                        choices = self._timing_choices(info, max_img, overlap, use_gpu, mappers, dense_base)
+                        expected_s[v] = sum(predict_stage_times({k: c[0] for k, c in choices.items()}, info, self._time_history).values())
+                return expected_s[v]
+            done = set(); deferred = set(); i = 0
+            if self.joint_var.get() and len(videos) > 1:
+                metrics = self._run_joint(videos, ffmpeg, colmap, glomap, scenes_dir, max_img, overlap, use_gpu, race)
+                if metrics: batch_metrics.append(metrics)
+                for v in videos:
+                    self._job_begin(v); self._job_end("done" if metrics else "failed")
+                done.update(videos)  # alle Videos stecken in der gemeinsamen Szene
+            while not self._stop_flag:
+                self._job_end()
+                video, pending = self._next_queued(done, deferred, expected)
+                if video is None: break
+                done.add(video); i += 1; n_total = i + len(pending)
+                self._cancel = None
                 vpath = Path(video); base = vpath.stem
-                self.log_line(f"\n=== Verarbeite ({i}/{len(videos)}): {base} ===")
+                self.log_line(f"\n=== Verarbeite ({i}/{n_total}): {base} ===")
+                self._job_begin(video)
                 scene_dir = scenes_dir / base; img_dir = scene_dir / "images"; sparse_dir = scene_dir / "sparse"; db_path = scene_dir / "database.db"
                 img_dir.mkdir(parents=True, exist_ok=True); sparse_dir.mkdir(parents=True, exist_ok=True)
-                step = 1
-                self.log_line(f"[{step}/{steps_total}] {self.S['run_extract']}"); step += 1
-                code = self._ffmpeg_extract(ffmpeg, str(vpath), str(img_dir))
-                if code != 0:
-                    self.log_line(f"[ERROR] ffmpeg fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                if not any(p.suffix.lower() == ".jpg" for p in img_dir.glob("*.jpg")):
-                    self.log_line(f"[ERROR] Keine Frames extrahiert für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                self.log_line(f"[{step}/{steps_total}] {self.S['run_feat']}"); step += 1
-                code = self._colmap_feature_extractor(colmap, str(db_path), str(img_dir), max_img, use_gpu)
-                if code != 0:
-                    self.log_line(f"[ERROR] feature_extractor fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                self.log_line(f"[{step}/{steps_total}] {self.S['run_match']}"); step += 1
-                code = self._colmap_sequential_matcher(colmap, str(db_path), overlap, use_gpu)
-                if code != 0:
-                    self.log_line(f"[ERROR] sequential_matcher fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                self.log_line(f"[{step}/{steps_total}] {self.S['run_mapper']}"); step += 1
-                use_glomap = bool(glomap) and Path(glomap).exists()
-                code = self._glomap_mapper(glomap, str(db_path), str(img_dir), str(sparse_dir)) if use_glomap \
-                       else self._colmap_mapper(colmap, str(db_path), str(img_dir), str(sparse_dir))
-                if code != 0:
-                    self.log_line(f"[ERROR] mapper fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
+                self._camera_args = []; self._mapper_args = {}; self._plan = {}; self._timing = None
+                if densify and self._can_densify(scene_dir):
+                    footprint = self._project_footprint(ffmpeg, vpath, scenes_dir, False)
+                    if footprint and not self._disk_admit(scenes_dir, footprint["frames"] + footprint["database"] - path_size(img_dir) - path_size(db_path), base):
+                        self.log_line(f"[ERROR] Zu wenig Plattenplatz zum Ergänzen von {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                    if do_mesh: self.log_line("[DENSIFY] Dense-Rekonstruktion und Mesh werden beim Ergänzen nicht neu berechnet.")
+                    if self._densify_scene(ffmpeg, colmap, vpath, scene_dir, max_img, use_gpu) != 0:
+                        self.log_line(f"[ERROR] Densify fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                    batch_metrics.append(self._finalize_scene(ffmpeg, scene_dir)); self._job_end("done")
+                    self.log_line(f"✓ Fertig: {base}  ({i}/{n_total})"); self._advance_progress(i, n_total); continue
+                footprint = self._project_footprint(ffmpeg, vpath, scenes_dir, do_mesh)
+                if footprint and not self._disk_admit(scenes_dir, sum(footprint.values()), base):
+                    if video not in deferred:
+                        self.log_line(f"[DISK] Zu wenig Platz für {base} – ans Ende der Warteschlange verschoben.")
+                        deferred.add(video); done.discard(video); i -= 1; self._job_end("deferred"); continue
+                    self.log_line(f"[ERROR] Zu wenig Plattenplatz für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                budget = deadline
+                if batch_deadline:
+                    rest = sum(expected(v) or 0 for v in [video] + pending); left = max(0.0, deadline - (time.perf_counter() - batch_start))
+                    budget = left * (expected(video) or 0) / rest if rest else left / (len(pending) + 1)
+                self._start_timing(ffmpeg, vpath, budget, max_img, overlap, use_gpu, mappers, dense_base)
+                if streaming:
+                    step = 5; self._resume = set()
+                    self.log_line(f"[1-4/{steps_total}] {self.S['run_stream']}")
+                    if self._run_streaming(ffmpeg, colmap, vpath, scene_dir, self._planned("max_image_size", max_img),
+                                           self._planned("overlap", overlap), use_gpu) != 0:
+                        self.log_line(f"[ERROR] Streaming-Rekonstruktion fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                else:
+                    step = 1
+                    if self._resumed("extract", img_dir, scene_dir / EXTRACTION_FILE): step += 1
+                    else:
+                        self.log_line(f"[{step}/{steps_total}] {self.S['run_extract']}"); step += 1
+                        t_stage = time.perf_counter()
+                        code = self._ffmpeg_extract(ffmpeg, str(vpath), str(img_dir))
+                        if code != 0:
+                            self.log_line(f"[ERROR] ffmpeg fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        if not any(p.suffix.lower() == ".jpg" for p in img_dir.glob("*.jpg")):
+                            self.log_line(f"[ERROR] Keine Frames extrahiert für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        self._stage_done("extract", t_stage, images=sum(1 for _ in img_dir.glob("*.jpg")))
+                        self._save_extraction_info(ffmpeg, vpath, scene_dir)
+                    self._apply_intrinsics_library(scene_dir)
+                    if self._resumed("features", db_path): step += 1
+                    else:
+                        self.log_line(f"[{step}/{steps_total}] {self.S['run_feat']}"); step += 1
+                        v_max_img = self._planned("max_image_size", max_img); t_stage = time.perf_counter()
+                        code, gate_ok = self._features_with_gate(colmap, str(db_path), str(img_dir), min(v_max_img, proxy_img) if two_pass else v_max_img, use_gpu)
+                        if code != 0:
+                            self.log_line(f"[ERROR] feature_extractor fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        if not gate_ok:
+                            self.log_line(f"[ERROR] Zu wenige Keypoints für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        self._stage_done("features", t_stage)
+                    if self._resumed("matching", db_path): step += 1
+                    else:
+                        self.log_line(f"[{step}/{steps_total}] {self.S['run_match']}"); step += 1
+                        t_stage = time.perf_counter()
+                        code, gate_ok = self._matching_with_gate(colmap, str(db_path), self._planned("overlap", overlap), use_gpu)
+                        if code != 0:
+                            self.log_line(f"[ERROR] sequential_matcher fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        if not gate_ok:
+                            self.log_line(f"[ERROR] Zu wenige Korrespondenzen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        self._stage_done("matching", t_stage)
+                    if self._resumed("mapper", sparse_dir / "0"): step += 1
+                    else:
+                        self.log_line(f"[{step}/{steps_total}] {self.S['run_mapper']}"); step += 1
+                        use_glomap = glomap_ok and self._planned("mapper", "glomap") == "glomap"; t_stage = time.perf_counter()
+                        if use_glomap and race and not budget:
+                            code = self._mapper_race(glomap, colmap, str(db_path), str(img_dir), str(sparse_dir))
+                        else:
+                            code = self._glomap_mapper(glomap, str(db_path), str(img_dir), str(sparse_dir)) if use_glomap \
+                                   else self._colmap_mapper(colmap, str(db_path), str(img_dir), str(sparse_dir))
+                        if code != 0:
+                            self.log_line(f"[ERROR] mapper fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        self._stage_done("mapper", t_stage)
+                if two_pass and not streaming and self._planned("max_image_size", max_img) > proxy_img:
+                    self._export_camera_track(scene_dir, suffix="_preview"); self._resume = set()
+                    if self._refine_full_res(colmap, scene_dir, self._planned("max_image_size", max_img), self._planned("overlap", overlap), use_gpu) != 0:
+                        self.log_line(f"[WARN] Verfeinerung fehlgeschlagen für {base} – verwende Proxy-Lösung.")
                 if do_mesh:
-                    dense_dir = scene_dir / "dense"
+                    dense_dir = scene_dir / "dense"; self._stage_skipped = False
+                    if footprint and not self._disk_admit(scenes_dir, footprint["dense"] - path_size(dense_dir), base):
+                        self.log_line(f"[ERROR] Zu wenig Plattenplatz für die Dense-Rekonstruktion von {base}. Überspringe."); self._advance_progress(i, n_total); continue
                     dense_dir.mkdir(parents=True, exist_ok=True)
-                    self.log_line(f"[{step}/{steps_total}] {self.S['run_undistort']}"); step += 1
-                    code = self._colmap_image_undistorter(colmap, str(img_dir), str(sparse_dir), str(dense_dir))
-                    if code != 0:
-                        self.log_line(f"[ERROR] image_undistorter fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                    self.log_line(f"[{step}/{steps_total}] {self.S['run_patchmatch']}"); step += 1
-                    code = self._colmap_patch_match_stereo(colmap, str(dense_dir))
-                    if code != 0:
-                        self.log_line(f"[ERROR] patch_match_stereo fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                    self.log_line(f"[{step}/{steps_total}] {self.S['run_fuse']}"); step += 1
-                    code = self._colmap_stereo_fusion(colmap, str(dense_dir))
-                    if code != 0:
-                        self.log_line(f"[ERROR] stereo_fusion fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                    self.log_line(f"[{step}/{steps_total}] {self.S['run_mesher']}"); step += 1
-                    code = self._colmap_poisson_mesher(colmap, str(dense_dir))
-                    if code != 0:
-                        self.log_line(f"[ERROR] poisson_mesher fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, len(videos)); continue
-                sub0 = sparse_dir / "0"
-                if sub0.exists():
-                    self._colmap_model_converter(colmap, str(sub0), str(sub0)); self._colmap_model_converter(colmap, str(sub0), str(sparse_dir))
-                self.log_line(f"✓ Fertig: {base}  ({i}/{len(videos)})"); self._advance_progress(i, len(videos))
+                    if self._resumed("dense", dense_dir / "fused.ply"): step += 3
+                    else:
+                        profile = self._planned("dense_profile", dense_base); t_stage = time.perf_counter()
+                        image_list = self._dense_image_list(scene_dir)
+                        try: signature = dense_signature(sparse_dir / "0", profile, image_list)
+                        except Exception: signature = None
+                        reused = bool(signature and dense_depth_maps_reusable(dense_dir, signature))
+                        if not reused and self._admit_patch_match(sparse_dir / "0", profile, image_list) != profile:
+                            # Profil vor dem Entzerren festlegen, damit Bilder und Signatur zum Profil passen
+                            profile = "preview"
+                            try: signature = dense_signature(sparse_dir / "0", profile, image_list)
+                            except Exception: signature = None
+                            reused = bool(signature and dense_depth_maps_reusable(dense_dir, signature))
+                        if reused:
+                            self.log_line(f"[{step}-{step + 1}/{steps_total}] [DENSE] Tiefenkarten ({profile}) aus früherem Lauf wiederverwendet"); step += 2
+                        else:
+                            (dense_dir / DENSE_SIGNATURE_FILE).unlink(missing_ok=True)
+                            for sub in ("images", "stereo"): shutil.rmtree(dense_dir / sub, ignore_errors=True)
+                            self.log_line(f"[{step}/{steps_total}] {self.S['run_undistort']}"); step += 1
+                            code = self._colmap_image_undistorter(colmap, str(img_dir), str(sparse_dir), str(dense_dir), image_list,
+                                                                  extra_args=DENSE_PROFILES[profile]["undistort"])
+                            if code == 0:
+                                self.log_line(f"[{step}/{steps_total}] {self.S['run_patchmatch']} ({profile})"); step += 1
+                                mp = dense_megapixels(dense_dir, dense_profile_max_size(profile))
+                                code = self._run_guarded("patch_match_stereo", mp, lambda on_start: self._colmap_patch_match_stereo(
+                                    colmap, str(dense_dir), extra_args=DENSE_PROFILES[profile]["patch_match"], on_start=on_start))
+                                if code != 0 and not self._stage_skipped:
+                                    self.log_line(f"[ERROR] patch_match_stereo fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                            elif not self._stage_skipped:
+                                self.log_line(f"[ERROR] image_undistorter fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                            if code == 0 and signature:
+                                with open(dense_dir / DENSE_SIGNATURE_FILE, "w", encoding="utf-8") as f: json.dump(signature, f, indent=2)
+                        if not self._stage_skipped:
+                            self.log_line(f"[{step}/{steps_total}] {self.S['run_fuse']}"); step += 1
+                            mp = dense_megapixels(dense_dir, dense_profile_max_size(profile))
+                            self._memory_shortfall("stereo_fusion", mp)
+                            code = self._run_guarded("stereo_fusion", mp, lambda on_start: self._colmap_stereo_fusion(
+                                colmap, str(dense_dir), extra_args=DENSE_PROFILES[profile]["fusion"], on_start=on_start))
+                            if code != 0 and not self._stage_skipped:
+                                self.log_line(f"[ERROR] stereo_fusion fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                            if code == 0: self._stage_done("dense", t_stage, record=not reused)
+                    if not self._stage_skipped:
+                        self.log_line(f"[{step}/{steps_total}] {self.S['run_mesher']}"); step += 1
+                        t_stage = time.perf_counter()
+                        code = self._mesh_stage(colmap, scene_dir, dense_dir)
+                        if code != 0 and not self._stage_skipped:
+                            self.log_line(f"[ERROR] Mesher fehlgeschlagen für {base}. Überspringe."); self._advance_progress(i, n_total); continue
+                        if code == 0: self._stage_done("mesh", t_stage)
+                    if self._stage_skipped:
+                        self.log_line(f"[STOP] Stufe abgebrochen – restliche Dense-/Mesh-Stufen für {base} übersprungen.")
+                if self._cancel in ("video", "batch"):
+                    self.log_line(f"[STOP] {base} abgebrochen."); self._advance_progress(i, n_total); continue
+                self._timing_report(scene_dir)
+                batch_metrics.append(self._finalize_scene(ffmpeg, scene_dir)); self._job_end("done")
+                self.log_line(f"✓ Fertig: {base}  ({i}/{n_total})"); self._advance_progress(i, n_total)
+            self._job_end()
+            self._metrics_summary(scenes_dir, batch_metrics)
             self.log_line("\\n" + self.S["done_all"])
         except Exception as e:
             self.log_line(f"[FATAL] {e}")
         finally:
-            try: self.after(0, self._stop_elapsed); self.after(0, lambda: self.run_btn.config(state="normal"))
-            except Exception: self.run_btn.config(state="normal")
+            self._job_end(); self._cancel = None; self._plan = {}; self._timing = None
+            try: self.after(0, self._stop_elapsed); self.after(0, lambda: self._set_running(False))
+            except Exception: self._set_running(False)
+
+    # --- Job-Datenbank ---
+    # Öffnet jobs.db im Projektordner, beendet Versuche eines abgestürzten Laufs und stellt die
+    # Warteschlange (inkl. Prioritäten) in der Liste wieder her.
+    def _open_job_store(self):
+        if self._jobs: self._jobs.close(); self._jobs = None
+        top = Path(self.top_dir_var.get())
+        if not str(top) or not top.is_dir(): return
+        try:
+            self._jobs = JobStore(top / JOB_DB_FILE); interrupted = self._jobs.recover(); queued = self._jobs.queued()
+        except Exception as e:
+            self.log_line(f"[JOBS] Job-Datenbank nicht verfügbar: {e}"); self._jobs = None; return
+        existing = set(self.video_list.get(0, "end"))
+        for video, priority, _ in queued:
+            self._priorities[video] = priority
+            if video not in existing: self.video_list.insert("end", video)
+        if interrupted:
+            self.log_line(f"[JOBS] {len(interrupted)} unterbrochene(r) Job(s) – werden beim nächsten Start fortgesetzt: "
+                          + ", ".join(Path(v).name for v in interrupted))
+        self._sync_queue()
+
+    # --- Ordnerüberwachung ---
+    # Der Watcher läuft in einem eigenen Thread; Meldungen gehen per after() in den Tk-Thread.
+    # Neue Videos landen wie beim Start in der Liste (ohne vorhandenen Szenenordner), ein laufender
+    # Batch übernimmt sie über _next_queued. Ein geändertes Video verliert seine erledigten Stufen
+    # und wird, falls der laufende Batch es schon bearbeitet hat, über _requeue erneut eingeplant.
+    def _start_watcher(self):
+        if self._watcher: self._watcher.stop(); self._watcher = None
+        vids_dir = Path(self.top_dir_var.get()) / DEFAULT_DIRS["videos"]
+        if not self.settings.get("watch_videos", True) or not vids_dir.is_dir(): return
+        self._watcher = FolderWatcher(vids_dir, lambda path, changed: self.after(0, lambda: self._ingest_video(path, changed)),
+                                      stable_s=float(self.settings.get("watch_stable_s", 10)),
+                                      poll_s=float(self.settings.get("watch_poll_s", 2)),
+                                      mode=self.settings.get("watch_mode", "auto"),
+                                      log=lambda text: self.after(0, lambda: self.log_line(text))).start()
+        self.log_line(f"[WATCH] Überwache {vids_dir} ({self._watcher.mode})")
+
+    def _ingest_video(self, path, changed):
+        listed = path in self.video_list.get(0, "end")
+        if changed and self._jobs:
+            try: self._jobs.invalidate(path)
+            except Exception as e: self.log_line(f"[JOBS] Warnung: {e}")
+        if listed:
+            if changed:
+                with self._queue_lock: self._requeue.add(path)
+                self.log_line(f"[WATCH] Geändert: {Path(path).name} – erledigte Stufen verworfen")
+            return
+        if not changed and (Path(self.top_dir_var.get()) / DEFAULT_DIRS["scenes"] / Path(path).stem).exists(): return
+        self.video_list.insert("end", path); self._sync_queue()
+        self.log_line(f"[WATCH] {'Geändert' if changed else 'Neu'}: {Path(path).name} – zur Warteschlange hinzugefügt")
+
+    def _job_begin(self, video):
+        self._resume = set(); self._last_error = None
+        if not self._jobs: return
+        try: self._job_attempt, completed = self._jobs.begin(video)
+        except Exception as e:
+            self.log_line(f"[JOBS] Warnung: Job nicht gespeichert: {e}"); return
+        self._resume = set(completed)
+        if completed: self.log_line(f"[JOBS] Fortsetzung – bereits erledigt: {', '.join(completed)}")
+
+    def _job_end(self, outcome=None):
+        """Close the open attempt; without an explicit outcome it failed or was cancelled."""
+        if not (self._jobs and self._job_attempt): return
+        if outcome is None: outcome = "cancelled" if self._stop_flag or self._cancel in ("video", "batch") else "failed"
+        try: self._jobs.finish(self._job_attempt, outcome, self._last_error if outcome == "failed" else None)
+        except Exception as e: self.log_line(f"[JOBS] Warnung: Ergebnis nicht gespeichert: {e}")
+        self._job_attempt = None
+
+    def _resumed(self, stage, *outputs):
+        """True when an earlier attempt completed ``stage`` and its outputs are still there.
+
+        The first stage that has to run again ends the resumption: later stages depend on its new output.
+        """
+        if stage not in self._resume or not all(Path(p).is_file() or (Path(p).is_dir() and any(Path(p).iterdir())) for p in outputs):
+            self._resume = set(); return False
+        self.log_line(f"[JOBS] {stage}: aus dem unterbrochenen Lauf übernommen"); return True
+
+    # --- Zeitplanung / Deadline-Modus ---
+    # Pro Video entsteht ein Plan (ohne Deadline = die eingestellten Werte), jede Stufe wird
+    # gemessen und ihre Rate in stage_times.json gelernt. Mit Deadline wählt plan_for_budget
+    # Sampling, Skalierung, max_image_size, Overlap, Mapper und Dense-Profil; liegt der Lauf
+    # nach einer Stufe hinter der Vorhersage, werden die restlichen Stufen neu geplant.
+    # timing.json im Szenenordner hält Vorhersage und Ist-Zeit pro Stufe fest.
+    def _deadline_seconds(self):
+        try: return float(self.deadline_var.get().strip().replace(",", ".") or 0) * 60 or None
+        except ValueError: return None
+
+    def _timing_video(self, ffmpeg, vpath):
+        info = ffprobe_video_info(ffmpeg, vpath) or {}
+        if not (info.get("nb_frames") and info.get("width") and info.get("height")): return None
+        return {"nb_frames": int(info["nb_frames"]), "width": int(info["width"]), "height": int(info["height"]),
+                "dense_share": DENSE_KEYFRAME_SHARE if self.dense_kf_var.get() else 1.0}
+
+    def _timing_choices(self, video, max_img, overlap, use_gpu, mappers, dense_profile):
+        w, h = video["width"], video["height"]; mode = self.res_mode.get()
+        try: sw, sh = int(self.width_var.get().strip() or 0), int(self.height_var.get().strip() or 0)
+        except ValueError: sw = sh = 0
+        out_w, out_h = {"w": (sw, h * sw / w if sw else 0), "h": (w * sh / h if sh else 0, sh), "wh": (sw, sh)}.get(mode, (w, h))
+        long_side = int(max(out_w, out_h)) or max(w, h)
+        return plan_choices(video, self._sampling_step(), long_side, max_img, overlap, use_gpu, mappers, dense_profile,
+                            scale_free=(mode == "keep"))
+
+    def _start_timing(self, ffmpeg, vpath, budget, max_img, overlap, use_gpu, mappers, dense_profile):
+        self._plan = {}; self._timing = None
+        video = self._timing_video(ffmpeg, vpath)
+        if not video:
+            if budget: self.log_line("[DEADLINE] Keine Videoinfos (ffprobe) – Zeitbudget wird ignoriert.")
+            return
+        choices = self._timing_choices(video, max_img, overlap, use_gpu, mappers, dense_profile)
+        if budget:
+            plan, predicted, fits = plan_for_budget(video, choices, budget, self._time_history)
+            self._plan = {"step": plan["step"]}
+            if plan["long_side"] < max(video["width"], video["height"]) and self.res_mode.get() == "keep":
+                self._plan["scale"] = f"scale={plan['long_side']}:-2" if video["width"] >= video["height"] else f"scale=-2:{plan['long_side']}"
+            self.log_line(f"[DEADLINE] Budget {budget / 60:.1f} min, Vorhersage {sum(predicted.values()) / 60:.1f} min: "
+                          f"jeder {plan['step']}. Frame, Längsseite {plan['long_side']}, max_image_size {plan['max_image_size']}, "
+                          f"Overlap {plan['overlap']}, Mapper {plan['mapper']}" + (f", Dense {plan['dense_profile']}" if plan["dense_profile"] else ""))
+            if not fits: self.log_line("[DEADLINE] Warnung: auch der schnellste Plan passt nicht ins Budget.")
+        else:
+            plan = {k: v[0] for k, v in choices.items()}; predicted = predict_stage_times(plan, video, self._time_history)
+        self._timing = {"video": video, "choices": choices, "plan": plan, "budget": budget, "start": time.perf_counter(),
+                        "predicted": predicted, "actual": {}}
+
+    def _planned(self, key, default):
+        """Parameter from the deadline plan, or ``default`` without a deadline."""
+        return self._timing["plan"][key] if self._timing and self._timing["budget"] else default
+
+    def _stage_done(self, stage, t0, images=None, record=True):
+        seconds = time.perf_counter() - t0
+        if self._jobs and self._job_attempt:
+            try: self._jobs.stage_done(self._job_attempt, stage, time.time() - seconds, seconds)
+            except Exception as e: self.log_line(f"[JOBS] Warnung: Stufe nicht gespeichert: {e}")
+        t = self._timing
+        if not t: return
+        t["actual"][stage] = seconds
+        if record:
+            key, load = plan_workloads(t["plan"], t["video"])[stage]
+            record = lambda history: record_stage_time(history, key, load, seconds)
+            try: self._time_history = update_shared_file(self._time_history_path, record, load_stage_times, dump_json)
+            except Exception: record(self._time_history)
+        if images: t["video"]["images"] = images
+        for k in PLAN_FIXED_AFTER.get(stage, ()): t["choices"][k] = [t["plan"][k]]
+        if not t["budget"]: return
+        done = set(t["actual"]); left = t["budget"] - (time.perf_counter() - t["start"])
+        remaining = predict_stage_times(t["plan"], t["video"], self._time_history, done)
+        if not remaining or sum(remaining.values()) <= left: return
+        plan, predicted, fits = plan_for_budget(t["video"], t["choices"], left, self._time_history, done)
+        changes = [f"{k} {t['plan'][k]} → {plan[k]}" for k in plan if plan[k] != t["plan"][k]]
+        self.log_line(f"[DEADLINE] Rückstand nach {stage}: noch {max(0, left):.0f}s, Vorhersage {sum(remaining.values()):.0f}s"
+                      + (f" – passe an: {', '.join(changes)}" if changes else " – nichts mehr anzupassen"))
+        t["plan"] = plan; t["predicted"].update(predicted)
+
+    def _timing_report(self, scene_dir):
+        t = self._timing
+        if not t: return
+        stages = {s: {"predicted_s": round(t["predicted"][s], 1) if s in t["predicted"] else None,
+                      "actual_s": round(t["actual"][s], 1) if s in t["actual"] else None}
+                  for s in PLAN_STAGES if s in t["predicted"] or s in t["actual"]}
+        for s, row in stages.items():
+            pred = f"{row['predicted_s']:.0f}s" if row["predicted_s"] is not None else "–"
+            act = f"{row['actual_s']:.0f}s" if row["actual_s"] is not None else "–"
+            self.log_line(f"[ZEIT] {s:<9} Vorhersage {pred:>7}  Ist {act:>7}")
+        total = time.perf_counter() - t["start"]
+        self.log_line(f"[ZEIT] Gesamt {total:.0f}s" + (f" von {t['budget']:.0f}s Budget" if t["budget"] else ""))
+        try:
+            with open(Path(scene_dir) / TIMING_FILE, "w", encoding="utf-8") as f:
+                json.dump({"budget_s": t["budget"], "total_s": round(total, 1), "plan": t["plan"], "stages": stages}, f, indent=2)
+        except Exception as e:
+            self.log_line(f"[ZEIT] Warnung: {TIMING_FILE} nicht geschrieben: {e}")
+
+    # --- Autotuning ---
+    # „Autotune“ misst auf einer Stichprobe des markierten (sonst ersten) Videos und speichert ein
+    # Profil für diesen Rechner. _run_pipeline übernimmt es für Felder, die noch auf dem
+    # eingebauten Standard stehen (max_image_size 4096, Overlap 15, GPU an, thread_budget 0).
+    def start_autotune(self):
+        if getattr(self, "_worker", None) and self._worker.is_alive():
+            messagebox.showinfo("Info", self.S["warn_running"]); return
+        videos = list(self.video_list.get(0, "end")); sel = self.video_list.curselection()
+        if not videos: messagebox.showwarning("Warnung", self.S["warn_no_videos"]); return
+        ffmpeg = self.ffmpeg_entry.get_text(); colmap = self.colmap_entry.get_text()
+        if not ffmpeg or not Path(ffmpeg).exists():
+            messagebox.showerror("Fehler", self.S["err_ffmpeg"]); return
+        if not colmap or not Path(colmap).exists():
+            messagebox.showerror("Fehler", self.S["err_colmap"]); return
+        self._stop_flag = False; self._cancel = None; self._set_running(True)
+        self.log.delete("1.0", "end"); self._start_elapsed()
+        video = videos[sel[0]] if sel else videos[0]
+        self._worker = threading.Thread(target=self._run_autotune, args=(video, ffmpeg, colmap), daemon=True); self._worker.start()
+
+    def _autotune_key(self, ffmpeg, colmap):
+        fingerprint, desc = hardware_fingerprint(); versions = tool_versions(ffmpeg, colmap)
+        return autotune_key(fingerprint, versions), desc, versions
+
+    def _run_autotune(self, video, ffmpeg, colmap):
+        work = Path(self.scenes_dir_var.get()) / ".autotune"; img_dir = work / "images"; db_path = work / "bench.db"
+        try:
+            shutil.rmtree(work, ignore_errors=True); img_dir.mkdir(parents=True)
+            self._threads = ThreadBudget(self.settings.get("thread_budget", 0)); self._camera_args = []
+            n_frames = max(8, int(self.settings.get("autotune_sample_frames", 40)))
+            info = ffprobe_video_info(ffmpeg, video) or {}
+            step = self._sampling_step(); fps = info.get("fps") or 25.0
+            start = max(0.0, (info.get("duration") or 0) / 2 - n_frames * step / fps / 2)
+            self.log_line(f"[AUTOTUNE] Stichprobe: {n_frames} Frames aus {Path(video).name} ab {start:.1f}s")
+            if self._ffmpeg_extract(ffmpeg, str(video), str(img_dir), sample=(start, n_frames)) != 0:
+                self.log_line("[ERROR] Autotune: ffmpeg fehlgeschlagen."); return
+            first = next(iter(sorted(img_dir.glob("frame_*.jpg"))), None)
+            size = jpeg_size(first) if first else None
+            if not size: self.log_line("[ERROR] Autotune: keine Frames extrahiert."); return
+            key, desc, versions = self._autotune_key(ffmpeg, colmap)
+            self.log_line(f"[AUTOTUNE] {desc}")
+            gpu = detect_cuda() and "--SiftExtraction.use_gpu" in run_and_capture([colmap, "feature_extractor", "-h"])[1]
+            min_matches = int(self.settings.get("gate_min_pair_matches", 30)); results = []
+            for cfg in autotune_grid(max(size), self._threads.total, gpu):
+                if self._stop_flag or self._cancel: break
+                db_path.unlink(missing_ok=True); t0 = time.perf_counter()
+                code = self._colmap_feature_extractor(colmap, str(db_path), str(img_dir), cfg["max_image_size"], cfg["use_gpu"],
+                                                      extra_args=[COLMAP_THREAD_FLAGS["feature_extractor"], str(cfg["threads"])])
+                if code == 0:
+                    code = self._colmap_sequential_matcher(colmap, str(db_path), AUTOTUNE_MAX_OVERLAP, cfg["use_gpu"],
+                                                           extra_args=[COLMAP_THREAD_FLAGS["sequential_matcher"], str(cfg["threads"])])
+                result = dict(cfg, seconds=round(time.perf_counter() - t0, 2), quality=0.0)
+                if code == 0:
+                    db = colmap_db_stats(db_path)
+                    result.update(quality=round(match_quality(db, min_matches), 1), overlap=overlap_from_matches(db, min_matches))
+                results.append(result)
+                self.log_line(f"[AUTOTUNE] max_image_size={cfg['max_image_size']} threads={cfg['threads']} "
+                              f"{'GPU' if cfg['use_gpu'] else 'CPU'}: {result['seconds']:.1f}s, Qualität {result['quality']:.0f}"
+                              + ("" if code == 0 else f" (exit={code})"))
+            best = select_autotune_result(results, float(self.settings.get("autotune_quality_ratio", 0.8)))
+            if not best: self.log_line("[ERROR] Autotune: kein Durchlauf erfolgreich – kein Profil gespeichert."); return
+            # volle Auflösung der Stichprobe gewonnen -> nicht unter die Auflösung späterer Videos begrenzen
+            profile = {"max_image_size": best["max_image_size"] if best["max_image_size"] < max(size) else 4096,
+                       "overlap": max(5, best["overlap"]), "use_gpu": best["use_gpu"], "threads": best["threads"],
+                       "hardware": desc, "versions": versions, "sample": Path(video).name, "results": results,
+                       "updated": time.strftime("%Y-%m-%d %H:%M:%S")}
+            profiles = load_autotune_profiles(AUTOTUNE_FILE); profiles[key] = profile; save_autotune_profiles(AUTOTUNE_FILE, profiles)
+            self.log_line(f"[AUTOTUNE] Profil gespeichert: max_image_size={profile['max_image_size']}, Overlap={profile['overlap']}, "
+                          f"{'GPU' if profile['use_gpu'] else 'CPU'}, {profile['threads']} Threads")
+        except Exception as e:
+            self.log_line(f"[FATAL] {e}")
+        finally:
+            shutil.rmtree(work, ignore_errors=True); self._cancel = None
+            try: self.after(0, self._stop_elapsed); self.after(0, lambda: self._set_running(False))
+            except Exception: self._set_running(False)
+
+    def _apply_autotune_profile(self, ffmpeg, colmap, max_img, overlap, use_gpu):
+        if not self.settings.get("autotune_use_profile", True) or not AUTOTUNE_FILE.exists(): return max_img, overlap, use_gpu
+        profile = load_autotune_profiles(AUTOTUNE_FILE).get(self._autotune_key(ffmpeg, colmap)[0])
+        if not profile:
+            self.log_line("[AUTOTUNE] Kein Profil für diese Hardware/Tool-Versionen – verwende die Eingaben."); return max_img, overlap, use_gpu
+        used = []
+        if self.sift_max_img_var.get().strip() in ("", "4096"):
+            max_img = int(profile["max_image_size"]); used.append(f"max_image_size={max_img}")
+        if self.seq_overlap_var.get().strip() in ("", "15"):
+            overlap = int(profile["overlap"]); used.append(f"Overlap={overlap}")
+        if use_gpu and not profile["use_gpu"]:
+            use_gpu = False; used.append("CPU")
+        if not int(self.settings.get("thread_budget", 0)) and profile.get("threads"):
+            self._threads = ThreadBudget(profile["threads"]); used.append(f"{profile['threads']} Threads")
+        self.log_line(f"[AUTOTUNE] Profil vom {profile.get('updated', '?')}: {', '.join(used) or 'Eingaben weichen ab, nicht verwendet'}")
+        return max_img, overlap, use_gpu
+
+    # --- Dense-Keyframes ---
+    def _dense_image_list(self, scene_dir):
+        if not self.dense_kf_var.get(): return None
+        try:
+            model = read_colmap_model(Path(scene_dir) / "sparse" / "0")
+            names = select_dense_keyframes(model, float(self.settings.get("dense_kf_baseline_ratio", 0.05)),
+                                           float(self.settings.get("dense_kf_max_angle", 10.0)),
+                                           float(self.settings.get("dense_kf_min_overlap", 0.6)))
+        except Exception as e:
+            self.log_line(f"[DENSE] Keyframe-Auswahl nicht möglich ({e}) – verwende alle Bilder."); return None
+        if not names or len(names) >= len(model[1]): return None
+        list_path = Path(scene_dir) / "dense_images.txt"
+        list_path.write_text("\n".join(names) + "\n", encoding="utf-8")
+        self.log_line(f"[DENSE] {len(names)} von {len(model[1])} registrierten Bildern als Keyframes")
+        return list_path
+
+    # --- Abschluss pro Szene ---
+    # TXT-Export, Kamera-Track (+ volle Framerate) und Metriken.
+    def _finalize_scene(self, ffmpeg, scene_dir):
+        sparse_dir = Path(scene_dir) / "sparse"; sub0 = sparse_dir / "0"
+        if sub0.exists():
+            self._export_model_txt(sub0, sparse_dir)
+            for video in load_extraction_info(scene_dir).get("joint_videos") or [None]:
+                frames = self._export_camera_track(scene_dir, video=video)
+                if frames and self.interp_full_var.get():
+                    self._export_full_rate_track(ffmpeg, scene_dir, frames, video=video)
+        metrics = self._scene_metrics(scene_dir)
+        if sub0.exists(): self._update_intrinsics_library(scene_dir, metrics)
+        return metrics
+
+    # --- Intrinsics-Bibliothek ---
+    # Vor der Feature-Extraktion: bekannte Parameter per --ImageReader.camera_params injizieren
+    # (optional im Mapper fixieren). Nach einem guten Solve: Parameter in die Bibliothek schreiben.
+    def _intrinsics_library_path(self):
+        return Path(self.scenes_dir_var.get()) / INTRINSICS_LIBRARY_FILE
+
+    def _scene_intrinsics_key(self, scene_dir, camera_model):
+        first = next(iter(sorted(Path(scene_dir, "images").glob("frame_*.jpg"))), None)
+        size = jpeg_size(first) if first else None
+        if not size: return None
+        key, has_tags = intrinsics_key(camera_model, size[0], size[1], load_extraction_info(scene_dir).get("tags"))
+        if not has_tags and not self.settings.get("intrinsics_match_without_tags", False): return None
+        return key
+
+    def _apply_intrinsics_library(self, scene_dir):
+        self._camera_args = []; self._mapper_args = {}
+        if not self.intrinsics_lib_var.get(): return
+        model = self.settings.get("intrinsics_camera_model", "SIMPLE_RADIAL")
+        key = self._scene_intrinsics_key(scene_dir, model)
+        entry = load_intrinsics_library(self._intrinsics_library_path()).get(key) if key else None
+        if not entry:
+            # Modell trotzdem vorgeben, damit der spätere Eintrag unter demselben Schlüssel landet
+            self._camera_args = ["--ImageReader.camera_model", model]
+            self.log_line(f"[INTRINSICS] Keine gespeicherten Parameter für diese Kamera – Autokalibrierung ({model})."); return
+        self._camera_args = ["--ImageReader.camera_model", entry["model"],
+                             "--ImageReader.camera_params", ",".join(repr(float(p)) for p in entry["params"])]
+        if self.intrinsics_fix_var.get():
+            self._mapper_args = {"colmap": ["--Mapper.ba_refine_focal_length", "0", "--Mapper.ba_refine_principal_point", "0",
+                                            "--Mapper.ba_refine_extra_params", "0"],
+                                 "glomap": ["--BundleAdjustment.optimize_intrinsics", "0"]}
+        self.log_line(f"[INTRINSICS] Verwende {entry['model']} aus {entry.get('scene', '?')} "
+                      f"({'fixiert' if self._mapper_args else 'als Startwert'})")
+
+    def _update_intrinsics_library(self, scene_dir, metrics):
+        if not self.intrinsics_lib_var.get(): return
+        ratio, err = metrics.get("registered_ratio"), metrics.get("mean_reproj_error")
+        if ratio is None or err is None or ratio < self.settings.get("metrics_min_registered_ratio", 0.9) \
+                or err > self.settings.get("metrics_max_reproj_error", 1.5):
+            return
+        try:
+            cameras = read_cameras_bin(Path(scene_dir) / "sparse" / "0" / "cameras.bin")
+        except Exception:
+            return
+        if len(cameras) != 1: return
+        cam = next(iter(cameras.values())); model = self.settings.get("intrinsics_camera_model", "SIMPLE_RADIAL")
+        if cam.model != model: return  # gelöst mit einem anderen Modell, passt nicht zum Schlüssel
+        key = self._scene_intrinsics_key(scene_dir, model)
+        if not key: return
+        stored = []
+        def _store(library):
+            old = library.get(key)
+            if old and old.get("reproj_error", float("inf")) <= err: return
+            library[key] = {"model": cam.model, "width": cam.width, "height": cam.height, "params": list(cam.params),
+                            "reproj_error": err, "registered_ratio": ratio, "scene": Path(scene_dir).name,
+                            "updated": time.strftime("%Y-%m-%d %H:%M:%S")}
+            stored.append(key)
+        try:
+            update_shared_file(self._intrinsics_library_path(), _store, load_intrinsics_library, dump_json)
+            if stored: self.log_line(f"[INTRINSICS] Parameter gespeichert ({key})")
+        except Exception as e:
+            self.log_line(f"[INTRINSICS] Warnung: Bibliothek nicht geschrieben: {e}")
+
+    # --- Streaming-Rekonstruktion ---
+    # ffmpeg läuft im Hintergrund; fertige Frames (der nächste existiert bereits bzw. ffmpeg
+    # ist beendet) werden blockweise verarbeitet: Features inkrementell, Matching gegen das
+    # Ende des bisherigen Tracks, erster Block per mapper, danach image_registrator +
+    # bundle_adjuster in das wachsende Modell. Nach jedem Block wird der Track exportiert.
+    def _run_streaming(self, ffmpeg, colmap, vpath, scene_dir, max_img, overlap, use_gpu):
+        scene_dir = Path(scene_dir); img_dir = scene_dir / "images"; db_path = scene_dir / "database.db"
+        sparse_dir = scene_dir / "sparse"; sparse0 = sparse_dir / "0"
+        chunk = max(2, int(self.settings.get("stream_chunk_frames", 40)))
+        db_path.unlink(missing_ok=True); shutil.rmtree(sparse0, ignore_errors=True)
+        for f in img_dir.glob("frame_*.jpg"): f.unlink()
+        self._save_extraction_info(ffmpeg, vpath, scene_dir)  # vorab, damit Live-Exporte das Sampling kennen
+        result = {}
+        def _extract():
+            result["code"] = self._ffmpeg_extract(ffmpeg, str(vpath), str(img_dir), on_start=lambda proc: result.update(proc=proc))
+        extractor = threading.Thread(target=_extract, daemon=True)
+        self._stage_concurrency = 2  # ffmpeg läuft parallel zu den COLMAP-Blöcken
+        try:
+            extractor.start()
+            return self._stream_loop(colmap, scene_dir, extractor, result, chunk, max_img, overlap, use_gpu)
+        finally:
+            extractor.join(); self._stage_concurrency = 1
+
+    def _stream_loop(self, colmap, scene_dir, extractor, result, chunk, max_img, overlap, use_gpu):
+        img_dir = scene_dir / "images"; sparse0 = scene_dir / "sparse" / "0"
+        t0 = time.time(); done = []; pending = []; next_idx = 1; first_camera = None
+        while True:
+            finished = not extractor.is_alive()
+            # nur per stat weiterzählen: Frame k ist fertig, sobald k+1 existiert
+            while (img_dir / f"frame_{next_idx:06d}.jpg").exists() and (finished or (img_dir / f"frame_{next_idx + 1:06d}.jpg").exists()):
+                pending.append(f"frame_{next_idx:06d}.jpg"); next_idx += 1
+            if len(pending) >= chunk or (finished and pending):
+                batch, pending = pending[:chunk], pending[chunk:]
+                code = self._stream_chunk(colmap, scene_dir, batch, done, max_img, overlap, use_gpu, first_camera)
+                if code != 0:
+                    # Rest des Videos wird nicht mehr gebraucht
+                    if result.get("proc"): terminate_proc(result["proc"], grace=0.5)
+                    extractor.join(); return code
+                done.extend(batch)
+                if not first_camera:
+                    try: first_camera = min(colmap_db_images(scene_dir / "database.db").values())[1]
+                    except Exception: first_camera = None
+                if sparse0.exists() and self._export_camera_track(scene_dir, suffix="_live"):
+                    self.log_line(f"[STREAM] Live-Track nach {time.time() - t0:.0f}s: {len(done)} Frames verarbeitet")
+                continue
+            if finished: break
+            time.sleep(0.5)
+        if result.get("code", 1) != 0 or not done:
+            return result.get("code", 1) or 1
+        if not sparse0.exists():
+            self.log_line("[STREAM] Kein Modell initialisiert."); return 1
+        return self._colmap_bundle_adjuster(colmap, str(sparse0), str(sparse0))
+
+    def _stream_chunk(self, colmap, scene_dir, batch, done, max_img, overlap, use_gpu, camera_id):
+        scene_dir = Path(scene_dir); img_dir = scene_dir / "images"; db_path = scene_dir / "database.db"
+        sparse_dir = scene_dir / "sparse"; sparse0 = sparse_dir / "0"
+        self.log_line(f"[STREAM] Block {batch[0]} … {batch[-1]} ({len(batch)} Frames)")
+        list_path = scene_dir / "stream_images.txt"; pairs_path = scene_dir / "stream_pairs.txt"
+        list_path.write_text("\n".join(batch) + "\n", encoding="utf-8")
+        extra = ["--image_list_path", str(list_path)]
+        if camera_id: extra += ["--ImageReader.existing_camera_id", str(camera_id)]
+        else: self._apply_intrinsics_library(scene_dir)
+        code = self._colmap_feature_extractor(colmap, str(db_path), str(img_dir), max_img, use_gpu, extra_args=extra)
+        if code != 0: return code
+        window = done[-overlap:] + batch; pairs = []
+        for k, name in enumerate(window):
+            if name not in batch: continue
+            pairs.extend((other, name) for other in window[max(0, k - overlap):k])
+        pairs_path.write_text("\n".join(f"{a} {b}" for a, b in pairs) + "\n", encoding="utf-8")
+        code = self._colmap_matches_importer(colmap, str(db_path), str(pairs_path), use_gpu)
+        if code != 0: return code
+        if not (sparse0 / "images.bin").exists():
+            # Initialisierung; scheitert sie, wird mit dem nächsten Block erneut versucht
+            if self._colmap_mapper(colmap, str(db_path), str(img_dir), str(sparse_dir)) != 0 or not (sparse0 / "images.bin").exists():
+                self.log_line("[STREAM] Initialisierung noch nicht möglich – warte auf weitere Frames.")
+            return 0
+        out_dir = sparse_dir / "0_stream"; shutil.rmtree(out_dir, ignore_errors=True); out_dir.mkdir(parents=True)
+        code = self._colmap_image_registrator(colmap, str(db_path), str(sparse0), str(out_dir))
+        if code == 0:
+            code = self._colmap_bundle_adjuster(colmap, str(out_dir), str(out_dir),
+                                                extra_args=["--BundleAdjustment.max_num_iterations", "25"])
+        if code != 0:
+            shutil.rmtree(out_dir, ignore_errors=True); return code
+        shutil.rmtree(sparse0, ignore_errors=True); shutil.move(str(out_dir), str(sparse0))
+        return 0
+
+    # --- Zwei-Pass: Verfeinerung in voller Auflösung ---
+    # Pass 1 löst auf Proxy-Features (proxy_max_image_size). Pass 2 extrahiert Features in
+    # voller Auflösung nur für registrierte Bilder in eine neue Datenbank und trianguliert
+    # gegen die bekannten Posen (point_triangulator + bundle_adjuster) statt neu zu mappen.
+    def _refine_full_res(self, colmap, scene_dir, max_img, overlap, use_gpu):
+        scene_dir = Path(scene_dir); img_dir = scene_dir / "images"; sparse0 = scene_dir / "sparse" / "0"
+        proxy_dir = scene_dir / "sparse" / "0_proxy"; full_db = scene_dir / "database_full.db"
+        try: model = read_colmap_model(sparse0)
+        except Exception as e:
+            self.log_line(f"[REFINE] Proxy-Modell nicht lesbar: {e}"); return 1
+        self.log_line(f"[REFINE] Vorschau-Kamera exportiert. Verfeinere {len(model[1])} registrierte Bilder mit max_image_size={max_img}…")
+        list_path = scene_dir / "refine_images.txt"
+        list_path.write_text("\n".join(sorted(img.name for img in model[1].values())) + "\n", encoding="utf-8")
+        full_db.unlink(missing_ok=True)
+        code = self._colmap_feature_extractor(colmap, str(full_db), str(img_dir), max_img, use_gpu,
+                                              extra_args=["--image_list_path", str(list_path)])
+        if code != 0: return code
+        code = self._colmap_sequential_matcher(colmap, str(full_db), overlap, use_gpu)
+        if code != 0: return code
+        shutil.rmtree(proxy_dir, ignore_errors=True); shutil.copytree(sparse0, proxy_dir)
+        # database_full.db kennt nur die registrierten Bilder und nummeriert sie neu: Posen per Name zuordnen
+        known_dir = scene_dir / "sparse" / "0_known"; shutil.rmtree(known_dir, ignore_errors=True)
+        try:
+            db_rows = colmap_db_images(full_db); known = align_model_to_db(model, db_rows)
+            mismatches = model_db_mismatches(known, db_rows)
+            if mismatches: raise ValueError(f"IDs passen nicht zur Datenbank, z. B. {mismatches[0]}")
+            write_colmap_model_txt(known, known_dir)
+        except Exception as e:
+            self.log_line(f"[REFINE] Posen nicht übertragbar: {e}"); return 1
+        out_dir = scene_dir / "sparse" / "0_refine"; shutil.rmtree(out_dir, ignore_errors=True); out_dir.mkdir(parents=True)
+        code = self._colmap_point_triangulator(colmap, str(full_db), str(img_dir), str(known_dir), str(out_dir))
+        if code == 0:
+            code = self._colmap_bundle_adjuster(colmap, str(out_dir), str(out_dir))
+        if code != 0:
+            shutil.rmtree(out_dir, ignore_errors=True); return code
+        shutil.rmtree(sparse0, ignore_errors=True); shutil.move(str(out_dir), str(sparse0)); shutil.rmtree(known_dir, ignore_errors=True)
+        db_path = scene_dir / "database.db"; proxy_db = scene_dir / "database_proxy.db"
+        proxy_db.unlink(missing_ok=True); db_path.replace(proxy_db); full_db.replace(db_path)
+        before, after = model_stats(model), colmap_model_stats(sparse0) or {}
+        self.log_line(f"[REFINE] 3D-Punkte {before['points']} -> {after.get('points', '?')}, "
+                      f"Reprojektionsfehler {before['mean_reproj_error']} -> {after.get('mean_reproj_error', '?')}px")
+        return 0
+
+    # --- Gemeinsame Rekonstruktion ---
+    # Alle Videos der Liste in eine Datenbank/ein Modell (ein Kamera-Modell pro Video-Ordner),
+    # Kamera-Tracks pro Video im gemeinsamen Koordinatensystem.
+    def _run_joint(self, videos, ffmpeg, colmap, glomap, scenes_dir, max_img, overlap, use_gpu, race):
+        stems = [Path(v).stem for v in videos]
+        scene_dir = Path(scenes_dir) / f"joint_{stems[0]}+{len(stems) - 1}"
+        img_dir = scene_dir / "images"; sparse_dir = scene_dir / "sparse"; db_path = scene_dir / "database.db"
+        sparse_dir.mkdir(parents=True, exist_ok=True); self._camera_args = []; self._mapper_args = {}
+        self.log_line(f"\n=== Gemeinsame Rekonstruktion ({len(videos)} Videos): {scene_dir.name} ===")
+        names, thumbs = {}, {}
+        for i, video in enumerate(videos, start=1):
+            if self._stop_flag: return None
+            vpath = Path(video); sub = img_dir / vpath.stem; sub.mkdir(parents=True, exist_ok=True)
+            self.log_line(f"[JOINT] ({i}/{len(videos)}) {vpath.name}: {self.S['run_extract']}")
+            if self._ffmpeg_extract(ffmpeg, str(vpath), str(sub)) != 0 or not any(sub.glob("frame_*.jpg")):
+                self.log_line(f"[ERROR] ffmpeg fehlgeschlagen für {vpath.stem}. Video wird ausgelassen.")
+                shutil.rmtree(sub, ignore_errors=True); continue
+            info_dir = scene_dir / "videos" / vpath.stem; info_dir.mkdir(parents=True, exist_ok=True)
+            self._save_extraction_info(ffmpeg, vpath, info_dir)
+            names[vpath.stem] = [f"{vpath.stem}/{p.name}" for p in sorted(sub.glob("frame_*.jpg"))]
+            thumbs[vpath.stem] = {f"{vpath.stem}/{k}": v for k, v in ffmpeg_thumbnails(ffmpeg, sub).items()}
+        if len(names) < 2:
+            self.log_line("[ERROR] Weniger als zwei Videos extrahiert – gemeinsame Rekonstruktion abgebrochen."); return None
+        save_extraction_info(scene_dir, {"joint_videos": list(names)})
+        self.log_line(f"[JOINT] {self.S['run_feat']}")
+        db_path.unlink(missing_ok=True)
+        if self._colmap_feature_extractor(colmap, str(db_path), str(img_dir), max_img, use_gpu, per_folder=True) != 0:
+            self.log_line("[ERROR] feature_extractor fehlgeschlagen. Überspringe."); return None
+        if not self._gate(check_feature_gate, str(db_path)):
+            self.log_line("[ERROR] Zu wenige Keypoints. Überspringe."); return None
+        stride = int(self.settings.get("joint_cross_stride", 5)); per_frame = int(self.settings.get("joint_cross_per_frame", 2))
+        pairs = [p for video in names.values() for p in sequential_pairs(video, overlap)]
+        code = self._joint_match(colmap, scene_dir, pairs, cross_video_pairs(thumbs, stride, per_frame), use_gpu)
+        if code == 0 and not self._gate(check_match_gate, str(db_path), overlap) \
+                and self.settings.get("gate_fallback", "retry") == "retry":
+            # Fallback: dichtere Querpaare; bereits gematchte Paare überspringt COLMAP
+            self.log_line("[GATE] Fallback: mehr Paare zwischen den Videos…")
+            code = self._joint_match(colmap, scene_dir, [], cross_video_pairs(thumbs, 1, per_frame * 2), use_gpu)
+        if code != 0:
+            self.log_line("[ERROR] matches_importer fehlgeschlagen. Überspringe."); return None
+        self.log_line(f"[JOINT] {self.S['run_mapper']}")
+        use_glomap = bool(glomap) and Path(glomap).exists()
+        if use_glomap and race:
+            code = self._mapper_race(glomap, colmap, str(db_path), str(img_dir), str(sparse_dir))
+        else:
+            code = self._glomap_mapper(glomap, str(db_path), str(img_dir), str(sparse_dir)) if use_glomap \
+                   else self._colmap_mapper(colmap, str(db_path), str(img_dir), str(sparse_dir))
+        if code != 0:
+            self.log_line("[ERROR] mapper fehlgeschlagen. Überspringe."); return None
+        if (sparse_dir / "1").exists():
+            self.log_line("[JOINT] Warnung: mehrere Teilmodelle – nicht alle Videos liegen im selben Koordinatensystem (sparse/0 wird exportiert).")
+        try:
+            model = read_colmap_model(sparse_dir / "0")
+            for video in names:
+                n = len(model_subset(model, f"{video}/")[1])
+                self.log_line(f"[JOINT] {video}: {n}/{len(names[video])} Bilder registriert")
+        except Exception as e:
+            self.log_line(f"[JOINT] Modell nicht lesbar: {e}")
+        metrics = self._finalize_scene(ffmpeg, scene_dir)
+        self.log_line(f"✓ Fertig: {scene_dir.name}"); self._advance_progress(len(videos), len(videos))
+        return metrics
+
+    def _joint_match(self, colmap, scene_dir, seq_pairs, cross_pairs, use_gpu):
+        pairs_path = Path(scene_dir) / "joint_pairs.txt"
+        pairs_path.write_text("".join(f"{a} {b}\n" for a, b in seq_pairs + cross_pairs), encoding="utf-8")
+        self.log_line(f"[JOINT] {len(seq_pairs)} sequenzielle Paare, {len(cross_pairs)} Paare zwischen Videos")
+        return self._colmap_matches_importer(colmap, str(Path(scene_dir) / "database.db"), str(pairs_path), use_gpu)
+
+    # --- Densify ---
+    # Ergänzt eine gelöste Szene (jeder N-te Frame) um die fehlenden Frames für jeden M-ten
+    # Frame (N % M == 0): nur neue Frames extrahieren, Features in die vorhandene database.db,
+    # Matching gegen gelöste Nachbarn, image_registrator + bundle_adjuster auf sparse/0.
+    def _can_densify(self, scene_dir):
+        info = load_extraction_info(scene_dir); old_step = int(info.get("step", 0) or 0)
+        new_step = self._sampling_step(); done_step = int(info.get("densified_step", old_step) or old_step)
+        if not (Path(scene_dir) / "sparse" / "0" / "images.bin").exists() or not (Path(scene_dir) / "database.db").exists():
+            return False
+        if old_step <= 1 or new_step >= done_step or old_step % new_step != 0:
+            self.log_line(f"[DENSIFY] Nicht möglich (bisher jeder {done_step}. Frame, jetzt jeder {new_step}.) – normaler Durchlauf.")
+            return False
+        if info.get("scale") != self._build_scale_filter():
+            # neue Frames in anderer Auflösung passen nicht zur vorhandenen Kamera
+            self.log_line(f"[DENSIFY] Nicht möglich (Skalierung {info.get('scale') or 'keine'} -> {self._build_scale_filter() or 'keine'}) – normaler Durchlauf.")
+            return False
+        return True
+
+    def _densify_scene(self, ffmpeg, colmap, vpath, scene_dir, max_img, use_gpu):
+        scene_dir = Path(scene_dir); info = load_extraction_info(scene_dir)
+        img_dir = scene_dir / "images"; db_path = scene_dir / "database.db"; sparse0 = scene_dir / "sparse" / "0"
+        old_step = int(info["step"]); done_step = int(info.get("densified_step", old_step)); new_step = self._sampling_step()
+        self.log_line(f"[DENSIFY] Jeder {done_step}. Frame gelöst -> ergänze auf jeden {new_step}. Frame")
+        tmp_dir = scene_dir / "_densify"; shutil.rmtree(tmp_dir, ignore_errors=True); tmp_dir.mkdir(parents=True)
+        # nur Frames, die auf dem neuen Raster liegen, aber noch nicht extrahiert sind
+        code = self._ffmpeg_extract(ffmpeg, str(vpath), str(tmp_dir),
+                                    samp_filters=[f"select=not(mod(n\\,{new_step}))*gt(mod(n\\,{done_step})\\,0)"])
+        if code != 0:
+            shutil.rmtree(tmp_dir, ignore_errors=True); return code
+        candidates = (src for src in itertools.count(0, new_step) if src % done_step)
+        new_frames = {}
+        for f, src in zip(sorted(tmp_dir.glob("frame_*.jpg")), candidates):
+            name = f"src_{src:06d}.jpg"; shutil.move(str(f), str(img_dir / name)); new_frames[src] = name
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not new_frames:
+            self.log_line("[DENSIFY] Keine neuen Frames."); return 0
+        model = read_colmap_model(sparse0)
+        solved = {image_source_frame(img.name, old_step): img.name for img in model[1].values()}
+        solved.pop(None, None)
+        list_path = scene_dir / "densify_images.txt"; pairs_path = scene_dir / "densify_pairs.txt"
+        list_path.write_text("\n".join(new_frames[k] for k in sorted(new_frames)) + "\n", encoding="utf-8")
+        pairs = densify_pairs(new_frames, solved)
+        pairs_path.write_text("\n".join(f"{a} {b}" for a, b in pairs) + "\n", encoding="utf-8")
+        self.log_line(f"[DENSIFY] {len(new_frames)} neue Frames, {len(pairs)} Bildpaare")
+        cam_id = next(iter(model[0]))
+        code = self._colmap_feature_extractor(colmap, str(db_path), str(img_dir), max_img, use_gpu,
+                                              extra_args=["--image_list_path", str(list_path), "--ImageReader.existing_camera_id", str(cam_id)])
+        if code != 0: return code
+        code = self._colmap_matches_importer(colmap, str(db_path), str(pairs_path), use_gpu)
+        if code != 0: return code
+        out_dir = scene_dir / "sparse" / "0_densify"; shutil.rmtree(out_dir, ignore_errors=True); out_dir.mkdir(parents=True)
+        code = self._colmap_image_registrator(colmap, str(db_path), str(sparse0), str(out_dir))
+        if code != 0: return code
+        # Intrinsics bleiben fix, nur Posen/Punkte werden nachoptimiert
+        code = self._colmap_bundle_adjuster(colmap, str(out_dir), str(out_dir),
+                                            extra_args=["--BundleAdjustment.refine_focal_length", "0",
+                                                        "--BundleAdjustment.refine_principal_point", "0",
+                                                        "--BundleAdjustment.refine_extra_params", "0"])
+        if code != 0: return code
+        before = len(model[1]); after = colmap_model_stats(out_dir)
+        shutil.rmtree(sparse0, ignore_errors=True); shutil.move(str(out_dir), str(sparse0))
+        info["densified_step"] = new_step; save_extraction_info(scene_dir, info)
+        self.log_line(f"[DENSIFY] Registrierte Bilder: {before} -> {after['registered'] if after else '?'}")
+        return 0
+
+    def _open_advanced_dialog(self):
+        win = tk.Toplevel(self); win.title(self.S["advanced_title"]); win.resizable(False, False)
+        frm = ttk.Frame(win); frm.pack(fill="both", expand=True, padx=12, pady=12)
+        row = 0
+        ttk.Checkbutton(frm, text=self.S["race_cb"], variable=self.race_mappers_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["interp_cb"], variable=self.interp_full_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["densify_cb"], variable=self.densify_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["two_pass_cb"], variable=self.two_pass_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["streaming_cb"], variable=self.streaming_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["intrinsics_cb"], variable=self.intrinsics_lib_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["intrinsics_fix_cb"], variable=self.intrinsics_fix_var).grid(row=row, column=0, columnspan=4, sticky="w", padx=(20, 0)); row += 1
+        ttk.Checkbutton(frm, text=self.S["joint_cb"], variable=self.joint_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["dense_kf_cb"], variable=self.dense_kf_var).grid(row=row, column=0, columnspan=4, sticky="w"); row += 1
+        ttk.Label(frm, text=self.S["dense_profile"]).grid(row=row, column=0, sticky="w")
+        ttk.Radiobutton(frm, text=self.S["dense_final"], variable=self.dense_profile_var, value="final").grid(row=row, column=1, sticky="w")
+        ttk.Radiobutton(frm, text=self.S["dense_preview"], variable=self.dense_profile_var, value="preview").grid(row=row, column=2, sticky="w"); row += 1
+        ttk.Label(frm, text=self.S["mesher"]).grid(row=row, column=0, sticky="w")
+        ttk.Radiobutton(frm, text="Poisson", variable=self.mesher_var, value="poisson").grid(row=row, column=1, sticky="w")
+        ttk.Radiobutton(frm, text="Delaunay", variable=self.mesher_var, value="delaunay").grid(row=row, column=2, sticky="w"); row += 1
+        ttk.Checkbutton(frm, text=self.S["decimate_cb"], variable=self.decimate_var).grid(row=row, column=0, columnspan=4, sticky="w", padx=(20, 0)); row += 1
+        ttk.Label(frm, text=self.S["deadline"]).grid(row=row, column=0, sticky="w")
+        ttk.Entry(frm, width=8, textvariable=self.deadline_var).grid(row=row, column=1, sticky="w")
+        ttk.Radiobutton(frm, text=self.S["deadline_video"], variable=self.deadline_scope_var, value="video").grid(row=row, column=2, sticky="w")
+        ttk.Radiobutton(frm, text=self.S["deadline_batch"], variable=self.deadline_scope_var, value="batch").grid(row=row, column=3, sticky="w"); row += 1
+        ttk.Button(frm, text=self.S["installer_close"], command=win.destroy).grid(row=row, column=0, columnspan=4, sticky="e", pady=(12, 0))
+
+    # --- Kamera-Track-Export ---
+    def _save_extraction_info(self, ffmpeg, video_path, scene_dir):
+        info = ffprobe_video_info(ffmpeg, video_path) or {}
+        try:
+            save_extraction_info(scene_dir, {"video": str(video_path), "step": self._sampling_step(),
+                                             "scale": self._build_scale_filter(), "fps": info.get("fps"),
+                                             "nb_frames": info.get("nb_frames"), "duration": info.get("duration"),
+                                             "tags": info.get("tags") or {}})
+        except Exception as e:
+            self.log_line(f"[EXPORT] Warnung: {EXTRACTION_FILE} nicht geschrieben: {e}")
+
+    def _export_camera_track(self, scene_dir, suffix="", video=None):
+        scene_dir = Path(scene_dir); info = load_extraction_info(scene_dir / "videos" / video if video else scene_dir)
+        try:
+            model = read_colmap_model(scene_dir / "sparse" / "0")
+            frames = build_camera_track(model_subset(model, f"{video}/") if video else model, info.get("step", 1))
+            if not frames:
+                self.log_line(f"[EXPORT] Keine registrierten Frames{f' ({video})' if video else ''} – kein Kamera-Track."); return None
+            paths = export_camera_track(frames, scene_dir / "export", video or scene_dir.name, info.get("fps"), suffix=suffix)
+            self.log_line(f"[EXPORT] Kamera-Track ({len(frames)} Frames, {frames[0]['frame']}–{frames[-1]['frame']}): "
+                          + ", ".join(p.name for p in paths))
+            return frames
+        except Exception as e:
+            self.log_line(f"[EXPORT] Fehler beim Kamera-Track-Export: {e}"); return None
+
+    def _export_full_rate_track(self, ffmpeg, scene_dir, frames, video=None):
+        scene_dir = Path(scene_dir); info = load_extraction_info(scene_dir / "videos" / video if video else scene_dir)
+        times = ffprobe_frame_times(ffmpeg, info.get("video", "")) if info.get("video") else None
+        if not times and info.get("fps") and info.get("nb_frames"):
+            times = [k / info["fps"] for k in range(int(info["nb_frames"]))]
+        if not times:
+            self.log_line("[EXPORT] Keine Frame-Zeitstempel (ffprobe) – Interpolation übersprungen."); return None
+        try:
+            full = interpolate_camera_track(frames, times, int(self.settings.get("interp_max_gap", 12)))
+            export_camera_track(full, scene_dir / "export", video or scene_dir.name, info.get("fps"), suffix="_full")
+            counts = collections.Counter(f["flag"] for f in full)
+            self.log_line(f"[EXPORT] Volle Framerate: {len(full)} Frames ("
+                          + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())) + ")")
+            return full
+        except Exception as e:
+            self.log_line(f"[EXPORT] Fehler bei der Interpolation: {e}"); return None
+
+    # --- Metriken ---
+    def _scene_metrics(self, scene_dir):
+        metrics = compute_scene_metrics(scene_dir)
+        try: write_scene_metrics(scene_dir, metrics)
+        except Exception as e: self.log_line(f"[METRICS] Warnung: {METRICS_FILE} nicht geschrieben: {e}")
+        fmt = lambda v: "-" if v is None else v
+        self.log_line(f"[METRICS] Bilder {fmt(metrics['images_registered'])}/{fmt(metrics['images_total'])}, "
+                      f"Keypoints/Bild {fmt(metrics['keypoints_mean'])}, Matches/Paar {fmt(metrics['matches_per_pair_mean'])}, "
+                      f"3D-Punkte {fmt(metrics['points3d'])}, Track-Länge {fmt(metrics['mean_track_length'])}, "
+                      f"Reprojektionsfehler {fmt(metrics['mean_reproj_error'])}px")
+        return metrics
+
+    def _metrics_summary(self, scenes_dir, rows):
+        if not rows: return
+        try: all_rows = write_metrics_summary(scenes_dir, rows)
+        except Exception as e: self.log_line(f"[METRICS] Warnung: {METRICS_SUMMARY_FILE} nicht geschrieben: {e}"); return
+        self.log_line(f"\n[METRICS] Zusammenfassung: {Path(scenes_dir) / METRICS_SUMMARY_FILE}")
+        # Ausreißer im Vergleich mit allen Szenen des Projekts, gemeldet nur für die dieses Laufs
+        batch = {r["scene"] for r in rows}
+        outliers = {scene: reasons for scene, reasons in find_metric_outliers(all_rows, self.settings).items() if scene in batch}
+        for scene, reasons in outliers.items():
+            self.log_line(f"[METRICS] Auffällig: {scene} – {', '.join(reasons)}")
+        if not outliers: self.log_line("[METRICS] Keine Ausreißer.")
 
     def _advance_progress(self, i, total):
         self.progress.config(maximum=total, value=i); self.update_idletasks()
@@ -2553,6 +5931,128 @@ class AutoTrackerGUI(tk.Tk):
         except Exception:
             pass
 
+# ----------------------------- Worker-Modus -----------------------------
+# Pipeline ohne GUI für Render-Nodes: `AutoTracker_GUI-v4.py --worker <Projektordner>`. Die
+# Optionen des Hauptfensters kommen aus settings.json "worker_options" (gleiche Namen wie die
+# Variablen ohne "_var"), die Jobs aus der LeaseQueue des Projekts.
+WORKER_OPTION_DEFAULTS = {
+    "res_mode": "keep", "width": "", "height": "", "use_gpu": True, "race_mappers": False, "interp_full": True,
+    "densify": False, "two_pass": False, "streaming": False, "intrinsics_lib": True, "intrinsics_fix": False,
+    "joint": False, "dense_kf": True, "dense_profile": "final", "mesher": "poisson", "decimate": True,
+    "deadline": "", "deadline_scope": "video", "jpeg_q": "2", "sift_max_img": "4096", "seq_overlap": "15",
+    "mesh": False, "fps_mode": "all", "every_n": "2", "sjf": False, "use_path_linux": True,
+}
+
+class OptionVar:
+    """Stand-in for a Tk variable (get/set) in headless mode."""
+    def __init__(self, value): self._value = value
+    def get(self): return self._value
+    def set(self, value): self._value = value
+
+class HeadlessPipeline(AutoTrackerGUI):
+    """AutoTrackerGUI's pipeline without Tk: processes jobs claimed from a LeaseQueue."""
+    def __init__(self, top, worker_id, settings=None):  # Tk wird bewusst nicht initialisiert
+        self.lang = detect_lang(); self.S = I18N[self.lang]; self.settings = settings or load_settings()
+        self.worker_id = worker_id; self._log_lock = threading.Lock()
+        self._worker = None; self._stop_flag = False; self._elapsed_start = None; self._elapsed_job = None
+        self._camera_args = []; self._mapper_args = {}
+        self._cancel = None; self._stage_skipped = False; self._active_procs = set(); self._cancelled_procs = set(); self._procs_lock = threading.Lock()
+        self._threads = ThreadBudget(); self._stage_concurrency = 1
+        self._plan = {}; self._timing = None
+        self._queue_lock = threading.Lock(); self._queue_order = []; self._enqueued = {}; self._priorities = {}; self._requeue = set()
+        self._jobs = None; self._job_attempt = None; self._resume = set(); self._last_error = None; self._watcher = None
+        options = {**WORKER_OPTION_DEFAULTS, **(self.settings.get("worker_options") or {})}
+        for name, value in options.items(): setattr(self, name if name.endswith("_mode") else f"{name}_var", OptionVar(value))
+        self.top_dir_var = OptionVar(str(top)); self.scenes_dir_var = OptionVar(str(Path(top) / DEFAULT_DIRS["scenes"]))
+
+    def __getattr__(self, name):  # tk.Tk würde fehlende Attribute an self.tk weiterreichen
+        raise AttributeError(name)
+
+    def log_line(self, text):
+        if text.startswith(("[ERROR]", "[FATAL]")): self._last_error = text
+        with self._log_lock: print(f"[{self.worker_id}] {text}", flush=True)
+
+    def after(self, _ms, func=None, *args):
+        if func: func(*args)
+
+    def _set_running(self, running): pass
+    def _advance_progress(self, i, total): pass
+    def _sync_queue(self): pass
+
+    def _cancel_lost(self, video):
+        self.log_line(f"[WORKER] Lease für {Path(video).name} verloren – breche ab.")
+        with self._procs_lock: procs = list(self._active_procs)
+        self._cancel = "video"; terminate_procs(procs, 0.5)
+
+    def _heartbeat_loop(self, leases, interval):
+        while not self._stop_flag:
+            for video in leases.heartbeat(): self._cancel_lost(video)
+            time.sleep(interval)
+
+    def stop(self, *_args):
+        """SIGINT/SIGTERM handler: only set the flags and signal the running tools (no locks, no logging)."""
+        if self._stop_flag: return
+        self._stop_flag = True; self._cancel = "batch"
+        for proc in set(self._active_procs):  # Kopie ohne _procs_lock: der Handler kann den Hauptthread darin unterbrechen
+            try:
+                if proc.poll() is None: _signal_process_group(proc, kill=False)
+            except Exception: pass
+
+    def _next_queued(self, done, deferred, expected):
+        # Eine Zurückstellung hat den Job schon als .queued an die Lease-Queue zurückgegeben: der Ein-Video-Batch endet.
+        if deferred: return None, []
+        return super()._next_queued(done, deferred, expected)
+
+    def run_worker(self, tools, drain=False):
+        """Claim and process jobs until stopped; with ``drain`` stop once no unfinished video is left."""
+        top = Path(self.top_dir_var.get())
+        leases = LeaseQueue(top / DEFAULT_DIRS["videos"], self.scenes_dir_var.get(), self.worker_id,
+                            ttl=float(self.settings.get("worker_lease_ttl_s", 60)),
+                            max_attempts=int(self.settings.get("worker_max_attempts", 3)),
+                            stable_s=float(self.settings.get("watch_stable_s", 10)), log=self.log_line)
+        self._jobs = leases
+        threading.Thread(target=self._heartbeat_loop, args=(leases, float(self.settings.get("worker_heartbeat_s", 10))), daemon=True).start()
+        poll_s = float(self.settings.get("worker_poll_s", 10))
+        self.log_line(f"[WORKER] Gestartet auf {platform.node()} (PID {os.getpid()}), Projekt {top}")
+        while not self._stop_flag:
+            video = leases.claim()
+            if video is None:
+                if drain and not leases.pending(stable_only=False): break
+                time.sleep(poll_s if not drain else min(poll_s, leases.ttl / 4)); continue
+            self._cancel = None
+            with self._queue_lock: self._queue_order = [video]
+            self._run_pipeline([video], tools["ffmpeg"], tools["colmap"], tools.get("glomap") or "")
+            if leases.holds(video): leases.finish(video, "cancelled")
+        if self._stop_flag: self.log_line("[WORKER] Beende nach Signal (laufender Job wurde zurückgestellt).")
+        self._stop_flag = True
+        self.log_line("[WORKER] Beendet.")
+
+def worker_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog=Path(__file__).name, description="AutoTracker Worker (ohne GUI)")
+    parser.add_argument("--worker", metavar="PROJEKT", required=True, help="Projektordner (Top-Level)")
+    parser.add_argument("--id", default=f"{platform.node()}-{os.getpid()}", help="Worker-Name in Leases und Log")
+    parser.add_argument("--drain", action="store_true", help="beenden, sobald kein unerledigtes Video mehr übrig ist")
+    parser.add_argument("--settings", metavar="JSON", help="settings.json dieses Nodes (Standard: neben dem Skript)")
+    for tool in ("ffmpeg", "colmap", "glomap"): parser.add_argument(f"--{tool}", help=f"Pfad zu {tool} (sonst automatisch)")
+    args = parser.parse_args(argv)
+    top = Path(args.worker).resolve()
+    if not (top / DEFAULT_DIRS["videos"]).is_dir():
+        print(f"[FATAL] {top / DEFAULT_DIRS['videos']} nicht gefunden.", file=sys.stderr); return 2
+    settings = load_settings()
+    if args.settings:
+        with open(args.settings, "r", encoding="utf-8") as f: settings.update(json.load(f))
+    worker = HeadlessPipeline(top, args.id, settings)
+    found = detect_tools(top, worker.use_path_linux_var.get())
+    tools = {tool: getattr(args, tool) or found[tool] for tool in ("ffmpeg", "colmap", "glomap")}
+    for tool in ("ffmpeg", "colmap"):
+        if not tools[tool] or not Path(tools[tool]).exists():
+            print(f"[FATAL] {tool} nicht gefunden (--{tool} angeben).", file=sys.stderr); return 2
+    for sig in (signal.SIGINT, signal.SIGTERM): signal.signal(sig, worker.stop)
+    worker.run_worker(tools, drain=args.drain)
+    return 0
+
 if __name__ == "__main__":
+    if "--worker" in sys.argv[1:]: sys.exit(worker_main(sys.argv[1:]))
     ensure_vc_redist()
     app = AutoTrackerGUI(); app.mainloop()